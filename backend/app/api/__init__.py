@@ -1,7 +1,7 @@
 """Aggregate API routers."""
 from fastapi import APIRouter
 
-from backend.app.api import auth, projects, job_runs, suggestions, reports, analytics, organization, comparisons, audit_logs, billing
+from backend.app.api import auth, projects, job_runs, suggestions, reports, analytics, organization, comparisons, audit_logs, billing, emissions_recompute
 
 router = APIRouter()
 router.include_router(auth.router, prefix="/auth", tags=["auth"])
@@ -14,3 +14,4 @@ router.include_router(analytics.router, prefix="/analytics", tags=["analytics"])
 router.include_router(organization.router, prefix="/organization", tags=["organization"])
 router.include_router(audit_logs.router, prefix="/audit-logs", tags=["audit-logs"])
 router.include_router(billing.router, prefix="/billing", tags=["billing"])
+router.include_router(emissions_recompute.router, prefix="/emissions/recompute", tags=["emissions"])
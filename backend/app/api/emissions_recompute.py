@@ -0,0 +1,105 @@
+"""Bulk emissions recompute routes (admin)."""
+import logging
+from uuid import UUID
+
+from fastapi import APIRouter, Depends, HTTPException, Query, Response, status
+from sqlalchemy.orm import Session
+
+from backend.app.auth.context import get_request_context
+from backend.app.auth.deps import require_roles
+from backend.app.core.database import get_db
+from backend.app.models.emission_recompute_job import EmissionRecomputeJob
+from backend.app.schemas.recompute import RecomputeJobCreate, RecomputeJobRead
+from backend.app.services.audit_service import AuditEvent, audit_log
+from backend.app.services.recompute_service import cancel, create_job
+from backend.app.utils.pagination import DEFAULT_PAGE_SIZE, MAX_PAGE_SIZE, paginate, set_next_cursor
+from backend.app.utils.queue import default_queue
+
+logger = logging.getLogger(__name__)
+
+router = APIRouter()
+
+
+def _get_job(db: Session, organization_id, job_id: UUID) -> EmissionRecomputeJob:
+    job = (
+        db.query(EmissionRecomputeJob)
+        .filter(EmissionRecomputeJob.id == job_id, EmissionRecomputeJob.organization_id == organization_id)
+        .first()
+    )
+    if not job:
+        raise HTTPException(status_code=404, detail="Recompute job not found")
+    return job
+
+
+@router.post("", response_model=RecomputeJobRead, status_code=status.HTTP_202_ACCEPTED)
+def start_recompute(
+    payload: RecomputeJobCreate,
+    db: Session = Depends(get_db),
+    user=Depends(require_roles("owner", "admin")),
+    ctx=Depends(get_request_context),
+):
+    """Recompute the organization's stored emissions in the background; poll the job for progress."""
+    job = create_job(
+        db,
+        organization_id=user.organization_id,
+        regions=payload.regions,
+        chunk_size=payload.chunk_size,
+        max_rows_per_second=payload.max_rows_per_second,
+        requested_by_user_id=user.id,
+    )
+    audit_log(
+        AuditEvent(
+            organization_id=user.organization_id,
+            actor_type="user",
+            actor_user_id=user.id,
+            action="emissions.recompute",
+            resource_type="emission_recompute_job",
+            resource_id=job.id,
+            request_id=ctx.request_id,
+            metadata={"regions": job.regions, "total_runs": job.total_runs},
+        ),
+        db,
+    )
+    db.commit()
+    db.refresh(job)
+    try:
+        default_queue.enqueue("backend.app.workers.tasks.recompute_emissions", str(job.id), job_timeout=-1)
+    except Exception:
+        # The job stays pending; recompute_emissions --resume can run it
+        logger.warning("Failed to enqueue recompute job %s", job.id, exc_info=True)
+    return job
+
+
+@router.get("", response_model=list[RecomputeJobRead])
+def list_recompute_jobs(
+    response: Response,
+    cursor: str | None = None,
+    limit: int = Query(DEFAULT_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE),
+    db: Session = Depends(get_db),
+    user=Depends(require_roles("owner", "admin")),
+):
+    q = db.query(EmissionRecomputeJob).filter(EmissionRecomputeJob.organization_id == user.organization_id)
+    jobs, next_cursor = paginate(q, EmissionRecomputeJob.created_at, EmissionRecomputeJob.id, cursor=cursor, limit=limit)
+    set_next_cursor(response, next_cursor)
+    return jobs
+
+
+@router.get("/{job_id}", response_model=RecomputeJobRead)
+def get_recompute_job(
+    job_id: UUID,
+    db: Session = Depends(get_db),
+    user=Depends(require_roles("owner", "admin")),
+):
+    return _get_job(db, user.organization_id, job_id)
+
+
+@router.post("/{job_id}/cancel", response_model=RecomputeJobRead)
+def cancel_recompute_job(
+    job_id: UUID,
+    db: Session = Depends(get_db),
+    user=Depends(require_roles("owner", "admin")),
+):
+    job = cancel(db, _get_job(db, user.organization_id, job_id))
+    db.commit()
+    db.refresh(job)
+    return job
@@ -2,35 +2,63 @@
 
 from __future__ import annotations
 
+import json
 from datetime import datetime
-from typing import Optional
+from tempfile import SpooledTemporaryFile
+from typing import Any, Optional, Sequence
 from uuid import UUID
 
-from fastapi import APIRouter, BackgroundTasks, Depends, Header, HTTPException, Response, status
-from sqlalchemy.exc import IntegrityError
+from fastapi import APIRouter, BackgroundTasks, Depends, Header, HTTPException, Query, Request, Response, status
+from fastapi.responses import JSONResponse, StreamingResponse
+from pydantic import ValidationError
+from starlette.concurrency import run_in_threadpool
 from sqlalchemy.orm import Session
 from hashlib import sha256
 
+from backend.app.auth.api_keys import ApiKeyIdentity, issue_ingest_token
 from backend.app.auth.deps import get_current_user
-from backend.app.auth.context import get_request_context
-from backend.app.auth.security import verify_password
+from backend.app.auth.context import get_request_context, resolve_api_key
 from backend.app.core.config import get_settings
 from backend.app.core.database import get_db
-from backend.app.models.api_key import ApiKey
-from backend.app.models.job_run import JobRun
+from backend.app.middleware.body_decoding import MSGPACK_CONTENT_TYPES, DecodedBodyRoute, content_type_of
 from backend.app.models.model import Model
 from backend.app.models.model_version import ModelVersion
-from backend.app.models.project import Project
-from backend.app.schemas.job_run import JobRunCreate, JobRunDetail, JobRunRead
-from backend.app.services.emissions_service import compute_emissions_for_job_run
-from backend.app.services.job_service import get_job_run, list_job_runs, upsert_job_run
+from backend.app.schemas.auth import IngestToken
+from backend.app.schemas.job_run import (
+    JobRunBatchCreate,
+    JobRunBatchItemResult,
+    JobRunBatchResult,
+    JobRunCreate,
+    JobRunDetail,
+    JobRunQueued,
+    JobRunRead,
+)
+from backend.app.services.emissions_service import schedule_emissions
+from backend.app.services.idempotency_cache import idempotency_cache, payload_digest
+from backend.app.services.ingest_queue import ingest_queue
+from backend.app.services.job_service import (
+    bulk_upsert_job_runs,
+    get_job_run,
+    list_job_runs,
+    upsert_job_run,
+    validate_job_run,
+)
 from backend.app.services.esg_service import generate_esg_narrative
+from backend.app.services.export_service import (
+    FORMATS as EXPORT_FORMATS,
+    build_export_statement,
+    export_job_runs,
+    parse_tag_filters,
+)
 from backend.app.services.rate_limit_service import rate_limiter
 from backend.app.services.audit_service import audit_log, AuditEvent
+from backend.app.utils.compression import StreamDecompressor
+from backend.app.utils.ndjson import Decoded, LineSplitter, LineTooLong, MsgpackSplitter
+from backend.app.utils.pagination import DEFAULT_PAGE_SIZE, MAX_PAGE_SIZE, set_next_cursor
 
 settings = get_settings()
 
-router = APIRouter(tags=["job-runs"])
+router = APIRouter(tags=["job-runs"], route_class=DecodedBodyRoute)
 
 
 def _dedupe_key(payload: JobRunCreate, project_id) -> str:
@@ -45,46 +73,41 @@ def _dedupe_key(payload: JobRunCreate, project_id) -> str:
 
 def get_api_key(
     x_api_key: str = Header(default="", alias="X-API-Key"),
-    db: Session = Depends(get_db),
-) -> ApiKey:
-    if not x_api_key:
-        raise HTTPException(status_code=401, detail="API key required")
-    if not x_api_key.startswith("gai_"):
-        raise HTTPException(status_code=401, detail="Invalid API key format")
-
-    # Attempt prefix-based lookup when available
-    prefix = x_api_key[:12]
-    candidates = (
-        db.query(ApiKey)
-        .filter(ApiKey.revoked_at.is_(None), ApiKey.active.is_(True))
-        .filter(ApiKey.key_prefix == prefix)
-        .all()
-    )
-    if not candidates:
-        candidates = db.query(ApiKey).filter(ApiKey.revoked_at.is_(None), ApiKey.active.is_(True)).all()
+    authorization: str = Header(default="", alias="Authorization"),
+    key: ApiKeyIdentity | None = Depends(resolve_api_key),
+) -> ApiKeyIdentity:
+    """Calling key from ``X-API-Key`` or a ``Bearer`` ingest token."""
+    if key is None:
+        if x_api_key and not x_api_key.startswith("gai_"):
+            raise HTTPException(status_code=401, detail="Invalid API key format")
+        if not x_api_key and not authorization:
+            raise HTTPException(status_code=401, detail="API key required")
+        raise HTTPException(status_code=401, detail="Invalid or revoked API key")
+    if key.is_blocked():
+        raise HTTPException(status_code=403, detail="API key temporarily blocked")
+    return key
 
-    for key in candidates:
-        if verify_password(x_api_key, key.hashed_key):
-            if key.blocked_until:
-                from datetime import datetime
-                if key.blocked_until > datetime.utcnow():
-                    raise HTTPException(status_code=403, detail="API key temporarily blocked")
-            return key
 
-    raise HTTPException(status_code=401, detail="Invalid or revoked API key")
+def _check_ingest_rate(db: Session, api_key: ApiKeyIdentity, ctx, cost: int = 1):
+    return rate_limiter.check(
+        key=str(api_key.id),
+        scope="ingest",
+        limit=settings.rate_limit_ingest_per_minute,
+        burst=settings.rate_limit_burst_multiplier,
+        db=db,
+        context=ctx,
+        cost=cost,
+    )
 
 
-def get_project_for_api_key(
+def get_ingest_key(
     payload: JobRunCreate,
-    api_key: ApiKey = Depends(get_api_key),
-    db: Session = Depends(get_db),
-) -> Project:
-    project = db.query(Project).filter(Project.id == api_key.project_id).first()
-    if not project:
-        raise HTTPException(status_code=401, detail="API key project not found")
-    if payload.project_id and payload.project_id != project.id:
+    api_key: ApiKeyIdentity = Depends(get_api_key),
+) -> ApiKeyIdentity:
+    """The calling key, after checking the payload targets the key's project."""
+    if payload.project_id and payload.project_id != api_key.project_id:
         raise HTTPException(status_code=403, detail="Project mismatch for this API key")
-    return project
+    return api_key
 
 
 def _validate_model_version_for_project(db: Session, project_id: UUID, model_version_id: UUID) -> None:
@@ -101,88 +124,276 @@ def _validate_model_version_for_project(db: Session, project_id: UUID, model_ver
         )
 
 
-@router.post("/", response_model=JobRunRead, status_code=status.HTTP_201_CREATED)
+@router.post("/ingest-token", response_model=IngestToken)
+def exchange_ingest_token(
+    x_api_key: str = Header(default="", alias="X-API-Key"),
+    api_key: ApiKeyIdentity = Depends(get_api_key),
+):
+    """Exchange an API key for a short-lived ingest token (sent as ``Authorization: Bearer``)."""
+    if not x_api_key:
+        # Tokens cannot be renewed with a token; the key must be presented again
+        raise HTTPException(status_code=401, detail="API key required")
+    token, expires_in = issue_ingest_token(api_key)
+    return IngestToken(access_token=token, expires_in=expires_in)
+
+
+@router.post(
+    "/",
+    response_model=JobRunRead,
+    status_code=status.HTTP_201_CREATED,
+    responses={202: {"model": JobRunQueued, "description": "Queued (Prefer: respond-async)"}},
+)
 def ingest_job_run(
     payload: JobRunCreate,
     response: Response,
     db: Session = Depends(get_db),
-    project: Project = Depends(get_project_for_api_key),
+    api_key: ApiKeyIdentity = Depends(get_ingest_key),
     background_tasks: BackgroundTasks = None,
     ctx=Depends(get_request_context),
+    prefer: str = Header(default="", alias="Prefer"),
 ):
-    # Validate optional FK BEFORE insert -> avoids generic 409
-    if payload.model_version_id:
-        _validate_model_version_for_project(db, project.id, payload.model_version_id)
-
-    dedupe = _dedupe_key(payload, project.id)
+    # get_api_key and ctx share one per-request key resolution; the key carries project/org
+    dedupe = _dedupe_key(payload, api_key.project_id)
     payload = payload.model_copy(
         update={
-            "project_id": project.id,
-            "organization_id": project.organization_id,
+            "project_id": api_key.project_id,
+            "organization_id": api_key.organization_id,
             "dedupe_key": dedupe,
         }
     )
 
+    # Replays of a payload already written (SDK retries, offline cache) are answered from Redis
+    digest = payload_digest(payload)
+    cached = idempotency_cache.get(api_key.project_id, dedupe, digest)
+    if cached is not None:
+        rl = _check_ingest_rate(db, api_key, ctx)
+        try:
+            audit_log(
+                AuditEvent(
+                    organization_id=api_key.organization_id,
+                    actor_type="api_key",
+                    actor_api_key_id=api_key.id,
+                    action="job_run.ingest",
+                    status="success",
+                    resource_type="job_run",
+                    request_id=ctx.request_id if hasattr(ctx, "request_id") else None,
+                    metadata={"project_id": str(api_key.project_id), "replayed": True},
+                ),
+                db,
+            )
+        except Exception:
+            pass
+        return JSONResponse(
+            status_code=status.HTTP_200_OK,
+            content=cached,
+            headers={
+                "X-RateLimit-Limit": str(rl.limit),
+                "X-RateLimit-Remaining": str(rl.remaining),
+                "Idempotent-Replayed": "true",
+            },
+        )
+
+    rl = None
+    if "respond-async" in prefer.lower():
+        # Validate and queue without touching Postgres; the ingest consumer applies it.
+        # Falls through to the synchronous path when Redis is unavailable or backlogged.
+        validate_job_run(payload)
+        rl = _check_ingest_rate(db, api_key, ctx)
+        queue_id = ingest_queue.enqueue(api_key, payload, request_id=getattr(ctx, "request_id", None))
+        if queue_id is not None:
+            return JSONResponse(
+                status_code=status.HTTP_202_ACCEPTED,
+                content=JobRunQueued(dedupe_key=dedupe, queue_id=queue_id).model_dump(),
+                headers={"X-RateLimit-Limit": str(rl.limit), "X-RateLimit-Remaining": str(rl.remaining)},
+            )
+
+    # Validate optional FK BEFORE insert -> avoids generic 409
+    if payload.model_version_id:
+        _validate_model_version_for_project(db, api_key.project_id, payload.model_version_id)
+
     audit_status = "success"
     try:
-        # Rate limit per api key
-        rl = rate_limiter.check(
-            key=str(ctx.api_key.id if getattr(ctx, "api_key", None) else project.id),
-            scope="ingest",
-            limit=settings.rate_limit_ingest_per_minute,
-            burst=settings.rate_limit_burst_multiplier,
-            db=db,
-            context=ctx,
-        )
+        if rl is None:
+            # Already charged when an async request fell back to this path
+            rl = _check_ingest_rate(db, api_key, ctx)
         response.headers["X-RateLimit-Limit"] = str(rl.limit)
         response.headers["X-RateLimit-Remaining"] = str(rl.remaining)
 
+        generation = idempotency_cache.reserve(api_key.project_id, dedupe)
         job_run, created = upsert_job_run(db, payload)
+        idempotency_cache.store(
+            api_key.project_id,
+            dedupe,
+            digest,
+            JobRunRead.model_validate(job_run).model_dump(mode="json", by_alias=True),
+            generation,
+        )
 
-        if settings.sync_compute:
-            if background_tasks is not None:
-                background_tasks.add_task(compute_emissions_for_job_run, job_run.id)
-            else:
-                compute_emissions_for_job_run(job_run.id)
+        if background_tasks is not None:
+            background_tasks.add_task(schedule_emissions, [job_run.id])
+        else:
+            schedule_emissions([job_run.id])
 
         if not created and response is not None:
             response.status_code = status.HTTP_200_OK
         return job_run
-    except IntegrityError as e:
-        db.rollback()
+    except HTTPException:
         audit_status = "failure"
-        msg = str(getattr(e, "orig", e)).lower()
-        if "foreign key" in msg or "violates foreign key constraint" in msg:
-            raise HTTPException(
-                status_code=status.HTTP_422_UNPROCESSABLE_ENTITY,
-                detail="Invalid foreign key (check project_id/model_version_id)",
+        raise
+    finally:
+        try:
+            audit_log(
+                AuditEvent(
+                    organization_id=api_key.organization_id,
+                    actor_type="api_key",
+                    actor_api_key_id=api_key.id,
+                    action="job_run.ingest",
+                    status=audit_status,
+                    resource_type="job_run",
+                    request_id=ctx.request_id if hasattr(ctx, "request_id") else None,
+                    metadata={"project_id": str(api_key.project_id)},
+                ),
+                db,
+            )
+        except Exception:
+            pass
+
+
+def _prepare_runs(
+    db: Session, api_key: ApiKeyIdentity, raws: Sequence[Any]
+) -> tuple[list[Optional[JobRunCreate]], dict[int, str]]:
+    """Validate raw run objects for the calling key; rejected items become None with an error."""
+    project_id, organization_id = api_key.project_id, api_key.organization_id
+    errors: dict[int, str] = {}
+    items: list[Optional[JobRunCreate]] = []
+    for index, raw in enumerate(raws):
+        try:
+            item = JobRunCreate.model_validate(raw)
+        except ValidationError as exc:
+            errors[index] = "; ".join(
+                f"{'.'.join(str(p) for p in err['loc'])}: {err['msg']}" for err in exc.errors()
             )
-        if "ux_job_runs_project_dedupe" in msg:
-            # Idempotent fetch
-            existing = (
-                db.query(JobRun)
-                .filter(JobRun.project_id == project.id, JobRun.dedupe_key == dedupe)
-                .first()
+            items.append(None)
+            continue
+        if item.project_id and item.project_id != project_id:
+            errors[index] = "Project mismatch for this API key"
+            items.append(None)
+            continue
+        items.append(
+            item.model_copy(
+                update={
+                    "project_id": project_id,
+                    "organization_id": organization_id,
+                    "dedupe_key": _dedupe_key(item, project_id),
+                }
             )
-            if existing:
-                response.status_code = status.HTTP_200_OK
-                return existing
+        )
+
+    # Validate every referenced model version with a single query
+    version_ids = {item.model_version_id for item in items if item is not None and item.model_version_id}
+    if version_ids:
+        valid = {
+            row.id
+            for row in db.query(ModelVersion.id)
+            .join(Model, ModelVersion.model_id == Model.id)
+            .filter(ModelVersion.id.in_(version_ids), Model.project_id == project_id)
+        }
+        for index, item in enumerate(items):
+            if item is not None and item.model_version_id and item.model_version_id not in valid:
+                errors[index] = "Invalid model_version_id for this project"
+                items[index] = None
+    return items, errors
+
+
+def _write_runs(
+    db: Session,
+    api_key: ApiKeyIdentity,
+    items: list[Optional[JobRunCreate]],
+    errors: dict[int, str],
+    ctx,
+    background_tasks: Optional[BackgroundTasks] = None,
+):
+    """Rate-limit, upsert and schedule compute for prepared runs; returns (results, rate limit)."""
+    rl = _check_ingest_rate(db, api_key, ctx, cost=max(1, len(items) - len(errors)))
+    written = {r.index: r for r in bulk_upsert_job_runs(db, items)}
+    results: list[JobRunBatchItemResult] = []
+    for index in range(len(items)):
+        if index in errors:
+            results.append(JobRunBatchItemResult(index=index, status="error", detail=errors[index]))
+        else:
+            r = written[index]
+            results.append(
+                JobRunBatchItemResult(index=index, status=r.status, id=r.id, dedupe_key=r.dedupe_key, detail=r.detail)
+            )
+
+    job_run_ids = [r.id for r in results if r.id is not None]
+    if background_tasks is not None:
+        background_tasks.add_task(schedule_emissions, job_run_ids)
+    else:
+        schedule_emissions(job_run_ids)
+    return results, rl
+
+
+def _count(outcome, results: Sequence[JobRunBatchItemResult]) -> None:
+    for r in results:
+        if r.status == "created":
+            outcome.created += 1
+        elif r.status == "updated":
+            outcome.updated += 1
+        elif r.status == "unchanged":
+            outcome.unchanged += 1
+        else:
+            outcome.errors += 1
+
+
+@router.post("/batch", response_model=JobRunBatchResult)
+def ingest_job_run_batch(
+    payload: JobRunBatchCreate,
+    response: Response,
+    db: Session = Depends(get_db),
+    api_key: ApiKeyIdentity = Depends(get_api_key),
+    background_tasks: BackgroundTasks = None,
+    ctx=Depends(get_request_context),
+):
+    """Ingest many runs with one auth check, one rate-limit charge and one audit event."""
+    if len(payload.runs) > settings.ingest_batch_max_items:
         raise HTTPException(
-            status_code=status.HTTP_409_CONFLICT,
-            detail="Duplicate or invalid job_run data (constraint violation).",
+            status_code=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE,
+            detail=f"Batch exceeds {settings.ingest_batch_max_items} runs",
         )
+    items, errors = _prepare_runs(db, api_key, payload.runs)
+
+    audit_status = "success"
+    outcome = JobRunBatchResult(results=[])
+    try:
+        results, rl = _write_runs(db, api_key, items, errors, ctx, background_tasks)
+        response.headers["X-RateLimit-Limit"] = str(rl.limit)
+        response.headers["X-RateLimit-Remaining"] = str(rl.remaining)
+        outcome.results = results
+        _count(outcome, results)
+        return outcome
+    except HTTPException:
+        audit_status = "failure"
+        raise
     finally:
         try:
             audit_log(
                 AuditEvent(
-                    organization_id=project.organization_id,
+                    organization_id=api_key.organization_id,
                     actor_type="api_key",
-                    actor_api_key_id=getattr(ctx, "api_key", None).id if getattr(ctx, "api_key", None) else None,
-                    action="job_run.ingest",
+                    actor_api_key_id=api_key.id,
+                    action="job_run.ingest_batch",
                     status=audit_status,
                     resource_type="job_run",
                     request_id=ctx.request_id if hasattr(ctx, "request_id") else None,
-                    metadata={"project_id": str(project.id)},
+                    metadata={
+                        "project_id": str(api_key.project_id),
+                        "items": len(payload.runs),
+                        "created": outcome.created,
+                        "updated": outcome.updated,
+                        "unchanged": outcome.unchanged,
+                        "errors": outcome.errors,
+                    },
                 ),
                 db,
             )
@@ -190,16 +401,222 @@ def ingest_job_run(
             pass
 
 
+NDJSON_CONTENT_TYPES = {"application/x-ndjson", "application/ndjson", "application/jsonl"}
+
+
+@router.post("/stream")
+async def ingest_job_run_stream(
+    request: Request,
+    db: Session = Depends(get_db),
+    api_key: ApiKeyIdentity = Depends(get_api_key),
+    ctx=Depends(get_request_context),
+):
+    """
+    Ingest NDJSON (one JobRunCreate per line) or a MessagePack sequence of
+    JobRunCreate maps, optionally gzip/zstd encoded, from the request stream.
+
+    Lines are parsed incrementally and written ``INGEST_STREAM_CHUNK_ROWS`` per
+    transaction, so memory stays flat regardless of upload size. The response
+    is NDJSON: one result per non-empty input line or MessagePack object
+    (``index`` is its 0-based position), in order, followed by a ``{"summary": ...}`` line. Processing
+    stops at the first chunk rejected by the rate limiter; the summary then
+    carries its ``detail``.
+    """
+    content_type = content_type_of(request)
+    if content_type in MSGPACK_CONTENT_TYPES:
+        splitter = MsgpackSplitter(settings.ingest_stream_max_line_bytes)
+    elif content_type in NDJSON_CONTENT_TYPES:
+        splitter = LineSplitter(settings.ingest_stream_max_line_bytes)
+    else:
+        raise HTTPException(
+            status_code=status.HTTP_415_UNSUPPORTED_MEDIA_TYPE,
+            detail="Expected application/x-ndjson or application/msgpack",
+        )
+    # No total cap: the upload is consumed incrementally, only the ratio is bounded
+    decoder = StreamDecompressor(
+        request.headers.get("content-encoding"), max_ratio=settings.ingest_max_compression_ratio
+    )
+    # Results are spooled (memory first, then disk) and streamed back once the upload is consumed
+    spool = SpooledTemporaryFile(max_size=settings.ingest_stream_spool_bytes, mode="w+b")
+    outcome = JobRunBatchResult(results=[])
+    aborted: Optional[str] = None
+    line_count = 0
+    pending_lines: list[int] = []
+    pending_raws: list[Any] = []
+    pending_errors: dict[int, str] = {}
+
+    def _add(line: bytes | LineTooLong | Decoded) -> None:
+        nonlocal line_count
+        position = len(pending_raws)
+        if isinstance(line, LineTooLong):
+            pending_errors[position] = f"Line exceeds {settings.ingest_stream_max_line_bytes} bytes"
+            pending_raws.append(None)
+        elif isinstance(line, Decoded):
+            pending_raws.append(line.value)
+        elif not line.strip():
+            return
+        else:
+            try:
+                pending_raws.append(json.loads(line))
+            except ValueError as exc:
+                pending_errors[position] = f"Invalid JSON: {exc}"
+                pending_raws.append(None)
+        pending_lines.append(line_count)
+        line_count += 1
+
+    def _flush() -> None:
+        nonlocal aborted
+        if not pending_raws:
+            return
+        items, errors = _prepare_runs(db, api_key, pending_raws)
+        for position, detail in pending_errors.items():
+            items[position] = None
+            errors[position] = detail
+        try:
+            results, _ = _write_runs(db, api_key, items, errors, ctx)
+        except HTTPException as exc:
+            aborted = str(exc.detail)
+            results = [
+                JobRunBatchItemResult(index=position, status="error", detail=aborted) for position in range(len(items))
+            ]
+        _count(outcome, results)
+        for line_number, result in zip(pending_lines, results):
+            result.index = line_number
+            spool.write(result.model_dump_json().encode("utf-8") + b"\n")
+        pending_lines.clear()
+        pending_raws.clear()
+        pending_errors.clear()
+
+    audit_status = "success"
+    try:
+        async for chunk in request.stream():
+            for data in decoder.feed(chunk):
+                for line in splitter.feed(data):
+                    _add(line)
+                    if len(pending_raws) >= settings.ingest_stream_chunk_rows:
+                        await run_in_threadpool(_flush)
+                        if aborted:
+                            break
+                if aborted:
+                    break
+            if aborted:
+                break
+        if not aborted:
+            for data in decoder.finish():
+                for line in splitter.feed(data):
+                    _add(line)
+            tail = splitter.finish()
+            if tail is not None:
+                _add(tail)
+            await run_in_threadpool(_flush)
+    except HTTPException:
+        audit_status = "failure"
+        spool.close()
+        raise
+    finally:
+        summary = {
+            "lines": line_count,
+            "created": outcome.created,
+            "updated": outcome.updated,
+            "unchanged": outcome.unchanged,
+            "errors": outcome.errors,
+        }
+        if aborted:
+            audit_status = "failure"
+        await run_in_threadpool(
+            audit_log,
+            AuditEvent(
+                organization_id=api_key.organization_id,
+                actor_type="api_key",
+                actor_api_key_id=api_key.id,
+                action="job_run.ingest_stream",
+                status=audit_status,
+                resource_type="job_run",
+                request_id=ctx.request_id if hasattr(ctx, "request_id") else None,
+                metadata={"project_id": str(api_key.project_id), **summary},
+            ),
+            db,
+        )
+
+    spool.write(json.dumps({"summary": {**summary, "detail": aborted}}).encode("utf-8") + b"\n")
+    spool.seek(0)
+
+    def _drain():
+        try:
+            while True:
+                block = spool.read(64 * 1024)
+                if not block:
+                    break
+                yield block
+        finally:
+            spool.close()
+
+    return StreamingResponse(_drain(), media_type="application/x-ndjson")
+
+
 @router.get("/", response_model=list[JobRunRead])
 @router.get("", response_model=list[JobRunRead])
 def list_runs(
+    response: Response,
+    project_id: UUID | None = None,
+    start: datetime | None = None,
+    end: datetime | None = None,
+    cursor: str | None = None,
+    limit: int = Query(DEFAULT_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE),
+    db: Session = Depends(get_db),
+    user=Depends(get_current_user),
+):
+    runs, next_cursor = list_job_runs(
+        db,
+        organization_id=user.organization_id,
+        project_id=project_id,
+        start=start,
+        end=end,
+        limit=limit,
+        cursor=cursor,
+    )
+    set_next_cursor(response, next_cursor)
+    return runs
+
+
+@router.get("/export")
+def export_runs(
+    format: str = Query("csv", pattern="^(csv|ndjson|parquet)$"),
     project_id: UUID | None = None,
     start: datetime | None = None,
     end: datetime | None = None,
+    tag: list[str] = Query(default=[]),
     db: Session = Depends(get_db),
     user=Depends(get_current_user),
+    ctx=Depends(get_request_context),
 ):
-    return list_job_runs(db, organization_id=user.organization_id, project_id=project_id, start=start, end=end)
+    """Stream every matching run with energy, cost and hardware as CSV, NDJSON or Parquet."""
+    tags = parse_tag_filters(tag)
+    stmt = build_export_statement(user.organization_id, project_id=project_id, start=start, end=end, tags=tags)
+    audit_log(
+        AuditEvent(
+            organization_id=user.organization_id,
+            actor_type="user",
+            actor_user_id=user.id,
+            action="job_run.export",
+            resource_type="project" if project_id else None,
+            resource_id=project_id,
+            request_id=ctx.request_id,
+            metadata={
+                "format": format,
+                "start": start.isoformat() if start else None,
+                "end": end.isoformat() if end else None,
+                "tags": tags,
+            },
+        ),
+        db,
+    )
+    media_type, extension = EXPORT_FORMATS[format]
+    return StreamingResponse(
+        export_job_runs(db, format, stmt),
+        media_type=media_type,
+        headers={"Content-Disposition": f'attachment; filename="job-runs.{extension}"'},
+    )
 
 
 @router.get("/{job_run_id}", response_model=JobRunDetail)
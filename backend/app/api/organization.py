@@ -33,6 +33,8 @@ def update_org(
         org.name = payload.name
     if payload.region_preference:
         org.region_preference = payload.region_preference
+    if payload.audit_retention_days is not None:
+        org.audit_retention_days = payload.audit_retention_days
     db.add(org)
-    db.flush()
+    db.commit()
     return org
@@ -1,5 +1,5 @@
 """Project management routes."""
-from fastapi import APIRouter, Depends
+from fastapi import APIRouter, Depends, Query, Response
 from sqlalchemy.orm import Session
 
 from backend.app.auth.deps import get_current_user, require_roles
@@ -11,10 +11,12 @@ from backend.app.services.project_service import (
     create_project,
     list_projects,
     list_api_keys_for_org,
+    revoke_api_key,
     unblock_api_key,
 )
 from backend.app.services.audit_service import audit_log, AuditEvent
 from backend.app.auth.context import get_request_context
+from backend.app.utils.pagination import DEFAULT_PAGE_SIZE, MAX_PAGE_SIZE, set_next_cursor
 
 
 router = APIRouter()
@@ -28,6 +30,7 @@ def _create_project_logic(
 ):
     """Create a project for the current organization."""
     project = create_project(db, user.organization_id, payload)
+    db.commit()
     audit_log(
         AuditEvent(
             organization_id=user.organization_id,
@@ -43,9 +46,11 @@ def _create_project_logic(
     return project
 
 
-def _list_projects_logic(db: Session, user):
-    """List projects for the organization."""
-    return list_projects(db, user.organization_id)
+def _list_projects_logic(db: Session, user, response: Response, cursor=None, limit: int = DEFAULT_PAGE_SIZE):
+    """List one page of projects for the organization."""
+    projects, next_cursor = list_projects(db, user.organization_id, cursor=cursor, limit=limit)
+    set_next_cursor(response, next_cursor)
+    return projects
 
 
 @router.post("/", response_model=ProjectRead)
@@ -63,10 +68,14 @@ def create_project_endpoint(
 @router.get("/", response_model=list[ProjectRead])
 @router.get("", response_model=list[ProjectRead])
 def list_project_endpoint(
-    db: Session = Depends(get_db), user=Depends(get_current_user)
+    response: Response,
+    cursor: str | None = None,
+    limit: int = Query(DEFAULT_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE),
+    db: Session = Depends(get_db),
+    user=Depends(get_current_user),
 ):
     """List projects for the organization."""
-    return _list_projects_logic(db, user)
+    return _list_projects_logic(db, user, response, cursor=cursor, limit=limit)
 
 
 @router.post("/api-keys", response_model=ApiKeyRead)
@@ -78,6 +87,7 @@ def create_api_key_endpoint(
 ):
     """Create API key."""
     api_key, raw_key = create_api_key(db, user.id, user.organization_id, payload)
+    db.commit()
     api_key.raw_key = raw_key  # type: ignore[attr-defined]
     audit_log(
         AuditEvent(
@@ -95,9 +105,17 @@ def create_api_key_endpoint(
 
 
 @router.get("/api-keys", response_model=list[ApiKeyRead])
-def list_api_keys_endpoint(db: Session = Depends(get_db), user=Depends(get_current_user)):
+def list_api_keys_endpoint(
+    response: Response,
+    cursor: str | None = None,
+    limit: int = Query(DEFAULT_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE),
+    db: Session = Depends(get_db),
+    user=Depends(get_current_user),
+):
     """List API keys for the organization."""
-    return list_api_keys_for_org(db, user.organization_id)
+    keys, next_cursor = list_api_keys_for_org(db, user.organization_id, cursor=cursor, limit=limit)
+    set_next_cursor(response, next_cursor)
+    return keys
 
 
 @router.post("/api-keys/{api_key_id}/unblock", response_model=ApiKeyRead)
@@ -109,6 +127,7 @@ def unblock_api_key_endpoint(
 ):
     """Unblock an API key after abuse protection."""
     key = unblock_api_key(db, user.organization_id, api_key_id)
+    db.commit()
     audit_log(
         AuditEvent(
             organization_id=user.organization_id,
@@ -122,3 +141,28 @@ def unblock_api_key_endpoint(
         db,
     )
     return key
+
+
+@router.post("/api-keys/{api_key_id}/revoke", response_model=ApiKeyRead)
+def revoke_api_key_endpoint(
+    api_key_id: str,
+    db: Session = Depends(get_db),
+    user=Depends(require_roles("owner", "admin")),
+    ctx=Depends(get_request_context),
+):
+    """Revoke an API key; cached verifications are dropped on every worker."""
+    key = revoke_api_key(db, user.organization_id, api_key_id)
+    db.commit()
+    audit_log(
+        AuditEvent(
+            organization_id=user.organization_id,
+            actor_type="user",
+            actor_user_id=user.id,
+            action="api_key.revoke",
+            resource_type="api_key",
+            resource_id=key.id,
+            request_id=ctx.request_id,
+        ),
+        db,
+    )
+    return key
@@ -1,6 +1,6 @@
 """Report routes."""
 from datetime import datetime
-from fastapi import APIRouter, Depends, HTTPException, Response
+from fastapi import APIRouter, Depends, HTTPException, Query, Response
 from fastapi.responses import FileResponse
 from sqlalchemy.orm import Session
 
@@ -13,6 +13,7 @@ from backend.app.services.job_service import get_job_run
 from backend.app.models.project import Project
 from backend.app.auth.context import get_request_context
 from backend.app.services.audit_service import audit_log, AuditEvent
+from backend.app.utils.pagination import DEFAULT_PAGE_SIZE, MAX_PAGE_SIZE, paginate, set_next_cursor
 
 
 router = APIRouter()
@@ -20,13 +21,18 @@ router = APIRouter()
 
 @router.get("/", response_model=list[ReportRead])
 @router.get("", response_model=list[ReportRead])
-def list_reports(db: Session = Depends(get_db), user=Depends(get_current_user)):
+def list_reports(
+    response: Response,
+    cursor: str | None = None,
+    limit: int = Query(DEFAULT_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE),
+    db: Session = Depends(get_db),
+    user=Depends(get_current_user),
+):
     """List reports for organization."""
-    return (
-        db.query(Report)
-        .filter(Report.organization_id == user.organization_id)
-        .all()
-    )
+    q = db.query(Report).filter(Report.organization_id == user.organization_id)
+    reports, next_cursor = paginate(q, Report.created_at, Report.id, cursor=cursor, limit=limit)
+    set_next_cursor(response, next_cursor)
+    return reports
 
 
 @router.post("/job-run/{job_run_id}", response_model=ReportRead)
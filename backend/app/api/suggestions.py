@@ -1,11 +1,12 @@
 """Suggestion endpoints."""
 from datetime import timedelta
-from fastapi import APIRouter, Depends, HTTPException
+from fastapi import APIRouter, Depends, HTTPException, Query, Response
 from sqlalchemy.orm import Session
 
 from backend.app.auth.deps import get_current_user, require_roles
 from backend.app.auth.context import get_request_context
 from backend.app.core.database import get_db
+from backend.app.models.project import Project
 from backend.app.models.suggestion import OptimizationSuggestion
 from backend.app.schemas.suggestion import SuggestionRead
 from backend.app.services.suggestion_service import (
@@ -15,6 +16,7 @@ from backend.app.services.suggestion_service import (
 )
 from backend.app.services.job_service import get_job_run
 from backend.app.services.audit_service import audit_log, AuditEvent
+from backend.app.utils.pagination import DEFAULT_PAGE_SIZE, MAX_PAGE_SIZE, paginate, set_next_cursor
 
 
 router = APIRouter()
@@ -22,14 +24,24 @@ router = APIRouter()
 
 @router.get("/", response_model=list[SuggestionRead])
 @router.get("", response_model=list[SuggestionRead])
-def list_suggestions(db: Session = Depends(get_db), user=Depends(get_current_user)):
+def list_suggestions(
+    response: Response,
+    cursor: str | None = None,
+    limit: int = Query(DEFAULT_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE),
+    db: Session = Depends(get_db),
+    user=Depends(get_current_user),
+):
     """List suggestions for organization."""
-    return (
+    q = (
         db.query(OptimizationSuggestion)
         .join(OptimizationSuggestion.project)
-        .filter(OptimizationSuggestion.project.has(organization_id=user.organization_id))
-        .all()
+        .filter(Project.organization_id == user.organization_id)
     )
+    suggestions, next_cursor = paginate(
+        q, OptimizationSuggestion.created_at, OptimizationSuggestion.id, cursor=cursor, limit=limit
+    )
+    set_next_cursor(response, next_cursor)
+    return suggestions
 
 
 @router.get("/job-runs/{job_run_id}", response_model=list[SuggestionRead])
@@ -1,6 +1,5 @@
 """System endpoints: health, readiness, metrics, dev seed."""
 from datetime import datetime, timedelta
-import uuid
 
 from fastapi import APIRouter, Depends, HTTPException, Response
 from fastapi.responses import PlainTextResponse
@@ -13,11 +12,12 @@ from backend.app.core.database import get_db
 from backend.app.models.organization import Organization
 from backend.app.models.project import Project
 from backend.app.models.api_key import ApiKey
-from backend.app.auth.security import get_password_hash
+from backend.app.auth.api_keys import generate_api_key, hash_api_key
 from backend.app.services.audit_service import audit_log, AuditEvent
 from backend.app.services.job_service import upsert_job_run
 from backend.app.schemas.job_run import JobRunCreate
 from backend.app.observability.metrics import registry
+from backend.app.services.ingest_queue import ingest_queue
 
 settings = get_settings()
 router = APIRouter(tags=["system"])
@@ -43,6 +43,7 @@ def readyz(db: Session = Depends(get_db), response: Response = None):
 def metrics():
     if not settings.enable_metrics:
         raise HTTPException(status_code=404, detail="metrics disabled")
+    ingest_queue.refresh_metrics()
     return PlainTextResponse(generate_latest(registry), media_type="text/plain; version=0.0.4")
 
 
@@ -65,12 +66,14 @@ def dev_seed(db: Session = Depends(get_db)):
         db.add(project)
         db.flush()
     # create api key
-    api_key_value = f"gai_dev_{uuid.uuid4().hex[:12]}"
-    hashed = get_password_hash(api_key_value)
+    key_id, api_key_value = generate_api_key()
+    hash_scheme, hashed = hash_api_key(api_key_value)
     key = ApiKey(
         name="dev seed key",
         hashed_key=hashed,
+        hash_scheme=hash_scheme,
         key_prefix=api_key_value[:12],
+        key_id=key_id,
         organization_id=org.id,
         project_id=project.id,
         scopes=["ingest"],
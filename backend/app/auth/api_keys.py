@@ -0,0 +1,410 @@
+"""API key verification with a process-local cache of resolved keys.
+
+Tokens embed a non-secret key id (``gai_<key_id>_<secret>``) that maps to
+at most one ``api_keys`` row through a unique index, so resolving any
+token - valid or not - verifies against a single hash. Legacy tokens use
+their first 12 characters (the old ``key_prefix``) as the key id.
+
+Keys are random 192-bit tokens, so they are stored as an HMAC-SHA256
+digest under a server-side pepper rather than with a password KDF; the
+scheme is recorded per row and legacy bcrypt hashes are replaced by the
+HMAC digest on their next successful verification.
+
+A bcrypt verification costs 100-300 ms of CPU, so a verified key is also
+cached under a keyed digest of the raw token for a short TTL. Any change that
+affects authorization (revoke, unblock, abuse block) invalidates the
+entry locally and, when Redis is reachable, on every other worker via
+pub/sub.
+
+SDKs can also exchange a key for a short-lived signed ingest token, which
+is authorized from its claims alone. Revocations and abuse blocks reach
+those tokens through a small deny-list that a background thread reloads
+from the database.
+"""
+from __future__ import annotations
+
+import hashlib
+import hmac
+import logging
+import re
+import secrets
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import dataclass, replace
+from datetime import datetime, timedelta, timezone
+from typing import Optional
+from uuid import UUID
+
+import redis
+from jose import JWTError
+from sqlalchemy import and_, event, or_
+from sqlalchemy.orm import Session
+
+from backend.app.auth.security import create_access_token, decode_internal_token, verify_password
+from backend.app.core.config import get_settings
+from backend.app.core.database import get_db_session
+from backend.app.models.api_key import ApiKey
+
+logger = logging.getLogger(__name__)
+settings = get_settings()
+
+INVALIDATION_CHANNEL = "greenai:api_keys:invalidate"
+_PENDING_INVALIDATIONS = "api_key_invalidations"
+
+KEY_PREFIX = "gai_"
+LEGACY_KEY_ID_LENGTH = 12
+
+INGEST_TOKEN_TYPE = "ingest"
+
+HASH_SCHEME_HMAC = "hmac-sha256"
+HASH_SCHEME_BCRYPT = "bcrypt"
+_KEY_ID_RE = re.compile(r"gai_([0-9a-f]{16})_[A-Za-z0-9_-]+")
+
+
+def generate_api_key() -> tuple[str, str]:
+    """Return ``(key_id, raw_key)`` for a new API key."""
+    key_id = secrets.token_hex(8)
+    return key_id, f"{KEY_PREFIX}{key_id}_{secrets.token_urlsafe(24)}"
+
+
+def key_id_for(raw_key: str) -> str:
+    """Extract the lookup id embedded in a raw key (legacy keys: old prefix)."""
+    match = _KEY_ID_RE.fullmatch(raw_key)
+    if match:
+        return match.group(1)
+    return raw_key[:LEGACY_KEY_ID_LENGTH]
+
+
+def _pepper() -> bytes:
+    secret = settings.api_key_pepper or settings.jwt_secret_key
+    return secret.get_secret_value().encode("utf-8")
+
+
+def hash_api_key(raw_key: str) -> tuple[str, str]:
+    """Return ``(hash_scheme, hashed_key)`` for storing a raw key."""
+    return HASH_SCHEME_HMAC, hmac.new(_pepper(), raw_key.encode("utf-8"), hashlib.sha256).hexdigest()
+
+
+def check_api_key_hash(raw_key: str, hashed_key: Optional[str], scheme: Optional[str]) -> bool:
+    """Verify a raw key against a stored hash of the given scheme."""
+    if not hashed_key:
+        return False
+    if scheme == HASH_SCHEME_HMAC:
+        return hmac.compare_digest(hash_api_key(raw_key)[1], hashed_key)
+    return verify_password(raw_key, hashed_key)
+
+
+def _upgrade_hash(db: Session, key: ApiKey, raw_key: str) -> None:
+    """Replace a legacy hash with the HMAC scheme; best effort, never fails auth."""
+    scheme, hashed = hash_api_key(raw_key)
+    try:
+        (
+            db.query(ApiKey)
+            .filter(ApiKey.id == key.id, ApiKey.hash_scheme == key.hash_scheme)
+            .update({ApiKey.hashed_key: hashed, ApiKey.hash_scheme: scheme}, synchronize_session=False)
+        )
+        db.commit()
+    except Exception:
+        db.rollback()
+        logger.warning("API key hash upgrade failed for %s", key.id)
+
+
+@dataclass(frozen=True)
+class ApiKeyIdentity:
+    """Immutable snapshot of a verified API key (safe to share across requests)."""
+
+    id: UUID
+    project_id: UUID
+    organization_id: UUID
+    blocked_until: Optional[datetime] = None
+    scopes: tuple[str, ...] = ("ingest",)
+
+    @classmethod
+    def from_model(cls, key: ApiKey) -> "ApiKeyIdentity":
+        return cls(
+            id=key.id,
+            project_id=key.project_id,
+            organization_id=key.organization_id,
+            blocked_until=key.blocked_until,
+            scopes=tuple(key.scopes or ()),
+        )
+
+    def is_blocked(self, now: Optional[datetime] = None) -> bool:
+        if not self.blocked_until:
+            return False
+        blocked_until = self.blocked_until
+        if blocked_until.tzinfo is None:
+            blocked_until = blocked_until.replace(tzinfo=timezone.utc)
+        return blocked_until > (now or datetime.now(timezone.utc))
+
+
+class ApiKeyCache:
+    """TTL + size bounded map of digest(raw key) -> ApiKeyIdentity."""
+
+    def __init__(self, ttl_seconds: float, max_entries: int):
+        self.ttl_seconds = ttl_seconds
+        self.max_entries = max_entries
+        self._entries: "OrderedDict[str, tuple[float, ApiKeyIdentity]]" = OrderedDict()
+        self._digests_by_key: dict[UUID, set[str]] = {}
+        self._lock = threading.Lock()
+        self._pepper = _pepper()
+        self._redis = None
+        self._listener: Optional[threading.Thread] = None
+
+    def digest(self, raw_key: str) -> str:
+        return hmac.new(self._pepper, raw_key.encode("utf-8"), hashlib.sha256).hexdigest()
+
+    def get(self, raw_key: str) -> Optional[ApiKeyIdentity]:
+        if self.ttl_seconds <= 0:
+            return None
+        self._ensure_listener()
+        digest = self.digest(raw_key)
+        with self._lock:
+            entry = self._entries.get(digest)
+            if entry is None:
+                return None
+            expires_at, identity = entry
+            if expires_at < time.monotonic():
+                self._drop(digest, identity.id)
+                return None
+            self._entries.move_to_end(digest)
+            return identity
+
+    def put(self, raw_key: str, identity: ApiKeyIdentity) -> None:
+        if self.ttl_seconds <= 0:
+            return
+        digest = self.digest(raw_key)
+        with self._lock:
+            self._entries[digest] = (time.monotonic() + self.ttl_seconds, identity)
+            self._entries.move_to_end(digest)
+            self._digests_by_key.setdefault(identity.id, set()).add(digest)
+            while len(self._entries) > self.max_entries:
+                old_digest, (_, old_identity) = self._entries.popitem(last=False)
+                self._forget_digest(old_digest, old_identity.id)
+
+    def invalidate(self, api_key_id: UUID, broadcast: bool = True) -> None:
+        key_id = UUID(str(api_key_id))
+        with self._lock:
+            for digest in self._digests_by_key.pop(key_id, set()):
+                self._entries.pop(digest, None)
+        if broadcast and self._redis is not None:
+            try:
+                self._redis.publish(INVALIDATION_CHANNEL, str(key_id))
+            except Exception:
+                logger.warning("API key invalidation broadcast failed for %s", key_id)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+            self._digests_by_key.clear()
+
+    def _drop(self, digest: str, key_id: UUID) -> None:
+        self._entries.pop(digest, None)
+        self._forget_digest(digest, key_id)
+
+    def _forget_digest(self, digest: str, key_id: UUID) -> None:
+        digests = self._digests_by_key.get(key_id)
+        if digests is not None:
+            digests.discard(digest)
+            if not digests:
+                self._digests_by_key.pop(key_id, None)
+
+    def _ensure_listener(self) -> None:
+        if self._listener is not None:
+            return
+        with self._lock:
+            if self._listener is not None:
+                return
+            self._listener = threading.Thread(target=self._listen, name="api-key-cache-invalidation", daemon=True)
+            self._listener.start()
+
+    def _listen(self) -> None:
+        """Drop entries invalidated by other workers; retries while Redis is down."""
+        while True:
+            try:
+                client = redis.Redis.from_url(settings.redis_url, decode_responses=True)
+                pubsub = client.pubsub(ignore_subscribe_messages=True)
+                pubsub.subscribe(INVALIDATION_CHANNEL)
+                self._redis = client
+                for message in pubsub.listen():
+                    try:
+                        self.invalidate(UUID(message["data"]), broadcast=False)
+                    except (KeyError, TypeError, ValueError):
+                        continue
+                    ingest_deny_list.request_refresh()
+            except Exception:
+                if self._redis is not None:
+                    # Messages may have been missed while disconnected
+                    self.clear()
+                self._redis = None
+                # Without pub/sub the TTL still bounds staleness
+                logger.info("API key cache invalidation channel unavailable; retrying in 30s")
+                time.sleep(30)
+
+
+class IngestTokenDenyList:
+    """Keys whose unexpired ingest tokens must be refused (revoked or blocked).
+
+    Only keys revoked within one token lifetime, or currently blocked, can
+    have live tokens, so the set stays small. If the list cannot be
+    refreshed for several intervals, tokens are refused (fail closed) and
+    clients fall back to exchanging their API key again.
+    """
+
+    def __init__(self, refresh_seconds: float, token_ttl_seconds: float):
+        self.refresh_seconds = refresh_seconds
+        self.token_ttl_seconds = token_ttl_seconds
+        self._revoked: frozenset[UUID] = frozenset()
+        self._blocked: dict[UUID, datetime] = {}
+        self._loaded_at: Optional[float] = None
+        self._wake = threading.Event()
+        self._lock = threading.Lock()
+        self._refresher: Optional[threading.Thread] = None
+
+    def check(self, identity: ApiKeyIdentity) -> Optional[ApiKeyIdentity]:
+        """Return the identity (with any active block applied) or None if denied."""
+        self._ensure_refresher()
+        if self._loaded_at is None or time.monotonic() - self._loaded_at > 3 * self.refresh_seconds:
+            return None
+        if identity.id in self._revoked:
+            return None
+        blocked_until = self._blocked.get(identity.id)
+        if blocked_until is not None:
+            return replace(identity, blocked_until=blocked_until)
+        return identity
+
+    def refresh(self, db: Session) -> None:
+        now = datetime.now(timezone.utc)
+        cutoff = now - timedelta(seconds=self.token_ttl_seconds)
+        rows = (
+            db.query(ApiKey.id, ApiKey.active, ApiKey.revoked_at, ApiKey.blocked_until)
+            .filter(
+                or_(
+                    ApiKey.revoked_at >= cutoff,
+                    and_(ApiKey.active.is_(False), ApiKey.updated_at >= cutoff),
+                    ApiKey.blocked_until > now,
+                )
+            )
+            .all()
+        )
+        revoked = frozenset(row.id for row in rows if row.revoked_at is not None or not row.active)
+        blocked = {row.id: row.blocked_until for row in rows if row.blocked_until is not None and row.id not in revoked}
+        self._revoked, self._blocked = revoked, blocked
+        self._loaded_at = time.monotonic()
+
+    def request_refresh(self) -> None:
+        self._wake.set()
+
+    def _refresh_once(self) -> None:
+        try:
+            with get_db_session() as db:
+                self.refresh(db)
+        except Exception:
+            logger.warning("Ingest token deny-list refresh failed", exc_info=True)
+
+    def _ensure_refresher(self) -> None:
+        if self._refresher is not None:
+            return
+        with self._lock:
+            if self._refresher is not None:
+                return
+            # First load happens inline so a fresh process can accept tokens immediately
+            self._refresh_once()
+            self._refresher = threading.Thread(target=self._run, name="ingest-token-deny-list", daemon=True)
+            self._refresher.start()
+
+    def _run(self) -> None:
+        while True:
+            self._wake.wait(self.refresh_seconds)
+            self._wake.clear()
+            self._refresh_once()
+
+
+api_key_cache = ApiKeyCache(
+    ttl_seconds=settings.api_key_cache_ttl_seconds,
+    max_entries=settings.api_key_cache_max_entries,
+)
+ingest_deny_list = IngestTokenDenyList(
+    refresh_seconds=settings.ingest_token_denylist_refresh_seconds,
+    token_ttl_seconds=settings.ingest_token_expire_seconds,
+)
+
+
+def invalidate_api_key_on_commit(db: Session, api_key_id: UUID) -> None:
+    """Drop the cached key now and again once the session commits the change."""
+    api_key_cache.invalidate(api_key_id, broadcast=False)
+    db.info.setdefault(_PENDING_INVALIDATIONS, set()).add(UUID(str(api_key_id)))
+
+
+@event.listens_for(Session, "after_commit")
+def _flush_api_key_invalidations(session: Session) -> None:
+    pending = session.info.pop(_PENDING_INVALIDATIONS, ())
+    for key_id in pending:
+        api_key_cache.invalidate(key_id)
+    if pending:
+        ingest_deny_list.request_refresh()
+
+
+@event.listens_for(Session, "after_rollback")
+def _discard_api_key_invalidations(session: Session) -> None:
+    session.info.pop(_PENDING_INVALIDATIONS, None)
+
+
+def verify_api_key(db: Session, raw_key: str) -> Optional[ApiKeyIdentity]:
+    """Resolve a raw ``gai_`` key to its identity; hashes only on cache miss."""
+    if not raw_key:
+        return None
+    identity = api_key_cache.get(raw_key)
+    if identity is not None:
+        return identity
+
+    key = (
+        db.query(ApiKey)
+        .filter(ApiKey.key_id == key_id_for(raw_key))
+        .filter(ApiKey.revoked_at.is_(None), ApiKey.active.is_(True))
+        .one_or_none()
+    )
+    if key is None or not check_api_key_hash(raw_key, key.hashed_key, key.hash_scheme):
+        return None
+    identity = ApiKeyIdentity.from_model(key)
+    if key.hash_scheme != HASH_SCHEME_HMAC:
+        _upgrade_hash(db, key, raw_key)
+    api_key_cache.put(raw_key, identity)
+    return identity
+
+
+def issue_ingest_token(identity: ApiKeyIdentity) -> tuple[str, int]:
+    """Sign a short-lived ingest token for a verified key; returns ``(token, expires_in)``."""
+    expires_in = settings.ingest_token_expire_seconds
+    token = create_access_token(
+        subject=str(identity.id),
+        expires_delta=timedelta(seconds=expires_in),
+        additional_claims={
+            "typ": INGEST_TOKEN_TYPE,
+            "project_id": str(identity.project_id),
+            "org_id": str(identity.organization_id),
+            "scopes": list(identity.scopes),
+        },
+    )
+    return token, expires_in
+
+
+def decode_ingest_token(token: str) -> Optional[ApiKeyIdentity]:
+    """Authorize an ingest token from its signature and claims; no database access."""
+    try:
+        claims = decode_internal_token(token)
+    except JWTError:
+        return None
+    if claims.get("typ") != INGEST_TOKEN_TYPE:
+        return None
+    try:
+        identity = ApiKeyIdentity(
+            id=UUID(claims["sub"]),
+            project_id=UUID(claims["project_id"]),
+            organization_id=UUID(claims["org_id"]),
+            scopes=tuple(claims.get("scopes") or ()),
+        )
+    except (KeyError, TypeError, ValueError):
+        return None
+    return ingest_deny_list.check(identity)
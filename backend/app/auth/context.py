@@ -8,8 +8,7 @@ from typing import Optional
 from fastapi import Depends, Header, Request
 
 from backend.app.auth.deps import Principal, get_current_user, bearer_scheme, _get_bearer_token, _decode_claims
-from backend.app.models.api_key import ApiKey
-from backend.app.auth.security import verify_password
+from backend.app.auth.api_keys import ApiKeyIdentity, decode_ingest_token, verify_api_key
 from backend.app.core.database import get_db
 from sqlalchemy.orm import Session
 from fastapi import HTTPException, status
@@ -21,31 +20,37 @@ class RequestContext:
     ip: str | None
     user_agent: str | None
     user: Optional[Principal] = None
-    api_key: Optional[ApiKey] = None
+    api_key: Optional[ApiKeyIdentity] = None
 
 
-def _extract_api_key(x_api_key: str, db: Session) -> ApiKey | None:
-    if not x_api_key:
-        return None
-    prefix = x_api_key[:12]
-    candidates = (
-        db.query(ApiKey)
-        .filter(ApiKey.revoked_at.is_(None), ApiKey.active.is_(True))
-        .filter(ApiKey.key_prefix == prefix)
-        .all()
-    )
-    if not candidates:
-        candidates = db.query(ApiKey).filter(ApiKey.revoked_at.is_(None), ApiKey.active.is_(True)).all()
-    for k in candidates:
-        if verify_password(x_api_key, k.hashed_key):
-            return k
-    return None
+def resolve_api_key(
+    request: Request,
+    x_api_key: str = Header(default="", alias="X-API-Key"),
+    authorization: str = Header(default="", alias="Authorization"),
+    db: Session = Depends(get_db),
+) -> ApiKeyIdentity | None:
+    """Resolve the calling API key once per request.
+
+    Accepts a raw ``X-API-Key`` or a ``Bearer`` ingest token exchanged from
+    one (the latter is authorized without touching the database). FastAPI
+    caches this dependency for the request, and the result is kept on
+    ``request.state.api_key`` so project checks, rate limiting, the request
+    context and audit logging all share one verification.
+    """
+    if hasattr(request.state, "api_key"):
+        return request.state.api_key
+    api_key = None
+    if x_api_key.startswith("gai_"):
+        api_key = verify_api_key(db, x_api_key)
+    elif authorization[:7].lower() == "bearer ":
+        api_key = decode_ingest_token(authorization[7:].strip())
+    request.state.api_key = api_key
+    return api_key
 
 
 async def get_request_context(
     request: Request,
-    db: Session = Depends(get_db),
-    x_api_key: str = Header(default="", alias="X-API-Key"),
+    api_key_obj: ApiKeyIdentity | None = Depends(resolve_api_key),
 ) -> RequestContext:
     # request id from middleware or header
     request_id = getattr(request.state, "request_id", None) or request.headers.get("X-Request-ID") or str(uuid.uuid4())
@@ -53,7 +58,6 @@ async def get_request_context(
     ip = request.client.host if request.client else None
     ua = request.headers.get("User-Agent")
 
-    api_key_obj = _extract_api_key(x_api_key, db)
     user_obj = None
 
     # Try bearer token if present and no api key found
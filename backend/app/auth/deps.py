@@ -21,6 +21,7 @@ from fastapi import Depends, HTTPException, status
 from fastapi.security import HTTPAuthorizationCredentials, HTTPBearer
 from jose import JWTError
 
+from backend.app.auth.api_keys import INGEST_TOKEN_TYPE
 from backend.app.auth.security import decode_internal_token, decode_supabase_jwt
 from backend.app.models.organization_member import OrganizationMember
 
@@ -52,7 +53,7 @@ def _get_bearer_token(creds: Optional[HTTPAuthorizationCredentials]) -> str:
 
 def _decode_claims(token: str):
     try:
-        return decode_internal_token(token)
+        claims = decode_internal_token(token)
     except JWTError as internal_error:
         try:
             return decode_supabase_jwt(token)
@@ -62,6 +63,13 @@ def _decode_claims(token: str):
                 status_code=status.HTTP_401_UNAUTHORIZED,
                 detail="Invalid or expired token",
             )
+    if claims.get("typ") == INGEST_TOKEN_TYPE:
+        # Ingest tokens authenticate an API key, never a user
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="Invalid or expired token",
+        )
+    return claims
 
 
 def _fetch_org_role(user_id: str) -> tuple[Optional[str], Optional[str]]:
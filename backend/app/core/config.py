@@ -31,6 +31,17 @@ class Settings(BaseSettings):
     jwt_algorithm: str = Field(default="HS256", alias="JWT_ALGORITHM")
     access_token_expire_minutes: int = Field(default=60 * 24, alias="ACCESS_TOKEN_EXPIRE_MINUTES")
 
+    # Pepper for HMAC-hashed API keys (falls back to JWT_SECRET_KEY; changing it invalidates HMAC keys)
+    api_key_pepper: SecretStr | None = Field(default=None, alias="API_KEY_PEPPER")
+
+    # Verified API key cache (0 disables)
+    api_key_cache_ttl_seconds: int = Field(default=60, alias="API_KEY_CACHE_TTL_SECONDS")
+    api_key_cache_max_entries: int = Field(default=10000, alias="API_KEY_CACHE_MAX_ENTRIES")
+
+    # Short-lived ingest tokens exchanged from an API key
+    ingest_token_expire_seconds: int = Field(default=900, alias="INGEST_TOKEN_EXPIRE_SECONDS")
+    ingest_token_denylist_refresh_seconds: int = Field(default=15, alias="INGEST_TOKEN_DENYLIST_REFRESH_SECONDS")
+
     # Redis (safe default so app boots even if redis not configured)
     redis_url: str = Field(default="redis://localhost:6379/0", alias="REDIS_URL")
 
@@ -44,16 +55,96 @@ class Settings(BaseSettings):
     supabase_jwt_audience: str | None = Field(default=None, alias="SUPABASE_JWT_AUD")
     supabase_jwt_issuer: str | None = Field(default=None, alias="SUPABASE_JWT_ISS")
 
-    # Workers / compute
+    # Workers / compute: SYNC_COMPUTE computes ingested runs in the API process; false hands them to
+    # the worker tier through the outbox, as EMISSIONS_QUEUE_ENABLED does
     sync_compute: bool = Field(default=True, alias="SYNC_COMPUTE")
+    # Emissions engine: intensity for regions without a factor, optional region→g/kWh overrides
+    # (JSON object), and the power assumptions used when a finished run reports no energy
+    default_carbon_intensity_g_per_kwh: float = Field(default=400.0, alias="DEFAULT_CARBON_INTENSITY_G_PER_KWH")
+    carbon_intensity_map_json: str = Field(default="", alias="CARBON_INTENSITY_MAP_JSON")
+    default_cpu_w_per_core: float = Field(default=10.0, alias="DEFAULT_CPU_W_PER_CORE")
+    default_gpu_w: float = Field(default=150.0, alias="DEFAULT_GPU_W")
+    default_base_overhead_w: float = Field(default=30.0, alias="DEFAULT_BASE_OVERHEAD_W")
+    # How often a process checks region_emission_factors for changes (lookups are always in-memory)
+    emission_factor_refresh_seconds: int = Field(default=60, alias="EMISSION_FACTOR_REFRESH_SECONDS")
+    # Integrate runs against hourly grid intensity (grid_intensity_days) where the series covers them
+    grid_intensity_enabled: bool = Field(default=True, alias="GRID_INTENSITY_ENABLED")
+    # Bulk recompute (python -m backend.app.workers.recompute_emissions, /api/emissions/recompute):
+    # runs per chunk, throughput ceiling, and when a silent running job may be taken over
+    recompute_chunk_rows: int = Field(default=1000, alias="RECOMPUTE_CHUNK_ROWS")
+    recompute_max_rows_per_second: int = Field(default=2000, alias="RECOMPUTE_MAX_ROWS_PER_SECOND")
+    recompute_stale_seconds: int = Field(default=300, alias="RECOMPUTE_STALE_SECONDS")
+    # Queued compute: with EMISSIONS_QUEUE_ENABLED (or SYNC_COMPUTE off) ingest adds runs to the outbox,
+    # relays mark them pending in Redis (repeats within EMISSIONS_QUEUE_DEBOUNCE_MS coalesce) and batch
+    # workers (worker.py --batch) compute them EMISSIONS_QUEUE_BATCH_SIZE at a time
+    emissions_queue_enabled: bool = Field(default=False, alias="EMISSIONS_QUEUE_ENABLED")
+    emissions_queue_debounce_ms: int = Field(default=5000, alias="EMISSIONS_QUEUE_DEBOUNCE_MS")
+    # Runs per deficit-round-robin turn per unit of plan weight when organizations compete
+    emissions_queue_quantum: int = Field(default=50, alias="EMISSIONS_QUEUE_QUANTUM")
+    # Outbox relay (python -m backend.app.workers.outbox_relay): rows per locked batch, idle poll
+    outbox_batch_size: int = Field(default=1000, alias="OUTBOX_BATCH_SIZE")
+    outbox_poll_ms: int = Field(default=250, alias="OUTBOX_POLL_MS")
+    emissions_queue_stream: str = Field(default="greenai:emissions:job_runs", alias="EMISSIONS_QUEUE_STREAM")
+    emissions_queue_group: str = Field(default="emissions-workers", alias="EMISSIONS_QUEUE_GROUP")
+    emissions_queue_batch_size: int = Field(default=500, alias="EMISSIONS_QUEUE_BATCH_SIZE")
+    emissions_queue_block_ms: int = Field(default=1000, alias="EMISSIONS_QUEUE_BLOCK_MS")
+    emissions_queue_claim_idle_ms: int = Field(default=60000, alias="EMISSIONS_QUEUE_CLAIM_IDLE_MS")
+    # Worker supervisor (python -m backend.app.workers.supervisor): processes per queue (emissions 0 =
+    # one per core), batches read ahead, tasks before a process is replaced, SIGTERM drain deadline
+    worker_emissions_processes: int = Field(default=0, alias="WORKER_EMISSIONS_PROCESSES")
+    worker_rq_processes: int = Field(default=1, alias="WORKER_RQ_PROCESSES")
+    worker_outbox_processes: int = Field(default=1, alias="WORKER_OUTBOX_PROCESSES")
+    worker_prefetch_batches: int = Field(default=1, alias="WORKER_PREFETCH_BATCHES")
+    worker_max_tasks: int = Field(default=1000, alias="WORKER_MAX_TASKS")
+    worker_shutdown_grace_seconds: int = Field(default=60, alias="WORKER_SHUTDOWN_GRACE_SECONDS")
+
+    # Ingest
+    ingest_batch_max_items: int = Field(default=500, alias="INGEST_BATCH_MAX_ITEMS")
+    # Decoded (gzip/zstd) ingest body limits: total size for single/batch bodies, ratio for all
+    ingest_max_body_bytes: int = Field(default=32 * 1024 * 1024, alias="INGEST_MAX_BODY_BYTES")
+    ingest_max_compression_ratio: float = Field(default=100.0, alias="INGEST_MAX_COMPRESSION_RATIO")
+    # NDJSON stream ingest: rows per transaction, longest accepted line, result spool kept in memory
+    ingest_stream_chunk_rows: int = Field(default=500, alias="INGEST_STREAM_CHUNK_ROWS")
+    ingest_stream_max_line_bytes: int = Field(default=1024 * 1024, alias="INGEST_STREAM_MAX_LINE_BYTES")
+    ingest_stream_spool_bytes: int = Field(default=1024 * 1024, alias="INGEST_STREAM_SPOOL_BYTES")
+    # Async ingest (Prefer: respond-async): Redis Stream drained by the ingest consumer
+    ingest_queue_stream: str = Field(default="greenai:ingest:job_runs", alias="INGEST_QUEUE_STREAM")
+    ingest_queue_group: str = Field(default="ingest-writers", alias="INGEST_QUEUE_GROUP")
+    ingest_queue_batch_size: int = Field(default=500, alias="INGEST_QUEUE_BATCH_SIZE")
+    ingest_queue_block_ms: int = Field(default=1000, alias="INGEST_QUEUE_BLOCK_MS")
+    ingest_queue_claim_idle_ms: int = Field(default=60000, alias="INGEST_QUEUE_CLAIM_IDLE_MS")
+    # Above this backlog async requests are ingested synchronously instead (backpressure)
+    ingest_queue_max_length: int = Field(default=1_000_000, alias="INGEST_QUEUE_MAX_LENGTH")
+    # Replayed single ingests with an identical payload are answered from Redis for this long (0 disables)
+    ingest_idempotency_ttl_seconds: int = Field(default=86400, alias="INGEST_IDEMPOTENCY_TTL_SECONDS")
 
     # Rate limiting
     rate_limit_ingest_per_minute: int = Field(default=120, alias="RATE_LIMIT_INGEST_PER_MINUTE")
     rate_limit_user_per_minute: int = Field(default=60, alias="RATE_LIMIT_USER_PER_MINUTE")
     rate_limit_burst_multiplier: int = Field(default=2, alias="RATE_LIMIT_BURST_MULTIPLIER")
 
+    # Audit log write-behind: events are queued in-process and inserted in batches
+    audit_write_behind: bool = Field(default=True, alias="AUDIT_WRITE_BEHIND")
+    audit_queue_max_events: int = Field(default=10_000, alias="AUDIT_QUEUE_MAX_EVENTS")
+    audit_flush_max_events: int = Field(default=500, alias="AUDIT_FLUSH_MAX_EVENTS")
+    audit_flush_interval_ms: int = Field(default=200, alias="AUDIT_FLUSH_INTERVAL_MS")
+    # Events that cannot reach Postgres (outage, shutdown) are appended here and replayed later
+    audit_spool_path: str = Field(default="/tmp/greenai-audit-spool.ndjson", alias="AUDIT_SPOOL_PATH")
+    # Per-action policies for successful events: "<action>=full|sampled(<p>)|aggregate(<window>)", comma
+    # separated; unlisted actions (all by default) are kept in full
+    audit_policies: str = Field(default="", alias="AUDIT_POLICIES")
+    # Monthly audit_logs partitions: default retention (per-org override on organizations),
+    # partitions created ahead, and what happens to expired ones ("drop" or "detach" to keep as a table)
+    audit_retention_days: int = Field(default=365, alias="AUDIT_RETENTION_DAYS")
+    audit_partition_months_ahead: int = Field(default=3, alias="AUDIT_PARTITION_MONTHS_AHEAD")
+    audit_retention_action: str = Field(default="drop", alias="AUDIT_RETENTION_ACTION")
+
+    # Bulk export (GET /job-runs/export): rows per server-side cursor fetch and per Parquet row group
+    export_batch_rows: int = Field(default=5000, alias="EXPORT_BATCH_ROWS")
+
     # Observability
     enable_metrics: bool = Field(default=False, alias="ENABLE_METRICS")
+    worker_metrics_port: int = Field(default=0, alias="WORKER_METRICS_PORT")  # 0 disables
     log_json: bool = Field(default=False, alias="LOG_JSON")
 
     # Dev seed
@@ -1,4 +1,6 @@
 """Entry point for FastAPI application."""
+import logging
+
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 
@@ -7,9 +9,12 @@ from backend.app.api.system import router as system_router
 from backend.app.core.config import get_settings
 from backend.app.middleware.request_id import request_id_middleware
 from backend.app.middleware.logging import logging_middleware
+from backend.app.services.audit_service import audit_sink
+from backend.app.utils.pagination import NEXT_CURSOR_HEADER
 
 
 settings = get_settings()
+logger = logging.getLogger(__name__)
 app = FastAPI(title=settings.app_name, redirect_slashes=False)
 
 app.add_middleware(
@@ -18,11 +23,21 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=[NEXT_CURSOR_HEADER],
 )
 
 app.middleware("http")(request_id_middleware)
 app.middleware("http")(logging_middleware)
 
+if not settings.sync_compute and not settings.emissions_queue_enabled:
+    logger.warning(
+        "SYNC_COMPUTE=false implies EMISSIONS_QUEUE_ENABLED: ingested runs go to the outbox and are "
+        "computed only while outbox relays and batch workers run (python -m backend.app.workers.supervisor)"
+    )
+
+# Flush (or spool) buffered audit events before the process exits
+app.add_event_handler("shutdown", audit_sink.close)
+
 app.include_router(api_router, prefix="/api")
 # Health endpoints at root (internal access)
 app.include_router(system_router)
@@ -12,3 +12,6 @@ from backend.app.models.suggestion import OptimizationSuggestion  # noqa: F401
 from backend.app.models.report import Report  # noqa: F401
 from backend.app.models.region_emission_factor import RegionEmissionFactor  # noqa: F401
 from backend.app.models.audit_log import AuditLog  # noqa: F401
+from backend.app.models.grid_intensity import GridIntensityDay  # noqa: F401
+from backend.app.models.emission_recompute_job import EmissionRecomputeJob  # noqa: F401
+from backend.app.models.outbox import OutboxEvent  # noqa: F401
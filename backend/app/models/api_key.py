@@ -1,5 +1,5 @@
 """API key model."""
-from sqlalchemy import Boolean, Column, DateTime, ForeignKey, JSON, String, text
+from sqlalchemy import Boolean, Column, DateTime, ForeignKey, Index, JSON, String, text
 from sqlalchemy.orm import relationship
 
 from backend.app.core.database import Base
@@ -10,10 +10,18 @@ class ApiKey(UUIDMixin, TimestampMixin, Base):
     """API key scoped to project and user."""
 
     __tablename__ = "api_keys"
+    __table_args__ = (
+        Index("ux_api_keys_key_id", "key_id", unique=True),
+        Index("ix_api_keys_org_created_id", "organization_id", "created_at", "id"),
+    )
 
     name = Column(String, nullable=False)
     hashed_key = Column(String, nullable=False)
+    # "hmac-sha256" for new keys; legacy "bcrypt" rows are upgraded on next successful verify
+    hash_scheme = Column(String(16), nullable=False, server_default=text("'bcrypt'"))
     key_prefix = Column(String(12), nullable=True, index=True)
+    # Non-secret lookup id embedded in the token; NULL only for legacy keys that must be rotated
+    key_id = Column(String(32), nullable=True)
     active = Column(Boolean, nullable=False, server_default=text("true"))
 
     # Scope to both project + organization for multi-tenant safety
@@ -1,5 +1,5 @@
 """Audit log model."""
-from sqlalchemy import Column, String, ForeignKey, DateTime, JSON, text
+from sqlalchemy import Column, String, ForeignKey, DateTime, Index, Integer, JSON, text
 from sqlalchemy.dialects.postgresql import UUID
 from sqlalchemy.orm import relationship, synonym
 
@@ -10,7 +10,8 @@ class AuditLog(Base):
     __tablename__ = "audit_logs"
 
     id = Column(UUID(as_uuid=True), primary_key=True, server_default=text("gen_random_uuid()"))
-    created_at = Column(DateTime(timezone=True), nullable=False, server_default=text("now()"))
+    # Partition key (monthly RANGE partitions), hence part of the primary key
+    created_at = Column(DateTime(timezone=True), primary_key=True, nullable=False, server_default=text("now()"))
     organization_id = Column(ForeignKey("organizations.id", ondelete="CASCADE"), nullable=False)
     actor_user_id = Column(ForeignKey("users.id", ondelete="SET NULL"), nullable=True)
     actor_type = Column(String(20), nullable=False)
@@ -23,6 +24,24 @@ class AuditLog(Base):
     user_agent = Column(String, nullable=True)
     request_id = Column(String(80), nullable=True)
     audit_metadata = Column("metadata", JSON, nullable=False, server_default=text("'{}'::jsonb"))
+    # Aggregated rows (audit policy ``aggregate(window)``) stand for event_count events seen
+    # between first_at and last_at; created_at is the window start.
+    event_count = Column(Integer, nullable=False, server_default=text("1"))
+    first_at = Column(DateTime(timezone=True), nullable=True)
+    last_at = Column(DateTime(timezone=True), nullable=True)
+    aggregate_key = Column(String(64), nullable=True)
+
+    __table_args__ = (
+        Index("ix_audit_org_created_id", "organization_id", "created_at", "id"),
+        Index(
+            "ux_audit_aggregate_window",
+            "aggregate_key",
+            "created_at",
+            unique=True,
+            postgresql_where=text("aggregate_key IS NOT NULL"),
+        ),
+        {"postgresql_partition_by": "RANGE (created_at)"},
+    )
 
     organization = relationship("Organization")
     actor_user = relationship("User")
@@ -0,0 +1,52 @@
+"""Bulk emissions recompute job and its checkpoint."""
+from datetime import datetime
+
+from sqlalchemy import Column, DateTime, ForeignKey, Integer, JSON, String, Text
+from sqlalchemy.dialects.postgresql import UUID
+
+from backend.app.core.database import Base
+from backend.app.models.base import TimestampMixin, UUIDMixin
+
+
+class EmissionRecomputeJob(UUIDMixin, TimestampMixin, Base):
+    """Walks job runs in (organization_id, created_at, id) order; the cursor is the last run written."""
+
+    __tablename__ = "emission_recompute_jobs"
+
+    # NULL: every organization (CLI only)
+    organization_id = Column(ForeignKey("organizations.id", ondelete="CASCADE"), nullable=True, index=True)
+    requested_by_user_id = Column(ForeignKey("users.id", ondelete="SET NULL"), nullable=True)
+    regions = Column(JSON, nullable=True)  # region prefixes to recompute; NULL for all
+    status = Column(String(20), nullable=False, default="pending")  # pending|running|cancelling|cancelled|completed|failed
+    chunk_size = Column(Integer, nullable=False)
+    max_rows_per_second = Column(Integer, nullable=False)
+    total_runs = Column(Integer, nullable=True)
+    scanned_runs = Column(Integer, nullable=False, default=0)
+    changed_runs = Column(Integer, nullable=False, default=0)
+    cursor_organization_id = Column(UUID(as_uuid=True), nullable=True)
+    cursor_created_at = Column(DateTime, nullable=True)
+    cursor_id = Column(UUID(as_uuid=True), nullable=True)
+    started_at = Column(DateTime, nullable=True)
+    heartbeat_at = Column(DateTime, nullable=True)
+    finished_at = Column(DateTime, nullable=True)
+    error = Column(Text, nullable=True)
+
+    @property
+    def progress_percent(self) -> float | None:
+        if not self.total_runs:
+            return 100.0 if self.status == "completed" else None
+        return min(100.0, 100.0 * (self.scanned_runs or 0) / self.total_runs)
+
+    @property
+    def rows_per_second(self) -> float | None:
+        if not self.started_at or not self.scanned_runs:
+            return None
+        elapsed = ((self.finished_at or self.heartbeat_at or datetime.utcnow()) - self.started_at).total_seconds()
+        return self.scanned_runs / elapsed if elapsed > 0 else None
+
+    @property
+    def eta_seconds(self) -> float | None:
+        rate = self.rows_per_second
+        if self.status != "running" or not rate or self.total_runs is None:
+            return None
+        return max(self.total_runs - self.scanned_runs, 0) / rate
@@ -0,0 +1,17 @@
+"""Hourly grid carbon intensity, one array-backed row per region and UTC day."""
+from sqlalchemy import Column, Date, Float, PrimaryKeyConstraint, String
+from sqlalchemy.dialects.postgresql import ARRAY
+
+from backend.app.core.database import Base
+from backend.app.models.base import TimestampMixin
+
+
+class GridIntensityDay(TimestampMixin, Base):
+    __tablename__ = "grid_intensity_days"
+    __table_args__ = (PrimaryKeyConstraint("region", "day", name="grid_intensity_days_pkey"),)
+
+    region = Column(String, nullable=False)
+    day = Column(Date, nullable=False)
+    # 24 values, g CO2e per kWh for hour 0..23 UTC; NULL where the source has a gap
+    hourly_g_per_kwh = Column(ARRAY(Float), nullable=False)
+    source = Column(String, nullable=True)
@@ -1,5 +1,5 @@
 """Job run and associated resource usage models."""
-from sqlalchemy import Column, String, ForeignKey, DateTime, JSON, Float, UniqueConstraint, Text
+from sqlalchemy import Column, String, ForeignKey, DateTime, JSON, Float, Index, UniqueConstraint, Text
 from sqlalchemy.orm import relationship
 
 from backend.app.core.database import Base
@@ -12,6 +12,7 @@ class JobRun(UUIDMixin, TimestampMixin, Base):
     __tablename__ = "job_runs"
     __table_args__ = (
         UniqueConstraint("project_id", "dedupe_key", name="ux_job_runs_project_dedupe"),
+        Index("ix_job_runs_org_created_id", "organization_id", "created_at", "id"),
     )
 
     run_name = Column(String, nullable=False)
@@ -48,6 +49,7 @@ class JobRunHardware(UUIDMixin, TimestampMixin, Base):
     """Hardware profile captured for a job run."""
 
     __tablename__ = "job_run_hardware"
+    __table_args__ = (UniqueConstraint("job_run_id", name="ux_job_run_hardware_job_run"),)
 
     job_run_id = Column(ForeignKey("job_runs.id"), nullable=False)
     cpu_count = Column(String, nullable=True)
@@ -62,6 +64,7 @@ class JobRunEnergy(UUIDMixin, TimestampMixin, Base):
     """Energy readings aggregated for a job run."""
 
     __tablename__ = "job_run_energy"
+    __table_args__ = (UniqueConstraint("job_run_id", name="ux_job_run_energy_job_run"),)
 
     job_run_id = Column(ForeignKey("job_runs.id"), nullable=False)
     cpu_kwh = Column(Float, default=0.0)
@@ -79,6 +82,7 @@ class JobRunCost(UUIDMixin, TimestampMixin, Base):
     """Cost estimates for a job run."""
 
     __tablename__ = "job_run_costs"
+    __table_args__ = (UniqueConstraint("job_run_id", name="ux_job_run_costs_job_run"),)
 
     job_run_id = Column(ForeignKey("job_runs.id"), nullable=False)
     amount_usd = Column(Float, default=0.0)
@@ -37,6 +37,9 @@ class Organization(Base):
     projects_limit: Mapped[int | None] = mapped_column(Integer, nullable=True, default=3)
     users_limit: Mapped[int | None] = mapped_column(Integer, nullable=True, default=2)
 
+    # Days of audit history kept; NULL uses AUDIT_RETENTION_DAYS
+    audit_retention_days: Mapped[int | None] = mapped_column(Integer, nullable=True)
+
     created_at: Mapped[object] = mapped_column(
         DateTime(timezone=True),
         default=datetime.utcnow,
@@ -0,0 +1,21 @@
+"""Transactional outbox: work handed to the worker tier in the writer's transaction."""
+from datetime import datetime
+
+from sqlalchemy import BigInteger, Column, DateTime, Identity, String
+from sqlalchemy.dialects.postgresql import UUID
+
+from backend.app.core.database import Base
+
+
+class OutboxEvent(Base):
+    """Deleted by the relay once delivered; the table holds only undelivered events."""
+
+    __tablename__ = "outbox"
+
+    # Sequential so the relay drains in commit-ish order through the primary key
+    id = Column(BigInteger, Identity(always=False), primary_key=True)
+    topic = Column(String(50), nullable=False)
+    # No foreign keys: the row lives for seconds and must not slow the ingest write
+    organization_id = Column(UUID(as_uuid=True), nullable=True)
+    job_run_id = Column(UUID(as_uuid=True), nullable=False)
+    created_at = Column(DateTime, default=datetime.utcnow, nullable=False)
@@ -1,5 +1,5 @@
 """Project model."""
-from sqlalchemy import Column, String, ForeignKey
+from sqlalchemy import Column, String, ForeignKey, Index
 from sqlalchemy.orm import relationship
 
 from backend.app.core.database import Base
@@ -10,6 +10,7 @@ class Project(UUIDMixin, TimestampMixin, Base):
     """Project under an organization."""
 
     __tablename__ = "projects"
+    __table_args__ = (Index("ix_projects_org_created_id", "organization_id", "created_at", "id"),)
 
     name = Column(String, nullable=False)
     description = Column(String, nullable=True)
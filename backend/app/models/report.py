@@ -1,5 +1,5 @@
 """Report model representing generated PDF summaries."""
-from sqlalchemy import Column, String, ForeignKey, DateTime, JSON
+from sqlalchemy import Column, String, ForeignKey, DateTime, Index, JSON
 from sqlalchemy.orm import relationship
 
 from backend.app.core.database import Base
@@ -10,6 +10,7 @@ class Report(UUIDMixin, TimestampMixin, Base):
     """Generated ESG report stored locally or in object storage."""
 
     __tablename__ = "reports"
+    __table_args__ = (Index("ix_reports_org_created_id", "organization_id", "created_at", "id"),)
 
     name = Column(String, nullable=False)
     period = Column(String, nullable=False)
@@ -1,5 +1,5 @@
 """Optimization suggestion model."""
-from sqlalchemy import Column, String, ForeignKey, Float, JSON, Text, UniqueConstraint, DateTime
+from sqlalchemy import Column, String, ForeignKey, Float, JSON, Text, UniqueConstraint, DateTime, Index
 from sqlalchemy.orm import relationship
 
 from backend.app.core.database import Base
@@ -12,6 +12,7 @@ class OptimizationSuggestion(UUIDMixin, TimestampMixin, Base):
     __tablename__ = "optimization_suggestions"
     __table_args__ = (
         UniqueConstraint("hash_key", name="ux_suggestions_hash"),
+        Index("ix_suggestions_created_id", "created_at", "id"),
     )
 
     category = Column(String, nullable=False)
@@ -1,6 +1,36 @@
 """Shared metrics registry and counters."""
-from prometheus_client import CollectorRegistry, Counter, Histogram
+from prometheus_client import CollectorRegistry, Counter, Gauge, Histogram
 
 registry = CollectorRegistry()
 request_counter = Counter("greenai_request_count", "request count", ["route", "method", "status"], registry=registry)
 request_latency = Histogram("greenai_request_latency_ms", "request latency", ["route", "method", "status"], registry=registry)
+
+ingest_queue_messages = Counter(
+    "greenai_ingest_queue_messages", "async ingest messages by outcome", ["outcome"], registry=registry
+)
+ingest_queue_lag = Gauge(
+    "greenai_ingest_queue_lag", "async ingest entries not yet delivered to a consumer", registry=registry
+)
+ingest_queue_pending = Gauge(
+    "greenai_ingest_queue_pending", "async ingest entries delivered but not acknowledged", registry=registry
+)
+ingest_queue_oldest_age = Gauge(
+    "greenai_ingest_queue_oldest_age_seconds", "age of the oldest unprocessed async ingest entry", registry=registry
+)
+emissions_queue_runs = Counter(
+    "greenai_emissions_queue_runs",
+    "emissions computations by outcome (scheduled, coalesced, computed, failed, in_process)",
+    ["outcome"],
+    registry=registry,
+)
+outbox_events = Counter(
+    "greenai_outbox_events", "outbox rows handed to the emissions queue (relayed) or left for retry", ["outcome"],
+    registry=registry,
+)
+ingest_idempotency = Counter(
+    "greenai_ingest_idempotency_lookups", "ingest idempotency cache lookups by result", ["result"], registry=registry
+)
+audit_events = Counter(
+    "greenai_audit_events", "audit events by write-behind outcome", ["outcome"], registry=registry
+)
+audit_queue_depth = Gauge("greenai_audit_queue_depth", "audit events waiting to be flushed", registry=registry)
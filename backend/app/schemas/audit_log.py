@@ -12,6 +12,7 @@ class AuditLogRead(ORMBase):
     model_config = ConfigDict(from_attributes=True)
 
     created_at: datetime
+    updated_at: datetime | None = None  # audit rows are never updated
     organization_id: UUID
     actor_user_id: UUID | None = None
     actor_type: str
@@ -24,6 +25,10 @@ class AuditLogRead(ORMBase):
     user_agent: str | None = None
     request_id: str | None = None
     metadata: dict = Field(default_factory=dict, alias="audit_metadata")
+    # Aggregated rows: event_count events between first_at and last_at (created_at = window start)
+    event_count: int = 1
+    first_at: datetime | None = None
+    last_at: datetime | None = None
 
 
 class AuditLogQuery(BaseModel):
@@ -36,4 +41,4 @@ class AuditLogQuery(BaseModel):
     from_ts: Optional[datetime] = None
     to_ts: Optional[datetime] = None
     limit: int = Field(default=50, ge=1, le=200)
-    cursor: Optional[str] = None  # encoded created_at|id tuple for stable pagination
+    cursor: Optional[str] = None  # X-Next-Cursor of the previous page
@@ -7,3 +7,9 @@ class Token(BaseModel):
 
     access_token: str
     token_type: str = "bearer"
+
+
+class IngestToken(Token):
+    """Short-lived ingest token exchanged from an API key."""
+
+    expires_in: int
@@ -29,6 +29,41 @@ class JobRunCreate(BaseModel):
     external_run_id: str | None = None
 
 
+class JobRunQueued(BaseModel):
+    """Async ingest acknowledgement (the run is applied by the ingest consumer)."""
+
+    status: str = "queued"
+    dedupe_key: str
+    queue_id: str
+
+
+class JobRunBatchCreate(BaseModel):
+    """Batch ingest payload; items are validated one by one so a bad run
+    does not reject the whole batch."""
+
+    runs: list[Dict[str, Any]] = Field(..., min_length=1)
+
+
+class JobRunBatchItemResult(BaseModel):
+    """Per-item outcome of a batch ingest."""
+
+    index: int
+    status: str  # created | updated | unchanged | error
+    id: UUID | None = None
+    dedupe_key: str | None = None
+    detail: str | None = None
+
+
+class JobRunBatchResult(BaseModel):
+    """Batch ingest summary."""
+
+    created: int = 0
+    updated: int = 0
+    unchanged: int = 0
+    errors: int = 0
+    results: list[JobRunBatchItemResult]
+
+
 class JobRunRead(ORMBase):
     """Job run representation."""
 
@@ -1,6 +1,6 @@
 """Organization schemas."""
 from uuid import UUID
-from pydantic import BaseModel
+from pydantic import BaseModel, Field
 
 from backend.app.schemas.base import ORMBase
 
@@ -15,12 +15,14 @@ class OrganizationUpdate(BaseModel):
 
     name: str | None = None
     region_preference: str | None = None
+    audit_retention_days: int | None = Field(default=None, ge=1, le=3650)
 
 
 class OrganizationRead(ORMBase):
     """Organization representation."""
 
     name: str
+    audit_retention_days: int | None = None
 
 
 class ProjectCreate(BaseModel):
@@ -0,0 +1,33 @@
+"""Bulk emissions recompute schemas."""
+from datetime import datetime
+from typing import List
+from uuid import UUID
+
+from pydantic import BaseModel, Field
+
+from backend.app.schemas.base import ORMBase
+
+
+class RecomputeJobCreate(BaseModel):
+    regions: List[str] | None = Field(default=None, description="Region prefixes; all regions if omitted")
+    chunk_size: int | None = Field(default=None, ge=1, le=10_000)
+    max_rows_per_second: int | None = Field(default=None, ge=1)
+
+
+class RecomputeJobRead(ORMBase):
+    organization_id: UUID | None = None
+    requested_by_user_id: UUID | None = None
+    regions: List[str] | None = None
+    status: str
+    chunk_size: int
+    max_rows_per_second: int
+    total_runs: int | None = None
+    scanned_runs: int
+    changed_runs: int
+    progress_percent: float | None = None
+    rows_per_second: float | None = None
+    eta_seconds: float | None = None
+    started_at: datetime | None = None
+    heartbeat_at: datetime | None = None
+    finished_at: datetime | None = None
+    error: str | None = None
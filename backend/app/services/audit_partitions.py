@@ -0,0 +1,225 @@
+"""Partition maintenance and retention for the monthly-partitioned audit_logs.
+
+``run_maintenance`` is idempotent and meant to run daily
+(``python -m backend.app.workers.audit_maintenance``):
+
+* creates the partitions for the current month and the next
+  ``AUDIT_PARTITION_MONTHS_AHEAD`` months, moving any matching rows out of
+  the DEFAULT partition first;
+* drops (or, with ``AUDIT_RETENTION_ACTION=detach``, detaches and renames to
+  ``audit_logs_archive_pYYYY_MM``) partitions that ended before the longest
+  retention of any organization;
+* deletes older rows of organizations whose retention is shorter. The
+  ``created_at`` bound prunes those deletes to the expired partitions.
+
+Maintenance runs on a plain Connection: it commits after every DDL step and
+holds a session-level advisory lock, which needs the same connection
+throughout.
+"""
+from __future__ import annotations
+
+import logging
+import re
+from collections import defaultdict
+from datetime import datetime, timedelta, timezone
+from typing import Dict, List, Optional, Tuple
+from uuid import UUID
+
+from sqlalchemy import select, text
+from sqlalchemy.engine import Connection
+from sqlalchemy.orm import Session
+
+from backend.app.core.config import get_settings
+from backend.app.models.organization import Organization
+
+settings = get_settings()
+logger = logging.getLogger(__name__)
+
+PARENT = "audit_logs"
+DEFAULT_PARTITION = "audit_logs_default"
+PARTITION_PREFIX = "audit_logs_p"
+ARCHIVE_PREFIX = "audit_logs_archive_p"
+_PARTITION_RE = re.compile(r"^audit_logs_p(\d{4})_(\d{2})$")
+_DELETE_BATCH = 10_000
+# pg advisory lock key serializing maintenance across workers/cron runs
+_LOCK_KEY = 7_301_401
+
+
+def month_start(moment: datetime) -> datetime:
+    moment = moment.astimezone(timezone.utc) if moment.tzinfo else moment.replace(tzinfo=timezone.utc)
+    return moment.replace(day=1, hour=0, minute=0, second=0, microsecond=0)
+
+
+def add_months(start: datetime, months: int) -> datetime:
+    index = start.year * 12 + start.month - 1 + months
+    return start.replace(year=index // 12, month=index % 12 + 1)
+
+
+def partition_name(start: datetime) -> str:
+    return f"{PARTITION_PREFIX}{start:%Y_%m}"
+
+
+def _bound(moment: datetime) -> str:
+    return moment.strftime("%Y-%m-%d %H:%M:%S+00")
+
+
+def list_partitions(db: Connection) -> List[Tuple[str, datetime, datetime]]:
+    """Attached monthly partitions as (name, start, end), oldest first."""
+    names = db.execute(
+        text(
+            """
+            SELECT c.relname FROM pg_inherits i
+            JOIN pg_class c ON c.oid = i.inhrelid
+            WHERE i.inhparent = CAST(:parent AS regclass)
+            """
+        ),
+        {"parent": PARENT},
+    ).scalars()
+    partitions = []
+    for name in names:
+        match = _PARTITION_RE.match(name)
+        if match:
+            start = datetime(int(match.group(1)), int(match.group(2)), 1, tzinfo=timezone.utc)
+            partitions.append((name, start, add_months(start, 1)))
+    return sorted(partitions, key=lambda p: p[1])
+
+
+def ensure_partitions(db: Connection, now: datetime, months_ahead: int) -> List[str]:
+    existing = {name for name, _, _ in list_partitions(db)}
+    created = []
+    first = month_start(now)
+    for offset in range(months_ahead + 1):
+        start = add_months(first, offset)
+        name = partition_name(start)
+        if name in existing:
+            continue
+        lower, upper = _bound(start), _bound(add_months(start, 1))
+        stray = db.execute(
+            text(f"SELECT count(*) FROM {DEFAULT_PARTITION} WHERE created_at >= :lower AND created_at < :upper"),
+            {"lower": lower, "upper": upper},
+        ).scalar()
+        if not stray:
+            db.execute(text(f"CREATE TABLE {name} PARTITION OF {PARENT} FOR VALUES FROM ('{lower}') TO ('{upper}')"))
+        else:
+            # Rows already landed in DEFAULT for this month: move them, then attach
+            db.execute(text(f"CREATE TABLE {name} (LIKE {PARENT} INCLUDING DEFAULTS INCLUDING CONSTRAINTS)"))
+            db.execute(
+                text(
+                    f"""
+                    WITH moved AS (
+                        DELETE FROM {DEFAULT_PARTITION}
+                        WHERE created_at >= :lower AND created_at < :upper
+                        RETURNING *
+                    )
+                    INSERT INTO {name} SELECT * FROM moved
+                    """
+                ),
+                {"lower": lower, "upper": upper},
+            )
+            db.execute(text(f"ALTER TABLE {PARENT} ATTACH PARTITION {name} FOR VALUES FROM ('{lower}') TO ('{upper}')"))
+        db.commit()
+        created.append(name)
+        logger.info("Created audit partition %s (%s stray rows moved)", name, stray or 0)
+    return created
+
+
+def retention_days_by_org(db: Connection) -> Dict[UUID, int]:
+    rows = db.execute(
+        select(Organization.id, Organization.audit_retention_days).where(
+            Organization.audit_retention_days.isnot(None)
+        )
+    )
+    return {org_id: days for org_id, days in rows}
+
+
+def retention_cutoff(db: Session, organization_id: UUID, now: Optional[datetime] = None) -> datetime:
+    """Oldest created_at still retained for an organization."""
+    days = (
+        db.query(Organization.audit_retention_days).filter(Organization.id == organization_id).scalar()
+        or settings.audit_retention_days
+    )
+    return (now or datetime.now(timezone.utc)) - timedelta(days=days)
+
+
+def _expire_partition(db: Connection, name: str, start: datetime) -> None:
+    if settings.audit_retention_action == "detach":
+        db.execute(text(f"ALTER TABLE {PARENT} DETACH PARTITION {name}"))
+        db.execute(text(f"ALTER TABLE {name} RENAME TO {ARCHIVE_PREFIX}{start:%Y_%m}"))
+    else:
+        db.execute(text(f"DROP TABLE {name}"))
+    db.commit()
+
+
+def _delete_before(db: Connection, cutoff: datetime, org_filter: str, params: dict) -> int:
+    """Batched delete of rows older than cutoff; the created_at bound limits it to old partitions."""
+    total = 0
+    while True:
+        deleted = db.execute(
+            text(
+                f"""
+                DELETE FROM {PARENT}
+                WHERE (id, created_at) IN (
+                    SELECT id, created_at FROM {PARENT}
+                    WHERE created_at < :cutoff AND {org_filter}
+                    LIMIT {_DELETE_BATCH}
+                )
+                """
+            ),
+            {"cutoff": cutoff, **params},
+        ).rowcount
+        db.commit()
+        total += deleted or 0
+        if not deleted or deleted < _DELETE_BATCH:
+            return total
+
+
+def apply_retention(db: Connection, now: datetime) -> Dict[str, object]:
+    overrides = retention_days_by_org(db)
+    default_days = settings.audit_retention_days
+    longest = max([default_days, *overrides.values()])
+
+    expired = []
+    longest_cutoff = now - timedelta(days=longest)
+    for name, start, end in list_partitions(db):
+        if end <= longest_cutoff:
+            _expire_partition(db, name, start)
+            expired.append(name)
+
+    # Organizations with shorter retention lose older rows individually
+    by_days: Dict[int, List[UUID]] = defaultdict(list)
+    for org_id, days in overrides.items():
+        by_days[days].append(org_id)
+    deleted = 0
+    for days, org_ids in by_days.items():
+        if days < longest:
+            deleted += _delete_before(
+                db,
+                now - timedelta(days=days),
+                "organization_id = ANY(CAST(:orgs AS uuid[]))",
+                {"orgs": [str(o) for o in org_ids]},
+            )
+    if default_days < longest:
+        deleted += _delete_before(
+            db,
+            now - timedelta(days=default_days),
+            "NOT (organization_id = ANY(CAST(:orgs AS uuid[])))",
+            {"orgs": [str(o) for o in overrides]},
+        )
+    # Rows past every retention in the partially expired month or in DEFAULT
+    deleted += _delete_before(db, longest_cutoff, "true", {})
+    return {"expired_partitions": expired, "deleted_rows": deleted}
+
+
+def run_maintenance(db: Connection, now: Optional[datetime] = None) -> Optional[Dict[str, object]]:
+    """Create upcoming partitions and apply retention; None if another run holds the lock."""
+    now = now or datetime.now(timezone.utc)
+    if not db.execute(text("SELECT pg_try_advisory_lock(:key)"), {"key": _LOCK_KEY}).scalar():
+        logger.info("Audit partition maintenance already running elsewhere")
+        return None
+    try:
+        created = ensure_partitions(db, now, settings.audit_partition_months_ahead)
+        summary = apply_retention(db, now)
+        return {"created_partitions": created, **summary}
+    finally:
+        db.execute(text("SELECT pg_advisory_unlock(:key)"), {"key": _LOCK_KEY})
+        db.commit()
@@ -1,18 +1,64 @@
-"""Centralized audit logging (best-effort, non-blocking)."""
+"""Centralized audit logging (best-effort, non-blocking).
+
+By default events are written behind the request: ``audit_log`` puts a row
+on a bounded in-process queue and a background thread inserts queued rows
+in multi-row batches every ``AUDIT_FLUSH_MAX_EVENTS`` events or
+``AUDIT_FLUSH_INTERVAL_MS``. Batches that cannot reach Postgres, and rows
+still queued at shutdown, are appended to ``AUDIT_SPOOL_PATH`` and replayed
+once the database is reachable again. A replay claims the spool by renaming
+it and deletes the renamed file only when every row is written or spooled
+again; a file left by a process that died mid-replay is taken over by the
+next replay, so spooled events are written at least once. A full queue drops the event rather
+than blocking the request. ``AUDIT_WRITE_BEHIND=false`` restores the
+synchronous insert and commit on the caller's session.
+
+``AUDIT_POLICIES`` thins out high-volume successful actions: ``full`` keeps
+every event, ``sampled(p)`` keeps a fraction ``p`` (recorded as
+``metadata.sample_rate``) and ``aggregate(window)`` collapses events per
+(org, actor, action) into one row per window with ``event_count`` and
+``first_at``/``last_at``; its ``created_at`` is the window start. Failures
+are always kept in full.
+
+In write-behind mode ``audit_log`` does not touch the session it is given,
+so callers commit their own changes.
+"""
 from __future__ import annotations
 
+import atexit
+import glob
+import hashlib
+import json
 import logging
+import os
+import queue
+import random
+import re
+import threading
+import time
 from dataclasses import dataclass, field
-from typing import Any, Dict, Optional
+from datetime import datetime, timezone
+from typing import Any, Dict, List, Optional
 from uuid import UUID
 
-from sqlalchemy.exc import SQLAlchemyError
+from sqlalchemy import func, insert
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.exc import IntegrityError, SQLAlchemyError
 from sqlalchemy.orm import Session
 
+from backend.app.core.config import get_settings
+from backend.app.core.database import SessionLocal
 from backend.app.models.audit_log import AuditLog
+from backend.app.observability.metrics import audit_events, audit_queue_depth
 
+settings = get_settings()
 logger = logging.getLogger(__name__)
 
+_UUID_COLUMNS = ("organization_id", "actor_user_id", "actor_api_key_id", "resource_id")
+# Rows rejected by a constraint are retried this many flushes (e.g. an org created by a
+# transaction that had not committed yet) before being dropped.
+_MAX_ATTEMPTS = 3
+_SPOOL_REPLAY_INTERVAL = 30.0
+
 
 @dataclass
 class AuditEvent:
@@ -30,27 +76,417 @@ class AuditEvent:
     metadata: Dict[str, Any] = field(default_factory=dict)
 
 
+@dataclass(frozen=True)
+class AuditPolicy:
+    kind: str  # full | sampled | aggregate
+    rate: float = 1.0
+    window_seconds: int = 0
+
+
+FULL = AuditPolicy("full")
+_POLICY_RE = re.compile(r"^(full|sampled\(([0-9.]+)\)|aggregate\((\d+)([smh]?)\))$")
+_WINDOW_UNITS = {"": 1, "s": 1, "m": 60, "h": 3600}
+
+
+def parse_audit_policies(spec: str) -> Dict[str, AuditPolicy]:
+    """Parse ``action=policy`` pairs; raises ValueError on a malformed entry."""
+    policies: Dict[str, AuditPolicy] = {}
+    for entry in filter(None, (part.strip() for part in spec.split(","))):
+        action, _, raw = entry.partition("=")
+        match = _POLICY_RE.match(raw.strip().lower())
+        if not action.strip() or not match:
+            raise ValueError(f"Invalid audit policy: {entry!r}")
+        if match.group(2) is not None:
+            rate = float(match.group(2))
+            if not 0 <= rate <= 1:
+                raise ValueError(f"Audit sample rate must be within [0, 1]: {entry!r}")
+            policy = AuditPolicy("sampled", rate=rate)
+        elif match.group(3) is not None:
+            window = int(match.group(3)) * _WINDOW_UNITS[match.group(4)]
+            if window <= 0:
+                raise ValueError(f"Audit aggregate window must be positive: {entry!r}")
+            policy = AuditPolicy("aggregate", window_seconds=window)
+        else:
+            policy = FULL
+        policies[action.strip()] = policy
+    return policies
+
+
+audit_policies = parse_audit_policies(settings.audit_policies)
+
+
+def _audit_row(event: AuditEvent) -> Optional[Dict[str, Any]]:
+    """Column values for the event's audit_logs row under its policy, or None when sampled out."""
+    now = datetime.now(timezone.utc)
+    policy = audit_policies.get(event.action, FULL) if event.status == "success" else FULL
+    metadata = event.metadata or {}
+    if policy.kind == "sampled":
+        if random.random() >= policy.rate:
+            audit_events.labels("sampled_out").inc()
+            return None
+        metadata = {**metadata, "sample_rate": policy.rate}
+    elif policy.kind == "aggregate":
+        return _aggregate_row(event, policy, now)
+    return {
+        "created_at": now,
+        "organization_id": event.organization_id,
+        "actor_user_id": event.actor_user_id,
+        "actor_type": event.actor_type,
+        "actor_api_key_id": event.actor_api_key_id,
+        "action": event.action[:80],
+        "resource_type": event.resource_type[:60] if event.resource_type else None,
+        "resource_id": event.resource_id,
+        "status": event.status[:20] if event.status else "success",
+        "ip": event.ip[:80] if event.ip else None,
+        "user_agent": event.user_agent,
+        "request_id": event.request_id,
+        # Round-trip now so a non-serializable value cannot fail a whole batch later
+        "metadata": json.loads(json.dumps(metadata, default=str)),
+        "event_count": 1,
+        "first_at": None,
+        "last_at": None,
+        "aggregate_key": None,
+    }
+
+
+def _aggregate_row(event: AuditEvent, policy: AuditPolicy, now: datetime) -> Dict[str, Any]:
+    window = policy.window_seconds
+    window_start = datetime.fromtimestamp(int(now.timestamp()) // window * window, tz=timezone.utc)
+    identity = "|".join(
+        str(part or "")
+        for part in (
+            event.organization_id,
+            event.actor_type,
+            event.actor_user_id,
+            event.actor_api_key_id,
+            event.action,
+            window,
+        )
+    )
+    return {
+        "created_at": window_start,
+        "organization_id": event.organization_id,
+        "actor_user_id": event.actor_user_id,
+        "actor_type": event.actor_type,
+        "actor_api_key_id": event.actor_api_key_id,
+        "action": event.action[:80],
+        "resource_type": event.resource_type[:60] if event.resource_type else None,
+        "resource_id": None,
+        "status": "success",
+        "ip": None,
+        "user_agent": None,
+        "request_id": None,
+        "metadata": {"window_seconds": window},
+        "event_count": 1,
+        "first_at": now,
+        "last_at": now,
+        "aggregate_key": hashlib.sha256(identity.encode("utf-8")).hexdigest(),
+    }
+
+
+def _coalesce(rows: List[Dict[str, Any]]) -> tuple[List[Dict[str, Any]], List[Dict[str, Any]]]:
+    """Split into plain rows and aggregate rows merged per (key, window)."""
+    plain: List[Dict[str, Any]] = []
+    merged: Dict[tuple, Dict[str, Any]] = {}
+    for row in rows:
+        if row["aggregate_key"] is None:
+            plain.append(row)
+            continue
+        slot = (row["aggregate_key"], row["created_at"])
+        current = merged.get(slot)
+        if current is None:
+            merged[slot] = dict(row)
+        else:
+            current["event_count"] += row["event_count"]
+            current["first_at"] = min(current["first_at"], row["first_at"])
+            current["last_at"] = max(current["last_at"], row["last_at"])
+    return plain, list(merged.values())
+
+
+def _write_rows(db: Session, rows: List[Dict[str, Any]]) -> None:
+    """Multi-row insert; aggregate rows are added onto their window's existing row."""
+    plain, aggregates = _coalesce(rows)
+    table = AuditLog.__table__
+    if plain:
+        db.execute(insert(table), plain)
+    if aggregates:
+        stmt = pg_insert(table)
+        stmt = stmt.on_conflict_do_update(
+            index_elements=[table.c.aggregate_key, table.c.created_at],
+            index_where=table.c.aggregate_key.isnot(None),
+            set_={
+                "event_count": table.c.event_count + stmt.excluded.event_count,
+                "first_at": func.least(table.c.first_at, stmt.excluded.first_at),
+                "last_at": func.greatest(table.c.last_at, stmt.excluded.last_at),
+            },
+        )
+        db.execute(stmt, aggregates)
+
+
+def _row_to_json(row: Dict[str, Any]) -> str:
+    return json.dumps(row, default=str)
+
+
+def _row_from_json(line: str) -> Dict[str, Any]:
+    row = json.loads(line)
+    if not isinstance(row, dict) or "action" not in row:
+        raise ValueError("not an audit row")
+    for column in _UUID_COLUMNS:
+        if row.get(column):
+            row[column] = UUID(row[column])
+    for column in ("created_at", "first_at", "last_at"):
+        if row.get(column):
+            row[column] = datetime.fromisoformat(row[column])
+    return row
+
+
+def _pid_alive(pid: int) -> bool:
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        return True  # exists, owned by another user
+    return True
+
+
+class AuditSink:
+    """Bounded queue of audit rows flushed by a background thread."""
+
+    _STOP = object()
+
+    def __init__(self):
+        self._queue: "queue.Queue[Any]" = queue.Queue(maxsize=settings.audit_queue_max_events)
+        self._thread: Optional[threading.Thread] = None
+        self._pid: Optional[int] = None
+        self._lock = threading.Lock()
+        self._retry: List[Dict[str, Any]] = []
+        self._attempts: Dict[int, int] = {}
+        self._spool_checked_at = 0.0
+
+    def submit(self, event: AuditEvent) -> None:
+        row = _audit_row(event)
+        if row is None:
+            return
+        self._ensure_started()
+        try:
+            self._queue.put_nowait(row)
+        except queue.Full:
+            audit_events.labels("dropped").inc()
+            logger.warning("Audit queue full, dropping event (action=%s)", event.action)
+            return
+        audit_queue_depth.set(self._queue.qsize())
+
+    def _ensure_started(self) -> None:
+        # Forked workers inherit the object but not the thread
+        if self._thread is not None and self._pid == os.getpid() and self._thread.is_alive():
+            return
+        with self._lock:
+            if self._thread is not None and self._pid == os.getpid() and self._thread.is_alive():
+                return
+            if self._pid != os.getpid():
+                self._queue = queue.Queue(maxsize=settings.audit_queue_max_events)
+                atexit.register(self.close)
+            self._pid = os.getpid()
+            self._thread = threading.Thread(target=self._run, name="audit-writer", daemon=True)
+            self._thread.start()
+
+    def _run(self) -> None:
+        interval = settings.audit_flush_interval_ms / 1000
+        pending: List[Dict[str, Any]] = []
+        deadline: Optional[float] = None
+        while True:
+            timeout = interval if deadline is None else max(0.0, deadline - time.monotonic())
+            try:
+                row = self._queue.get(timeout=timeout)
+            except queue.Empty:
+                row = None
+            if row is self._STOP:
+                self._flush(pending + self._retry, final=True)
+                return
+            if row is not None:
+                pending.append(row)
+                if deadline is None:
+                    deadline = time.monotonic() + interval
+            due = deadline is not None and time.monotonic() >= deadline
+            if len(pending) >= settings.audit_flush_max_events or (pending and due):
+                batch, pending, deadline = self._retry + pending, [], None
+                self._retry = []
+                self._flush(batch)
+                audit_queue_depth.set(self._queue.qsize())
+
+    def _flush(self, rows: List[Dict[str, Any]], final: bool = False) -> None:
+        if not rows:
+            return
+        db = SessionLocal()
+        try:
+            _write_rows(db, rows)
+            db.commit()
+            audit_events.labels("flushed").inc(len(rows))
+        except IntegrityError:
+            db.rollback()
+            self._flush_rows(db, rows, final)
+        except Exception as exc:
+            db.rollback()
+            logger.warning("Audit flush of %s events failed, spooling to %s: %s", len(rows), settings.audit_spool_path, exc)
+            self._spool(rows)
+            return
+        finally:
+            db.close()
+        try:
+            self._replay_spool()
+        except Exception:
+            # The writer thread must outlive a bad spool; the claimed file is kept for the next replay
+            logger.exception("Audit spool replay failed")
+
+    def _flush_rows(self, db: Session, rows: List[Dict[str, Any]], final: bool) -> None:
+        """Row-by-row fallback so one constraint violation does not lose the batch."""
+        for row in rows:
+            try:
+                _write_rows(db, [row])
+                db.commit()
+                audit_events.labels("flushed").inc()
+                self._attempts.pop(id(row), None)
+            except IntegrityError:
+                db.rollback()
+                attempts = self._attempts.get(id(row), 0) + 1
+                if attempts < _MAX_ATTEMPTS and not final:
+                    self._attempts[id(row)] = attempts
+                    self._retry.append(row)
+                else:
+                    self._attempts.pop(id(row), None)
+                    audit_events.labels("rejected").inc()
+                    logger.warning("Audit event rejected by database (action=%s)", row.get("action"))
+            except SQLAlchemyError:
+                db.rollback()
+                self._spool([row])
+
+    def _spool(self, rows: List[Dict[str, Any]]) -> bool:
+        if not rows:
+            return True
+        try:
+            with open(settings.audit_spool_path, "a", encoding="utf-8") as fh:
+                fh.write("".join(_row_to_json(row) + "\n" for row in rows))
+                fh.flush()
+                os.fsync(fh.fileno())
+            audit_events.labels("spooled").inc(len(rows))
+            return True
+        except OSError:
+            audit_events.labels("dropped").inc(len(rows))
+            logger.exception("Audit spool write failed, %s events lost", len(rows))
+            return False
+
+    def _claim_spool_files(self) -> List[str]:
+        """Rename the spool, and replay files left by dead processes, to files only this process replays.
+
+        A replay file is deleted only once all its rows are in Postgres or back in
+        the spool, so one left behind belongs to a process that died mid-replay.
+        """
+        path = settings.audit_spool_path
+        claimed: List[str] = []
+        sources = [path]
+        for leftover in sorted(glob.glob(f"{glob.escape(path)}.*.replay")):
+            pid = leftover[len(path) + 1 :].split(".", 1)[0]
+            if pid.isdigit() and (int(pid) == os.getpid() or not _pid_alive(int(pid))):
+                sources.append(leftover)
+        for source in sources:
+            target = f"{path}.{os.getpid()}.{time.time_ns()}.replay"
+            try:
+                # Atomic: of several processes racing for a file, exactly one gets it
+                os.replace(source, target)
+            except FileNotFoundError:
+                continue
+            except OSError:
+                logger.warning("Could not claim audit spool %s", source, exc_info=True)
+                continue
+            claimed.append(target)
+        return claimed
+
+    def _replay_spool(self) -> None:
+        """Move spooled rows back into Postgres; only one process claims each file."""
+        now = time.monotonic()
+        if now - self._spool_checked_at < _SPOOL_REPLAY_INTERVAL:
+            return
+        self._spool_checked_at = now
+        for claimed in self._claim_spool_files():
+            self._replay_file(claimed)
+
+    def _replay_file(self, claimed: str) -> None:
+        rows: List[Dict[str, Any]] = []
+        corrupt = 0
+        with open(claimed, encoding="utf-8") as fh:
+            for line in fh:
+                if not line.strip():
+                    continue
+                try:
+                    rows.append(_row_from_json(line))
+                except (ValueError, TypeError, AttributeError):
+                    corrupt += 1
+        if corrupt:
+            # e.g. a line torn by a crash mid-write; the rest of the file is still good
+            audit_events.labels("dropped").inc(corrupt)
+            logger.warning("Skipped %s unreadable lines in audit spool %s", corrupt, claimed)
+        batch_size = settings.audit_flush_max_events
+        db = SessionLocal()
+        try:
+            for start in range(0, len(rows), batch_size):
+                batch = rows[start : start + batch_size]
+                try:
+                    _write_rows(db, batch)
+                    db.commit()
+                    audit_events.labels("replayed").inc(len(batch))
+                except IntegrityError:
+                    # Not transient: re-spooling would fail the same way on every replay
+                    db.rollback()
+                    self._flush_rows(db, batch, final=False)
+                except Exception:
+                    db.rollback()
+                    logger.exception("Audit spool replay failed; rows kept in %s", settings.audit_spool_path)
+                    if not self._spool(rows[start:]):
+                        return  # keep the claimed file for the next replay
+                    break
+            else:
+                logger.info("Replayed %s spooled audit events", len(rows))
+        finally:
+            db.close()
+        # Every row is committed, handed to the retry list or back in the spool
+        os.remove(claimed)
+
+    def close(self, timeout: float = 5.0) -> None:
+        """Flush queued events; whatever cannot be written in time is spooled."""
+        thread = self._thread
+        if thread is None or self._pid != os.getpid() or not thread.is_alive():
+            return
+        try:
+            self._queue.put(self._STOP, timeout=timeout)
+        except queue.Full:
+            pass
+        thread.join(timeout)
+        if thread.is_alive():
+            leftover = []
+            while True:
+                try:
+                    row = self._queue.get_nowait()
+                except queue.Empty:
+                    break
+                if row is not self._STOP:
+                    leftover.append(row)
+            self._spool(leftover)
+
+
+audit_sink = AuditSink()
+
+
 def audit_log(event: AuditEvent, db: Session) -> None:
-    """Persist audit log without raising exceptions."""
+    """Record an audit event without raising exceptions."""
     try:
-        safe_meta = event.metadata or {}
-        db.add(
-            AuditLog(
-                organization_id=event.organization_id,
-                actor_user_id=event.actor_user_id,
-                actor_type=event.actor_type,
-                actor_api_key_id=event.actor_api_key_id,
-                action=event.action[:80],
-                resource_type=event.resource_type[:60] if event.resource_type else None,
-                resource_id=event.resource_id,
-                status=event.status[:20] if event.status else "success",
-                ip=event.ip[:80] if event.ip else None,
-                user_agent=event.user_agent,
-                request_id=event.request_id,
-                metadata=safe_meta,
-            )
-        )
-        db.commit()
+        if settings.audit_write_behind:
+            audit_sink.submit(event)
+            return
+        row = _audit_row(event)
+        if row is not None:
+            _write_rows(db, [row])
+            db.commit()
     except SQLAlchemyError:
         db.rollback()
         logger.exception("Audit log persist failed (action=%s)", event.action)
@@ -33,6 +33,7 @@ PLANS = {
         "projects_limit": 3,
         "users_limit": 2,
         "overage_rate": 50,  # ₹0.50 per extra run in paise
+        "compute_weight": 1,  # share of emissions workers when organizations compete
         "features": [
             "10,000 job runs/month",
             "3 projects",
@@ -50,6 +51,7 @@ PLANS = {
         "projects_limit": 10,
         "users_limit": 10,
         "overage_rate": 30,  # ₹0.30 per extra run in paise
+        "compute_weight": 4,
         "features": [
             "100,000 job runs/month",
             "10 projects",
@@ -68,6 +70,7 @@ PLANS = {
         "projects_limit": -1,
         "users_limit": -1,
         "overage_rate": 0,
+        "compute_weight": 10,
         "features": [
             "Unlimited job runs",
             "Unlimited projects",
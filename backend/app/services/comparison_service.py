@@ -9,7 +9,7 @@ from fastapi import HTTPException
 from sqlalchemy.orm import Session, joinedload
 
 from backend.app.models.job_run import JobRun
-from backend.app.models.region_emission_factor import RegionEmissionFactor
+from backend.app.services.factor_resolver import factor_resolver
 
 
 def _duration_seconds(run: JobRun) -> Optional[float]:
@@ -18,24 +18,12 @@ def _duration_seconds(run: JobRun) -> Optional[float]:
     return max((run.end_time - run.start_time).total_seconds(), 0.0)
 
 
-def _emission_factor(db: Session, region: str) -> float:
-    if not region:
-        return 0.0
-    factor = (
-        db.query(RegionEmissionFactor)
-        .filter(RegionEmissionFactor.region == region.lower())
-        .order_by(RegionEmissionFactor.version.desc())
-        .first()
-    )
-    return factor.factor_kg_co2e_per_kwh if factor else 0.0004
-
-
 def _metrics_tuple(db: Session, run: JobRun) -> Dict[str, Any]:
     duration = _duration_seconds(run)
     energy_kwh = run.energy.total_kwh if run.energy else None
     carbon = run.energy.emissions_kg if run.energy else None
     cost = run.costs.amount_usd if run.costs else None
-    factor = _emission_factor(db, run.region or "")
+    factor = factor_resolver.resolve(run.region)
     if carbon is None and energy_kwh is not None:
         carbon = energy_kwh * factor
     return {
@@ -0,0 +1,296 @@
+"""Vectorized energy and emissions computation for batches of job runs.
+
+One engine serves the request path (``emissions_service``), the RQ worker
+(``workers.tasks``) and run comparison. A batch is loaded with a single query
+(run, energy and hardware columns, durations as epoch seconds), computed with
+NumPy in one pass and written back with one ``UPDATE ... FROM (VALUES ...)``
+(plus one upsert for runs that have no energy row yet).
+
+Energy, first non-zero of:
+
+1. the reported ``total_kwh``;
+2. the sum of reported cpu/gpu/ram kWh;
+3. ``metadata.power_watts`` (or ``avg_power_watts``) × duration, where a run
+   without ``end_time`` is measured up to now;
+4. for finished runs, a hardware estimate: cores × ``DEFAULT_CPU_W_PER_CORE``
+   (at least one core) + ``details.gpu_count`` × ``DEFAULT_GPU_W`` +
+   ``DEFAULT_BASE_OVERHEAD_W``, over the run's duration.
+
+Runs with no energy after that are marked ``incomplete``. Emissions are energy
+× the run's factor (kg CO2e/kWh): the mean hourly grid intensity over the run
+(``grid_intensity``), with the region's static factor from ``factor_resolver``
+for hours the series does not cover.
+"""
+from __future__ import annotations
+
+import logging
+from dataclasses import dataclass, fields, replace
+from datetime import datetime, timezone
+from typing import Any, Dict, List, Optional, Sequence
+from uuid import UUID, uuid4
+
+import numpy as np
+from sqlalchemy import Float, String, Text, cast, column, func, select, update, values
+from sqlalchemy.dialects.postgresql import JSONB, UUID as PG_UUID, insert as pg_insert
+from sqlalchemy.orm import Session
+
+from backend.app.core.config import get_settings
+from backend.app.models.job_run import JobRun, JobRunEnergy, JobRunHardware
+from backend.app.services.factor_resolver import factor_resolver
+from backend.app.services.grid_intensity import run_factors
+
+settings = get_settings()
+logger = logging.getLogger(__name__)
+
+METHODS = ("none", "reported", "components", "power_hint", "hardware_estimate")
+NONE, REPORTED, COMPONENTS, POWER_HINT, HARDWARE_ESTIMATE = range(len(METHODS))
+INCOMPLETE_ERROR = "insufficient telemetry for energy_kwh"
+# Runs in these states are marked completed once they have an end_time
+_OPEN_STATUSES = ("running", "ingested", "processing")
+
+
+def _floats(raw: Sequence[Any]) -> np.ndarray:
+    """Numbers (including numeric strings) to float64; anything else becomes NaN."""
+    out = np.full(len(raw), np.nan)
+    for i, value in enumerate(raw):
+        if value is None:
+            continue
+        try:
+            out[i] = float(value)
+        except (TypeError, ValueError):
+            pass
+    return out
+
+
+@dataclass
+class RunInputs:
+    """Columnar inputs for a batch of runs; NaN marks a missing value."""
+
+    job_run_ids: List[UUID]
+    energy_ids: List[Optional[UUID]]
+    regions: List[str]
+    total_kwh: np.ndarray
+    cpu_kwh: np.ndarray
+    gpu_kwh: np.ndarray
+    ram_kwh: np.ndarray
+    start_epoch: np.ndarray
+    end_epoch: np.ndarray
+    power_watts: np.ndarray
+    cpu_cores: np.ndarray
+    gpu_count: np.ndarray
+    # What job_run_energy holds now, to skip unchanged rows on recompute
+    current_emissions_kg: np.ndarray
+    current_status: List[Optional[str]]
+
+    @classmethod
+    def from_rows(cls, rows: Sequence[Any]) -> "RunInputs":
+        return cls(
+            job_run_ids=[r.id for r in rows],
+            energy_ids=[r.energy_id for r in rows],
+            regions=[(r.region or "").strip().lower() for r in rows],
+            total_kwh=_floats([r.total_kwh for r in rows]),
+            cpu_kwh=_floats([r.cpu_kwh for r in rows]),
+            gpu_kwh=_floats([r.gpu_kwh for r in rows]),
+            ram_kwh=_floats([r.ram_kwh for r in rows]),
+            start_epoch=_floats([r.start_epoch for r in rows]),
+            end_epoch=_floats([r.end_epoch for r in rows]),
+            power_watts=_floats([r.power_watts for r in rows]),
+            cpu_cores=_floats([r.cpu_count for r in rows]),
+            gpu_count=_floats([r.gpu_count for r in rows]),
+            current_emissions_kg=_floats([r.emissions_kg for r in rows]),
+            current_status=[r.compute_status for r in rows],
+        )
+
+    def __len__(self) -> int:
+        return len(self.job_run_ids)
+
+    def take(self, index: np.ndarray) -> "RunInputs":
+        return _take(self, index)
+
+
+def _take(columns, index: np.ndarray):
+    """Rows ``index`` of a columnar dataclass (arrays and lists alike)."""
+    picked = {}
+    for f in fields(columns):
+        value = getattr(columns, f.name)
+        picked[f.name] = value[index] if isinstance(value, np.ndarray) else [value[i] for i in index]
+    return replace(columns, **picked)
+
+
+@dataclass
+class EmissionsBatch:
+    job_run_ids: List[UUID]
+    energy_kwh: np.ndarray
+    emissions_kg: np.ndarray
+    factor: np.ndarray  # kg CO2e per kWh
+    method: np.ndarray  # index into METHODS
+    ok: np.ndarray
+
+    def result(self, index: int) -> Dict[str, Any]:
+        return {
+            "job_run_id": str(self.job_run_ids[index]),
+            "ok": bool(self.ok[index]),
+            "energy_kwh": float(self.energy_kwh[index]),
+            "emissions_kg": float(self.emissions_kg[index]),
+            "carbon_intensity_g_per_kwh": float(self.factor[index] * 1000.0),
+            "method": METHODS[int(self.method[index])],
+        }
+
+    def take(self, index: np.ndarray) -> "EmissionsBatch":
+        return _take(self, index)
+
+
+def compute_batch(inputs: RunInputs, factor: np.ndarray, now_epoch: float) -> EmissionsBatch:
+    """Energy fallbacks and emissions for every run of the batch at once."""
+    reported = np.nan_to_num(inputs.total_kwh)
+    components = np.nansum(np.vstack([inputs.cpu_kwh, inputs.gpu_kwh, inputs.ram_kwh]), axis=0)
+    kwh = np.where(reported > 0, reported, components)
+    method = np.where(reported > 0, REPORTED, np.where(components > 0, COMPONENTS, NONE))
+
+    started = ~np.isnan(inputs.start_epoch)
+    finished = started & ~np.isnan(inputs.end_epoch)
+    until = np.where(np.isnan(inputs.end_epoch), now_epoch, inputs.end_epoch)
+    hours = np.where(started, np.clip((until - np.nan_to_num(inputs.start_epoch)) / 3600.0, 0.0, None), 0.0)
+
+    use_hint = (kwh <= 0) & ~np.isnan(inputs.power_watts) & started
+    kwh = np.where(use_hint, np.clip(np.nan_to_num(inputs.power_watts), 0.0, None) * hours / 1000.0, kwh)
+    method = np.where(use_hint, POWER_HINT, method)
+
+    watts = (
+        np.maximum(np.nan_to_num(inputs.cpu_cores), 1.0) * settings.default_cpu_w_per_core
+        + np.maximum(np.nan_to_num(inputs.gpu_count), 0.0) * settings.default_gpu_w
+        + settings.default_base_overhead_w
+    )
+    use_estimate = (kwh <= 0) & finished & (hours > 0)
+    kwh = np.where(use_estimate, watts * hours / 1000.0, kwh)
+    method = np.where(use_estimate, HARDWARE_ESTIMATE, method)
+
+    ok = kwh > 0
+    method = np.where(ok, method, NONE)
+    return EmissionsBatch(
+        job_run_ids=list(inputs.job_run_ids),
+        energy_kwh=np.where(ok, kwh, 0.0),
+        emissions_kg=np.where(ok, kwh * factor, 0.0),
+        factor=factor,
+        method=method,
+        ok=ok,
+    )
+
+
+def inputs_statement(job_run_ids: Sequence[UUID]):
+    metadata = cast(JobRun.run_metadata, JSONB)
+    return (
+        select(
+            JobRun.id,
+            JobRun.region,
+            func.extract("epoch", JobRun.start_time).label("start_epoch"),
+            func.extract("epoch", JobRun.end_time).label("end_epoch"),
+            func.coalesce(metadata["power_watts"].astext, metadata["avg_power_watts"].astext).label("power_watts"),
+            JobRunEnergy.id.label("energy_id"),
+            JobRunEnergy.total_kwh,
+            JobRunEnergy.cpu_kwh,
+            JobRunEnergy.gpu_kwh,
+            JobRunEnergy.ram_kwh,
+            JobRunEnergy.emissions_kg,
+            JobRunEnergy.compute_status,
+            JobRunHardware.cpu_count,
+            cast(JobRunHardware.details, JSONB)["gpu_count"].astext.label("gpu_count"),
+        )
+        .select_from(JobRun)
+        .outerjoin(JobRunEnergy, JobRunEnergy.job_run_id == JobRun.id)
+        .outerjoin(JobRunHardware, JobRunHardware.job_run_id == JobRun.id)
+        .where(JobRun.id.in_(list(job_run_ids)))
+    )
+
+
+def _energy_rows(batch: EmissionsBatch) -> List[Dict[str, Any]]:
+    return [
+        {
+            "job_run_id": batch.job_run_ids[i],
+            "total_kwh": float(batch.energy_kwh[i]),
+            "emissions_kg": float(batch.emissions_kg[i]),
+            "compute_status": "success" if batch.ok[i] else "incomplete",
+            "compute_error": None if batch.ok[i] else INCOMPLETE_ERROR,
+        }
+        for i in range(len(batch.job_run_ids))
+    ]
+
+
+def persist(db: Session, inputs: RunInputs, batch: EmissionsBatch) -> None:
+    """Write a computed batch: one UPDATE for existing energy rows, one upsert for new ones."""
+    rows = _energy_rows(batch)
+    existing = [{"id": energy_id, **row} for energy_id, row in zip(inputs.energy_ids, rows) if energy_id]
+    missing = [row for energy_id, row in zip(inputs.energy_ids, rows) if not energy_id]
+    table = JobRunEnergy.__table__
+
+    if existing:
+        computed = values(
+            column("id", PG_UUID(as_uuid=True)),
+            column("total_kwh", Float),
+            column("emissions_kg", Float),
+            column("compute_status", String),
+            column("compute_error", Text),
+            name="computed",
+        ).data([(r["id"], r["total_kwh"], r["emissions_kg"], r["compute_status"], r["compute_error"]) for r in existing])
+        db.execute(
+            update(table)
+            .where(table.c.id == computed.c.id)
+            .values(
+                total_kwh=computed.c.total_kwh,
+                emissions_kg=computed.c.emissions_kg,
+                compute_status=computed.c.compute_status,
+                compute_error=computed.c.compute_error,
+            )
+        )
+    if missing:
+        stmt = pg_insert(table).values([{"id": uuid4(), **row} for row in missing])
+        db.execute(
+            stmt.on_conflict_do_update(
+                index_elements=[table.c.job_run_id],
+                set_={
+                    name: stmt.excluded[name]
+                    for name in ("total_kwh", "emissions_kg", "compute_status", "compute_error")
+                },
+            )
+        )
+    db.execute(
+        update(JobRun)
+        .where(
+            JobRun.id.in_(batch.job_run_ids),
+            JobRun.end_time.isnot(None),
+            func.lower(JobRun.status).in_(_OPEN_STATUSES),
+        )
+        .values(status="completed")
+        .execution_options(synchronize_session=False)
+    )
+
+
+def changed(inputs: RunInputs, batch: EmissionsBatch) -> np.ndarray:
+    """Positions whose computed emissions or status differ from what is stored."""
+    stored = np.nan_to_num(inputs.current_emissions_kg, nan=-1.0)
+    status = np.array([s or "" for s in inputs.current_status], dtype=object)
+    expected = np.where(batch.ok, "success", "incomplete").astype(object)
+    return np.flatnonzero(~np.isclose(batch.emissions_kg, stored, rtol=1e-9, atol=1e-12) | (status != expected))
+
+
+def compute_inputs(db: Session, inputs: RunInputs, now: Optional[datetime] = None) -> EmissionsBatch:
+    """Compute a loaded batch (grid-integrated factors included) without writing it."""
+    if not len(inputs):
+        return compute_batch(inputs, np.zeros(0), 0.0)
+    now_epoch = (now or datetime.now(timezone.utc)).timestamp()
+    until = np.where(np.isnan(inputs.end_epoch), now_epoch, inputs.end_epoch)
+    factor = run_factors(db, inputs.regions, inputs.start_epoch, until, factor_resolver.resolve_many(inputs.regions))
+    return compute_batch(inputs, factor, now_epoch)
+
+
+def load_inputs(db: Session, job_run_ids: Sequence[UUID]) -> RunInputs:
+    return RunInputs.from_rows(db.execute(inputs_statement(job_run_ids)).all())
+
+
+def compute_emissions(db: Session, job_run_ids: Sequence[UUID], now: Optional[datetime] = None) -> EmissionsBatch:
+    """Load, compute and persist a batch of runs; the caller commits. Unknown ids are skipped."""
+    inputs = load_inputs(db, job_run_ids)
+    batch = compute_inputs(db, inputs, now)
+    if len(inputs):
+        persist(db, inputs, batch)
+    return batch
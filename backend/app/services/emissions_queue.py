@@ -0,0 +1,237 @@
+"""Batched emissions computation over a Redis Stream.
+
+The outbox relay (``services.outbox``) adds the ids of written runs to
+their organization's pending sorted set, scored by when they become due
+(now + ``EMISSIONS_QUEUE_DEBOUNCE_MS``). Adding a run that is already
+pending is a no-op, so SDK retries and heartbeat updates within the window
+coalesce into one computation of the run's latest state.
+
+Batch workers (``worker.py --batch``) move due ids into the stream, as many
+as they are about to read, choosing between organizations by deficit round
+robin weighted by subscription plan (``compute_weight`` in
+``billing_service.PLANS``): one tenant's backfill only ever holds its share
+of the workers, however many runs it queued. They read up to
+``EMISSIONS_QUEUE_BATCH_SIZE`` ids at a time through a consumer group and
+compute them with one engine pass: one input query for the whole batch and
+one bulk write. Entries are acknowledged only after their batch commits, so
+a crashed worker's entries are re-claimed by another one after
+``EMISSIONS_QUEUE_CLAIM_IDLE_MS``. Computing a run twice is harmless.
+"""
+from __future__ import annotations
+
+import logging
+import time
+from typing import Callable, Dict, Iterable, List, Mapping, Optional, Sequence, Tuple
+from uuid import UUID
+
+import redis
+from sqlalchemy import select
+from sqlalchemy.orm import Session
+
+from backend.app.core.config import get_settings
+from backend.app.core.database import SessionLocal
+from backend.app.models.organization import Organization
+from backend.app.observability.metrics import emissions_queue_runs
+from backend.app.services.billing_service import PLANS
+from backend.app.services.emissions_engine import compute_emissions
+from backend.app.services.fair_scheduler import DeficitRoundRobin
+
+settings = get_settings()
+logger = logging.getLogger(__name__)
+
+Message = Tuple[str, dict]
+
+# Runs scheduled without an organization share this tenant
+NO_TENANT = "-"
+_WEIGHT_TTL_SECONDS = 300.0
+
+# Due pending ids of one tenant -> stream entries, atomically so a run is never both or
+# neither; a tenant with nothing left pending leaves the tenant set
+_PROMOTE_DUE = """
+local due = redis.call('ZRANGEBYSCORE', KEYS[1], '-inf', ARGV[1], 'LIMIT', 0, ARGV[2])
+for _, id in ipairs(due) do
+    redis.call('XADD', KEYS[2], '*', 'job_run_id', id)
+end
+if #due > 0 then
+    redis.call('ZREM', KEYS[1], unpack(due))
+end
+if redis.call('ZCARD', KEYS[1]) == 0 then
+    redis.call('SREM', KEYS[3], ARGV[3])
+end
+return #due
+"""
+
+_weights: Dict[str, Tuple[float, float]] = {}
+
+
+def plan_weights(tenants: Sequence[str]) -> Dict[str, float]:
+    """Scheduling weight per organization from its plan's ``compute_weight``, cached for a few minutes."""
+    now = time.monotonic()
+    missing = [t for t in tenants if t != NO_TENANT and (t not in _weights or _weights[t][1] < now)]
+    if missing:
+        with SessionLocal() as db:
+            plans = dict(
+                db.execute(
+                    select(Organization.id, Organization.subscription_plan).where(
+                        Organization.id.in_([UUID(t) for t in missing])
+                    )
+                ).all()
+            )
+        for tenant in missing:
+            plan = PLANS.get(plans.get(UUID(tenant)) or "") or {}
+            _weights[tenant] = (float(plan.get("compute_weight", 1)), now + _WEIGHT_TTL_SECONDS)
+    return {t: _weights[t][0] if t in _weights else 1.0 for t in tenants}
+
+
+class EmissionsQueue:
+    def __init__(self, weights: Callable[[Sequence[str]], Mapping[str, float]] = plan_weights):
+        self.stream = settings.emissions_queue_stream
+        self.group = settings.emissions_queue_group
+        self.pending = f"{self.stream}:pending"
+        self.tenants = f"{self.stream}:tenants"
+        self.scheduler = DeficitRoundRobin(settings.emissions_queue_quantum)
+        self.weights = weights
+        self._redis = None
+        self._promote = None
+        self._retry_at = 0.0
+        self._group_ready = False
+
+    @property
+    def client(self) -> Optional[redis.Redis]:
+        if self._redis is None and time.monotonic() >= self._retry_at:
+            try:
+                client = redis.Redis.from_url(settings.redis_url, decode_responses=True)
+                client.ping()
+                self._redis = client
+            except Exception:
+                self._retry_at = time.monotonic() + 30
+                logger.info("Redis not available, queued emissions compute disabled for 30s")
+        return self._redis
+
+    def pending_key(self, tenant: str) -> str:
+        return f"{self.pending}:{tenant}"
+
+    # --- producer -------------------------------------------------------
+
+    def schedule(self, job_run_ids: Iterable[UUID], organization_id: Optional[UUID] = None) -> bool:
+        """Mark an organization's runs pending; False when Redis is unavailable."""
+        ids = [str(i) for i in dict.fromkeys(job_run_ids)]
+        if not ids:
+            return True
+        client = self.client
+        if client is None:
+            return False
+        tenant = str(organization_id) if organization_id else NO_TENANT
+        due_ms = int(time.time() * 1000) + settings.emissions_queue_debounce_ms
+        try:
+            pipe = client.pipeline()
+            # NX: an already pending run keeps its due time, so a steady trickle of updates
+            # cannot postpone it indefinitely
+            pipe.zadd(self.pending_key(tenant), {job_run_id: due_ms for job_run_id in ids}, nx=True)
+            pipe.sadd(self.tenants, tenant)
+            added = pipe.execute()[0]
+        except redis.RedisError:
+            logger.warning("Emissions enqueue failed", exc_info=True)
+            return False
+        emissions_queue_runs.labels("scheduled").inc(added)
+        emissions_queue_runs.labels("coalesced").inc(len(ids) - added)
+        return True
+
+    # --- consumer -------------------------------------------------------
+
+    def ensure_group(self) -> None:
+        if self._group_ready:
+            return
+        try:
+            self.client.xgroup_create(self.stream, self.group, id="0", mkstream=True)
+        except redis.ResponseError as exc:
+            if "BUSYGROUP" not in str(exc):
+                raise
+        self._group_ready = True
+
+    def promote_due(self, limit: int) -> int:
+        """Move up to ``limit`` due pending runs into the stream, shared between tenants by weight."""
+        client = self.client
+        if self._promote is None:
+            self._promote = client.register_script(_PROMOTE_DUE)
+        tenants = sorted(client.smembers(self.tenants))
+        if not tenants:
+            return 0
+        now_ms = int(time.time() * 1000)
+        pipe = client.pipeline(transaction=False)
+        for tenant in tenants:
+            pipe.zcount(self.pending_key(tenant), "-inf", now_ms)
+        backlog = {tenant: count for tenant, count in zip(tenants, pipe.execute()) if count}
+        if not backlog:
+            return 0
+        take = self.scheduler.select(backlog, self.weights(list(backlog)), limit)
+        pipe = client.pipeline(transaction=False)
+        for tenant, count in take.items():
+            self._promote(keys=[self.pending_key(tenant), self.stream, self.tenants], args=[now_ms, count, tenant], client=pipe)
+        return sum(pipe.execute())
+
+    def read(self, consumer: str, count: int, block_ms: int) -> List[Message]:
+        """Stale entries abandoned by dead workers first, then new ones."""
+        self.ensure_group()
+        client = self.client
+        self.promote_due(count)
+        _, claimed, _ = client.xautoclaim(
+            self.stream, self.group, consumer, min_idle_time=settings.emissions_queue_claim_idle_ms, count=count
+        )
+        messages: List[Message] = [(entry_id, fields) for entry_id, fields in claimed if fields]
+        if len(messages) < count:
+            for _, entries in client.xreadgroup(
+                self.group, consumer, {self.stream: ">"}, count=count - len(messages), block=block_ms
+            ) or []:
+                messages.extend(entries)
+        return messages
+
+    def ack(self, entry_ids: Sequence[str]) -> None:
+        if not entry_ids:
+            return
+        pipe = self.client.pipeline()
+        pipe.xack(self.stream, self.group, *entry_ids)
+        pipe.xdel(self.stream, *entry_ids)
+        pipe.execute()
+
+
+def job_run_ids(messages: Sequence[Message]) -> List[UUID]:
+    """Distinct run ids of a batch in arrival order; malformed entries are skipped."""
+    ids = []
+    for entry_id, fields in messages:
+        try:
+            ids.append(UUID(fields["job_run_id"]))
+        except (KeyError, ValueError):
+            logger.warning("Dropping malformed emissions queue entry %s", entry_id)
+    return list(dict.fromkeys(ids))
+
+
+def process_messages(db: Session, queue: EmissionsQueue, messages: Sequence[Message]) -> int:
+    """Compute and acknowledge a read batch; returns the number of entries handled.
+
+    A failed batch is rolled back and left pending, to be re-claimed after the idle timeout.
+    """
+    ids = job_run_ids(messages)
+    try:
+        if ids:
+            compute_emissions(db, ids)
+        db.commit()
+    except Exception:
+        db.rollback()
+        logger.exception("Emissions batch of %s runs failed, left pending", len(ids))
+        emissions_queue_runs.labels("failed").inc(len(ids))
+        return 0
+    queue.ack([entry_id for entry_id, _ in messages])
+    emissions_queue_runs.labels("computed").inc(len(ids))
+    return len(messages)
+
+
+def drain_once(db: Session, queue: EmissionsQueue, consumer: str, batch_size: Optional[int] = None) -> int:
+    """Read, compute and acknowledge one batch; returns the number of entries handled."""
+    messages = queue.read(consumer, batch_size or settings.emissions_queue_batch_size, settings.emissions_queue_block_ms)
+    if not messages:
+        return 0
+    return process_messages(db, queue, messages)
+
+
+emissions_queue = EmissionsQueue()
@@ -0,0 +1,208 @@
+"""Streaming bulk export of job runs with their energy, cost and hardware rows.
+
+Runs are read through a server-side cursor (``stream_results``) in batches of
+``EXPORT_BATCH_ROWS`` and encoded batch by batch, so memory stays bounded by
+one batch whatever the size of the export. CSV and NDJSON emit the header (if
+any) before the query runs; Parquet writes one row group per batch and yields
+the file bytes as each group is flushed, with the footer last.
+"""
+from __future__ import annotations
+
+import csv
+import io
+import json
+from datetime import datetime
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Sequence, Tuple
+from uuid import UUID
+
+import pyarrow as pa
+import pyarrow.parquet as pq
+from fastapi import HTTPException
+from sqlalchemy import cast, select
+from sqlalchemy.dialects.postgresql import JSONB
+from sqlalchemy.orm import Session
+
+from backend.app.core.config import get_settings
+from backend.app.models.job_run import JobRun, JobRunCost, JobRunEnergy, JobRunHardware
+
+settings = get_settings()
+
+FORMATS = {
+    "csv": ("text/csv; charset=utf-8", "csv"),
+    "ndjson": ("application/x-ndjson", "ndjson"),
+    "parquet": ("application/vnd.apache.parquet", "parquet"),
+}
+
+# (output name, selected column, Parquet type)
+COLUMNS: Tuple[Tuple[str, Any, pa.DataType], ...] = (
+    ("id", JobRun.id, pa.string()),
+    ("project_id", JobRun.project_id, pa.string()),
+    ("run_name", JobRun.run_name, pa.string()),
+    ("job_type", JobRun.job_type, pa.string()),
+    ("region", JobRun.region, pa.string()),
+    ("status", JobRun.status, pa.string()),
+    ("start_time", JobRun.start_time, pa.timestamp("us")),
+    ("end_time", JobRun.end_time, pa.timestamp("us")),
+    ("dedupe_key", JobRun.dedupe_key, pa.string()),
+    ("external_run_id", JobRun.external_run_id, pa.string()),
+    ("model_version_id", JobRun.model_version_id, pa.string()),
+    ("tags", JobRun.tags, pa.string()),
+    ("created_at", JobRun.created_at, pa.timestamp("us")),
+    ("cpu_kwh", JobRunEnergy.cpu_kwh, pa.float64()),
+    ("gpu_kwh", JobRunEnergy.gpu_kwh, pa.float64()),
+    ("ram_kwh", JobRunEnergy.ram_kwh, pa.float64()),
+    ("total_kwh", JobRunEnergy.total_kwh, pa.float64()),
+    ("emissions_kg", JobRunEnergy.emissions_kg, pa.float64()),
+    ("compute_status", JobRunEnergy.compute_status, pa.string()),
+    ("cost_usd", JobRunCost.amount_usd, pa.float64()),
+    ("currency", JobRunCost.currency, pa.string()),
+    ("cpu_count", JobRunHardware.cpu_count, pa.string()),
+    ("gpu_model", JobRunHardware.gpu_model, pa.string()),
+    ("ram_gb", JobRunHardware.ram_gb, pa.float64()),
+)
+COLUMN_NAMES = [name for name, _, _ in COLUMNS]
+PARQUET_SCHEMA = pa.schema([(name, pa_type) for name, _, pa_type in COLUMNS])
+
+
+def parse_tag_filters(tags: Sequence[str]) -> Dict[str, str]:
+    """``key=value`` query values to a containment filter on job_runs.tags."""
+    parsed = {}
+    for tag in tags:
+        key, sep, value = tag.partition("=")
+        if not sep or not key:
+            raise HTTPException(status_code=400, detail=f"Invalid tag filter {tag!r}; expected key=value")
+        parsed[key] = value
+    return parsed
+
+
+def build_export_statement(
+    organization_id: UUID,
+    project_id: Optional[UUID] = None,
+    start: Optional[datetime] = None,
+    end: Optional[datetime] = None,
+    tags: Optional[Dict[str, str]] = None,
+):
+    stmt = (
+        select(*[column for _, column, _ in COLUMNS])
+        .select_from(JobRun)
+        .outerjoin(JobRunEnergy, JobRunEnergy.job_run_id == JobRun.id)
+        .outerjoin(JobRunCost, JobRunCost.job_run_id == JobRun.id)
+        .outerjoin(JobRunHardware, JobRunHardware.job_run_id == JobRun.id)
+        .where(JobRun.organization_id == organization_id)
+    )
+    if project_id:
+        stmt = stmt.where(JobRun.project_id == project_id)
+    if start:
+        stmt = stmt.where(JobRun.start_time >= start)
+    if end:
+        stmt = stmt.where(JobRun.start_time <= end)
+    if tags:
+        stmt = stmt.where(cast(JobRun.tags, JSONB).contains(tags))
+    # Same order as the (organization_id, created_at, id) index: no sort step before the first row
+    return stmt.order_by(JobRun.created_at, JobRun.id)
+
+
+def iter_batches(db: Session, stmt, batch_rows: Optional[int] = None) -> Iterator[List[Sequence[Any]]]:
+    """Result rows in batches, fetched through a server-side cursor."""
+    batch_rows = batch_rows or settings.export_batch_rows
+    result = db.execute(stmt.execution_options(stream_results=True, yield_per=batch_rows))
+    try:
+        for partition in result.partitions(batch_rows):
+            yield partition
+    finally:
+        result.close()
+
+
+def _cell(value: Any) -> Any:
+    if isinstance(value, UUID):
+        return str(value)
+    if isinstance(value, dict):
+        return json.dumps(value, separators=(",", ":"), sort_keys=True)
+    return value
+
+
+def _csv_value(value: Any) -> Any:
+    if value is None:
+        return ""
+    if isinstance(value, datetime):
+        return value.isoformat()
+    return _cell(value)
+
+
+def encode_csv(batches: Iterable[List[Sequence[Any]]]) -> Iterator[bytes]:
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    writer.writerow(COLUMN_NAMES)
+    yield buffer.getvalue().encode("utf-8")
+    for batch in batches:
+        buffer.seek(0)
+        buffer.truncate()
+        writer.writerows([_csv_value(value) for value in row] for row in batch)
+        yield buffer.getvalue().encode("utf-8")
+
+
+def _json_value(value: Any) -> Any:
+    if isinstance(value, UUID):
+        return str(value)
+    if isinstance(value, datetime):
+        return value.isoformat()
+    return value
+
+
+def encode_ndjson(batches: Iterable[List[Sequence[Any]]]) -> Iterator[bytes]:
+    for batch in batches:
+        yield "".join(
+            json.dumps(dict(zip(COLUMN_NAMES, map(_json_value, row))), separators=(",", ":")) + "\n"
+            for row in batch
+        ).encode("utf-8")
+
+
+class _ChunkSink(io.RawIOBase):
+    """Write-only file for ParquetWriter whose bytes are taken out after every row group."""
+
+    def __init__(self):
+        self._chunks: List[bytes] = []
+        self._position = 0
+
+    def writable(self) -> bool:
+        return True
+
+    def write(self, data) -> int:
+        chunk = bytes(data)
+        self._chunks.append(chunk)
+        self._position += len(chunk)
+        return len(chunk)
+
+    def tell(self) -> int:
+        return self._position
+
+    def take(self) -> bytes:
+        data = b"".join(self._chunks)
+        self._chunks.clear()
+        return data
+
+
+def encode_parquet(batches: Iterable[List[Sequence[Any]]]) -> Iterator[bytes]:
+    sink = _ChunkSink()
+    writer = pq.ParquetWriter(sink, PARQUET_SCHEMA, compression="zstd")
+    try:
+        for batch in batches:
+            columns = list(zip(*batch)) if batch else [()] * len(COLUMNS)
+            arrays = [
+                pa.array([_cell(value) for value in values], type=pa_type)
+                for values, (_, _, pa_type) in zip(columns, COLUMNS)
+            ]
+            writer.write_table(pa.Table.from_arrays(arrays, schema=PARQUET_SCHEMA))
+            data = sink.take()
+            if data:
+                yield data
+    finally:
+        writer.close()
+    yield sink.take()
+
+
+ENCODERS = {"csv": encode_csv, "ndjson": encode_ndjson, "parquet": encode_parquet}
+
+
+def export_job_runs(db: Session, fmt: str, stmt, batch_rows: Optional[int] = None) -> Iterator[bytes]:
+    return ENCODERS[fmt](iter_batches(db, stmt, batch_rows))
@@ -0,0 +1,198 @@
+"""In-memory, versioned region → emission factor resolver.
+
+Every factor lookup (emissions engine, comparison, suggestions) goes through
+``factor_resolver``, which answers from an immutable snapshot: the built-in
+table, overlaid with ``CARBON_INTENSITY_MAP_JSON``, overlaid with the latest
+version of each region in ``region_emission_factors``.
+
+Regions resolve by longest token prefix over a trie, tokens being the
+letter and digit runs of the region name: ``us-east-1a`` tries ``us-east-1a``,
+``us-east-1``, ``us-east``, ``us`` and finally the default
+(``DEFAULT_CARBON_INTENSITY_G_PER_KWH``). ``us-east-10`` does not match
+``us-east-1``.
+
+At most every ``EMISSION_FACTOR_REFRESH_SECONDS`` one caller reads the table's
+watermark (row count, latest ``updated_at``); when it moved the snapshot is
+rebuilt and swapped in as a single reference assignment, so readers see
+either the old or the new snapshot, never a mix. Lookups themselves never
+query the database.
+"""
+from __future__ import annotations
+
+import json
+import logging
+import re
+import threading
+import time
+from dataclasses import dataclass, field
+from typing import Any, Dict, Iterable, Optional, Sequence, Tuple
+
+import numpy as np
+from sqlalchemy import func, select
+
+from backend.app.core.config import get_settings
+from backend.app.core.database import SessionLocal
+from backend.app.models.region_emission_factor import RegionEmissionFactor
+
+settings = get_settings()
+logger = logging.getLogger(__name__)
+
+# kg CO2e per kWh; CARBON_INTENSITY_MAP_JSON and region_emission_factors take precedence
+BUILTIN_FACTORS: Dict[str, float] = {
+    # India
+    "ap-south-1": 0.0007,  # AWS Mumbai (approx; override per org)
+    "in": 0.0007,
+    # US
+    "us-east-1": 0.00038,
+    "us-west-2": 0.00025,
+    "us": 0.00038,
+    # EU
+    "eu-west-1": 0.00023,
+    "eu-central-1": 0.00027,
+    "eu": 0.00025,
+    # Asia Pacific
+    "ap-northeast-1": 0.00045,
+}
+
+_TOKEN_RE = re.compile(r"[a-z]+|\d+")
+
+
+def region_tokens(region: Optional[str]) -> Tuple[str, ...]:
+    return tuple(_TOKEN_RE.findall((region or "").strip().lower()))
+
+
+def region_prefixes(region: Optional[str]) -> Tuple[str, ...]:
+    """The normalized region cut after each token, longest first: ``us-east-1a``, ``us-east-1``, ..., ``us``."""
+    normalized = (region or "").strip().lower()
+    return tuple(normalized[: m.end()] for m in reversed(list(_TOKEN_RE.finditer(normalized))))
+
+
+def _version_key(version: Optional[str]) -> Tuple[Any, ...]:
+    """Natural order for version labels, so v10 sorts after v9."""
+    return tuple(int(part) if part.isdigit() else part for part in re.findall(r"\d+|\D+", version or ""))
+
+
+@dataclass
+class _Node:
+    children: Dict[str, "_Node"] = field(default_factory=dict)
+    factor: Optional[float] = None
+
+
+@dataclass(frozen=True)
+class FactorSnapshot:
+    """Immutable factor table compiled into a token trie."""
+
+    factors: Dict[str, float]
+    default: float
+    watermark: Optional[Tuple[Any, ...]] = None
+    _root: _Node = field(default_factory=_Node, repr=False, compare=False)
+
+    @classmethod
+    def build(cls, factors: Dict[str, float], default: float, watermark=None) -> "FactorSnapshot":
+        root = _Node()
+        for region, factor in factors.items():
+            node = root
+            for token in region_tokens(region):
+                node = node.children.setdefault(token, _Node())
+            node.factor = factor
+        return cls(factors=dict(factors), default=default, watermark=watermark, _root=root)
+
+    def resolve(self, region: Optional[str]) -> float:
+        """Factor of the longest known prefix of ``region`` (kg CO2e/kWh)."""
+        node, best = self._root, None
+        for token in region_tokens(region):
+            node = node.children.get(token)
+            if node is None:
+                break
+            if node.factor is not None:
+                best = node.factor
+        return self.default if best is None else best
+
+    def resolve_many(self, regions: Sequence[str]) -> np.ndarray:
+        """Per-region factors, walking the trie once per distinct region."""
+        if not len(regions):
+            return np.zeros(0)
+        unique, inverse = np.unique(np.asarray(regions, dtype=object).astype(str), return_inverse=True)
+        return np.array([self.resolve(region) for region in unique])[inverse]
+
+
+def _env_factors() -> Dict[str, float]:
+    if not settings.carbon_intensity_map_json.strip():
+        return {}
+    try:
+        override = json.loads(settings.carbon_intensity_map_json)
+        return {str(region).strip().lower(): float(grams) / 1000.0 for region, grams in override.items()}
+    except (AttributeError, TypeError, ValueError):
+        logger.warning("Invalid CARBON_INTENSITY_MAP_JSON; ignoring.")
+        return {}
+
+
+def latest_factors(rows: Iterable[Tuple[str, float, str]]) -> Dict[str, float]:
+    """Latest version of each region from (region, factor, version) rows."""
+    latest: Dict[str, Tuple[Tuple[Any, ...], float]] = {}
+    for region, factor, version in rows:
+        key = region.strip().lower()
+        rank = _version_key(version)
+        if key not in latest or rank >= latest[key][0]:
+            latest[key] = (rank, float(factor))
+    return {region: factor for region, (_, factor) in latest.items()}
+
+
+def compile_snapshot(rows: Iterable[Tuple[str, float, str]] = (), watermark=None) -> FactorSnapshot:
+    factors = {**BUILTIN_FACTORS, **_env_factors(), **latest_factors(rows)}
+    return FactorSnapshot.build(factors, settings.default_carbon_intensity_g_per_kwh / 1000.0, watermark)
+
+
+_WATERMARK = select(func.count(RegionEmissionFactor.id), func.max(RegionEmissionFactor.updated_at))
+_ROWS = select(
+    RegionEmissionFactor.region, RegionEmissionFactor.factor_kg_co2e_per_kwh, RegionEmissionFactor.version
+)
+
+
+class FactorResolver:
+    def __init__(self, session_factory=SessionLocal):
+        self._session_factory = session_factory
+        self._snapshot: Optional[FactorSnapshot] = None
+        self._checked_at = 0.0
+        self._lock = threading.Lock()
+
+    def snapshot(self) -> FactorSnapshot:
+        """Current snapshot, refreshed first if the refresh interval has passed."""
+        snapshot = self._snapshot
+        if snapshot is None or time.monotonic() - self._checked_at >= settings.emission_factor_refresh_seconds:
+            # One caller checks the watermark; the others keep using the snapshot they have
+            if self._lock.acquire(blocking=snapshot is None):
+                try:
+                    self._refresh()
+                finally:
+                    self._lock.release()
+        return self._snapshot
+
+    def _refresh(self) -> None:
+        current = self._snapshot
+        if current is not None and time.monotonic() - self._checked_at < settings.emission_factor_refresh_seconds:
+            return
+        try:
+            with self._session_factory() as db:
+                watermark = tuple(db.execute(_WATERMARK).one())
+                if current is None or watermark != current.watermark:
+                    self._snapshot = compile_snapshot(db.execute(_ROWS).all(), watermark)
+                    logger.info("Loaded %d emission factors (watermark %s)", len(self._snapshot.factors), watermark)
+        except Exception:
+            logger.warning("Could not refresh emission factors; using %s", "cached" if current else "built-ins", exc_info=True)
+            if current is None:
+                self._snapshot = compile_snapshot()
+        self._checked_at = time.monotonic()
+
+    def invalidate(self) -> None:
+        """Check the watermark on the next lookup (after factors were edited in-process)."""
+        self._checked_at = 0.0
+
+    def resolve(self, region: Optional[str]) -> float:
+        return self.snapshot().resolve(region)
+
+    def resolve_many(self, regions: Sequence[str]) -> np.ndarray:
+        return self.snapshot().resolve_many(regions)
+
+
+factor_resolver = FactorResolver()
@@ -0,0 +1,69 @@
+"""Deficit round robin across tenants' work queues.
+
+Each tenant with work gets, on its turn, ``quantum × weight`` credit and
+may take as many items as its credit covers; unused credit carries over to
+its next turn while it still has work and is dropped once its queue is
+empty. Over any stretch of contention a tenant's share of the items taken
+is proportional to its weight, however deep any one queue is, and a tenant
+that has just arrived waits at most one round.
+"""
+from __future__ import annotations
+
+from typing import Dict, List, Mapping
+
+
+class DeficitRoundRobin:
+    def __init__(self, quantum: int):
+        self.quantum = quantum
+        self.deficit: Dict[str, float] = {}
+        self._order: List[str] = []
+        self._position = 0
+        self._turn_open = False  # whether the tenant at _position was already credited
+
+    def _sync(self, backlog: Mapping[str, int]) -> None:
+        current = self._order[self._position] if self._order else None
+        self._order = [t for t in self._order if backlog.get(t, 0) > 0]
+        self._order += [t for t, n in backlog.items() if n > 0 and t not in self.deficit]
+        for tenant in list(self.deficit):
+            if backlog.get(tenant, 0) <= 0:
+                del self.deficit[tenant]
+        for tenant in self._order:
+            self.deficit.setdefault(tenant, 0.0)
+        if current in self._order:
+            self._position = self._order.index(current)
+        else:
+            self._position, self._turn_open = 0, False
+        if self._order:
+            self._position %= len(self._order)
+
+    def _advance(self) -> None:
+        self._position = (self._position + 1) % len(self._order)
+        self._turn_open = False
+
+    def select(self, backlog: Mapping[str, int], weights: Mapping[str, float], budget: int) -> Dict[str, int]:
+        """Items to take per tenant to fill ``budget``; ``backlog`` is each tenant's ready items."""
+        self._sync(backlog)
+        remaining = {tenant: backlog[tenant] for tenant in self._order}
+        taken: Dict[str, int] = {}
+        while budget > 0 and self._order:
+            tenant = self._order[self._position]
+            if not self._turn_open:
+                self.deficit[tenant] += self.quantum * max(weights.get(tenant, 1.0), 0.01)
+                self._turn_open = True
+            n = min(int(self.deficit[tenant]), remaining[tenant], budget)
+            if n:
+                taken[tenant] = taken.get(tenant, 0) + n
+                self.deficit[tenant] -= n
+                remaining[tenant] -= n
+                budget -= n
+            if not remaining[tenant]:
+                # Empty queue: its credit is dropped and it leaves the round
+                del self.deficit[tenant], remaining[tenant]
+                self._order.pop(self._position)
+                self._turn_open = False
+                if self._order:
+                    self._position %= len(self._order)
+            elif self.deficit[tenant] < 1:
+                self._advance()
+            # else the budget ran out mid-turn; the tenant resumes its turn next call
+        return taken
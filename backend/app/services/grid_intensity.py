@@ -0,0 +1,207 @@
+"""Hourly grid carbon intensity and interval-integrated emission factors.
+
+Intensity is stored per region and UTC day as a 24-value array
+(``grid_intensity_days``, g CO2e/kWh, NULL for gaps). For a batch of runs the
+days spanning the batch are loaded once per region into a dense hourly array
+with two prefix sums: intensity (gaps as 0) and covered hours. Any interval's
+integral is then two lookups into each prefix sum, interpolated inside the
+boundary hours, so a whole region's runs are integrated with a handful of
+NumPy operations.
+
+Power is assumed constant over a run, so its effective factor is the mean
+intensity over ``[start, end]``; hours the series does not cover count at the
+run's static factor (``factor_resolver``), as do runs of regions without a
+series and runs without a positive duration. A run uses the series of its
+region's longest token prefix, like static factors do: ``us-east-1a`` is
+integrated against the ``us-east-1`` series when it has none of its own.
+"""
+from __future__ import annotations
+
+from collections import defaultdict
+from dataclasses import dataclass
+from datetime import date, datetime, timezone
+from typing import Dict, Iterable, List, Optional, Sequence, Tuple
+
+import numpy as np
+from sqlalchemy import select, tuple_
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.orm import Session
+
+from backend.app.core.config import get_settings
+from backend.app.models.grid_intensity import GridIntensityDay
+from backend.app.services.factor_resolver import region_prefixes, region_tokens
+
+settings = get_settings()
+
+HOUR = 3600.0
+HOURS_PER_DAY = 24
+_EPOCH_DAY = date(1970, 1, 1)
+
+
+def _day_epoch(day: date) -> float:
+    return (day - _EPOCH_DAY).days * 86400.0
+
+
+def _epoch_day(epoch: float) -> date:
+    return datetime.fromtimestamp(epoch, tz=timezone.utc).date()
+
+
+@dataclass(frozen=True)
+class HourlySeries:
+    """Dense hourly intensity (kg CO2e/kWh) from ``start_epoch``, with prefix sums."""
+
+    start_epoch: float
+    filled: np.ndarray  # intensity per hour, 0 in gaps
+    valid: np.ndarray  # 1.0 where the hour has a value
+    integral: np.ndarray  # prefix sums of filled, len + 1
+    covered: np.ndarray  # prefix sums of valid, len + 1
+
+    @classmethod
+    def build(cls, start_epoch: float, values: np.ndarray) -> "HourlySeries":
+        values = np.asarray(values, dtype=float)
+        valid = (~np.isnan(values)).astype(float)
+        filled = np.where(valid > 0, values, 0.0)
+        return cls(
+            start_epoch=start_epoch,
+            filled=filled,
+            valid=valid,
+            integral=np.concatenate(([0.0], np.cumsum(filled))),
+            covered=np.concatenate(([0.0], np.cumsum(valid))),
+        )
+
+    def __len__(self) -> int:
+        return len(self.filled)
+
+    @staticmethod
+    def _at(prefix: np.ndarray, per_hour: np.ndarray, position: np.ndarray) -> np.ndarray:
+        # prefix sum up to a fractional hour position in [0, len]
+        index = np.minimum(position.astype(np.int64), len(per_hour) - 1)
+        return prefix[index] + (position - index) * per_hour[index]
+
+    def integrate(self, start_epoch: np.ndarray, end_epoch: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+        """Per interval: ∫ intensity dt (kg/kWh × hours) and the hours the series covers."""
+        if not len(self):
+            zeros = np.zeros(len(start_epoch))
+            return zeros, zeros
+        a = np.clip((start_epoch - self.start_epoch) / HOUR, 0.0, len(self))
+        b = np.clip((end_epoch - self.start_epoch) / HOUR, 0.0, len(self))
+        integral = self._at(self.integral, self.filled, b) - self._at(self.integral, self.filled, a)
+        covered = self._at(self.covered, self.valid, b) - self._at(self.covered, self.valid, a)
+        return integral, covered
+
+
+def series_from_rows(rows: Iterable[Tuple[str, date, Sequence[Optional[float]]]]) -> Dict[str, HourlySeries]:
+    """(region, day, 24 g/kWh values) rows to one dense series per region; missing days are gaps."""
+    by_region: Dict[str, Dict[date, Sequence[Optional[float]]]] = defaultdict(dict)
+    for region, day, hourly in rows:
+        by_region[region.strip().lower()][day] = hourly
+    series = {}
+    for region, days in by_region.items():
+        first, last = min(days), max(days)
+        values = np.full(((last - first).days + 1) * HOURS_PER_DAY, np.nan)
+        for day, hourly in days.items():
+            offset = (day - first).days * HOURS_PER_DAY
+            values[offset : offset + HOURS_PER_DAY] = np.array(
+                [np.nan if v is None else v / 1000.0 for v in list(hourly)[:HOURS_PER_DAY]]
+                + [np.nan] * (HOURS_PER_DAY - len(hourly))
+            )
+        series[region] = HourlySeries.build(_day_epoch(first), values)
+    return series
+
+
+def effective_factors(
+    series_by_region: Dict[str, HourlySeries],
+    regions: Sequence[str],
+    start_epoch: np.ndarray,
+    end_epoch: np.ndarray,
+    static: np.ndarray,
+) -> np.ndarray:
+    """Mean intensity over each run's interval, static factor for uncovered hours."""
+    factor = np.array(static, dtype=float, copy=True)
+    if not series_by_region or not len(regions):
+        return factor
+    hours = np.nan_to_num((end_epoch - start_epoch) / HOUR)
+    has_interval = np.isfinite(start_epoch) & np.isfinite(end_epoch) & (hours > 0)
+    by_tokens = {region_tokens(region): series for region, series in series_by_region.items()}
+    unique, inverse = np.unique(np.asarray(regions, dtype=object).astype(str), return_inverse=True)
+    for code, region in enumerate(unique):
+        tokens = region_tokens(region)
+        series = next((by_tokens[tokens[:n]] for n in range(len(tokens), 0, -1) if tokens[:n] in by_tokens), None)
+        if series is None:
+            continue
+        idx = np.flatnonzero((inverse == code) & has_interval)
+        if not idx.size:
+            continue
+        integral, covered = series.integrate(start_epoch[idx], end_epoch[idx])
+        uncovered = np.clip(hours[idx] - covered, 0.0, None)
+        factor[idx] = (integral + uncovered * static[idx]) / hours[idx]
+    return factor
+
+
+def load_series(db: Session, regions: Iterable[str], start_epoch: float, end_epoch: float) -> Dict[str, HourlySeries]:
+    """Series of the regions and of every token prefix of them, for ``effective_factors`` to choose from."""
+    regions = sorted({prefix for r in regions for prefix in region_prefixes(r)})
+    if not regions:
+        return {}
+    rows = db.execute(
+        select(GridIntensityDay.region, GridIntensityDay.day, GridIntensityDay.hourly_g_per_kwh).where(
+            GridIntensityDay.region.in_(regions),
+            GridIntensityDay.day.between(_epoch_day(start_epoch), _epoch_day(end_epoch)),
+        )
+    ).all()
+    return series_from_rows(rows)
+
+
+def run_factors(
+    db: Session, regions: Sequence[str], start_epoch: np.ndarray, end_epoch: np.ndarray, static: np.ndarray
+) -> np.ndarray:
+    """Effective factors for a batch of runs, reading the series once for the batch's span."""
+    if not settings.grid_intensity_enabled or not len(regions):
+        return static
+    bounded = np.isfinite(start_epoch) & np.isfinite(end_epoch) & (end_epoch > start_epoch)
+    if not bounded.any():
+        return static
+    series = load_series(
+        db,
+        (region for region, keep in zip(regions, bounded) if keep),
+        float(start_epoch[bounded].min()),
+        float(end_epoch[bounded].max()),
+    )
+    return effective_factors(series, regions, start_epoch, end_epoch, static)
+
+
+def upsert_hourly(db: Session, points: Iterable[Tuple[str, datetime, float]], source: Optional[str] = None) -> int:
+    """Merge (region, hour, g/kWh) points into the day rows; returns the number of days written."""
+    days: Dict[Tuple[str, date], Dict[int, float]] = defaultdict(dict)
+    for region, hour, grams in points:
+        if hour.tzinfo is not None:
+            hour = hour.astimezone(timezone.utc)
+        days[(region.strip().lower(), hour.date())][hour.hour] = float(grams)
+    if not days:
+        return 0
+    existing = {
+        (region, day): list(hourly)
+        for region, day, hourly in db.execute(
+            select(GridIntensityDay.region, GridIntensityDay.day, GridIntensityDay.hourly_g_per_kwh).where(
+                tuple_(GridIntensityDay.region, GridIntensityDay.day).in_(list(days))
+            )
+        )
+    }
+    rows: List[dict] = []
+    for (region, day), hours in days.items():
+        hourly = existing.get((region, day)) or [None] * HOURS_PER_DAY
+        for hour, grams in hours.items():
+            hourly[hour] = grams
+        rows.append({"region": region, "day": day, "hourly_g_per_kwh": hourly, "source": source})
+    stmt = pg_insert(GridIntensityDay).values(rows)
+    db.execute(
+        stmt.on_conflict_do_update(
+            index_elements=["region", "day"],
+            set_={
+                "hourly_g_per_kwh": stmt.excluded.hourly_g_per_kwh,
+                "source": stmt.excluded.source,
+                "updated_at": datetime.utcnow(),
+            },
+        )
+    )
+    return len(rows)
@@ -0,0 +1,167 @@
+"""Redis fast path for replayed job-run ingests.
+
+SDK retries and offline-cache replays resend identical payloads. After a
+successful write the response is cached under ``(project_id, dedupe_key)``
+together with the digest of the payload that produced it; a later request
+with the same key and digest is answered from Redis without touching
+Postgres. A different digest misses and takes the normal upsert path, whose
+response then replaces the entry. Every job-run write (batch, NDJSON stream
+and the async consumer included) drops the entries of the keys it wrote, so
+an older payload replayed after a newer one was written elsewhere is applied
+again instead of being answered from a stale entry.
+
+Each key also has a generation counter, bumped by ``reserve`` before a single
+ingest writes and by ``invalidate`` after every write commits. The single
+ingest stores its response only if the counter moved by exactly its own
+write's bump, checked and set atomically in Redis. A response whose write
+overlapped another write of the same key is therefore never cached, whatever
+order the commits and cache calls ran in. Hits are still audited as
+``job_run.ingest``. The cached body is the response of that write, so
+emissions computed afterwards are only visible through ``GET /job-runs/{id}``.
+"""
+from __future__ import annotations
+
+import hashlib
+import json
+import logging
+import time
+from typing import Any, Dict, Iterable, Optional, Tuple
+from uuid import UUID
+
+import redis
+
+from backend.app.core.config import get_settings
+from backend.app.observability.metrics import ingest_idempotency
+from backend.app.schemas.job_run import JobRunCreate
+
+settings = get_settings()
+logger = logging.getLogger(__name__)
+
+KEY_PREFIX = "greenai:idem:job_run"
+
+# Store the entry only while the key's generation is still the expected one
+_STORE_IF_GENERATION = """
+if redis.call('GET', KEYS[1]) ~= ARGV[1] then
+    return 0
+end
+redis.call('SET', KEYS[2], ARGV[2], 'EX', ARGV[3])
+return 1
+"""
+
+
+def payload_digest(payload: JobRunCreate) -> str:
+    """Stable digest of the run as it will be written (after project/dedupe are filled in)."""
+    canonical = json.dumps(payload.model_dump(mode="json"), sort_keys=True, separators=(",", ":"))
+    return hashlib.sha256(canonical.encode("utf-8")).hexdigest()
+
+
+class IdempotencyCache:
+    def __init__(self):
+        self._redis = None
+        self._store = None
+        self._retry_at = 0.0
+
+    @property
+    def client(self) -> Optional[redis.Redis]:
+        if self._redis is None and time.monotonic() >= self._retry_at:
+            try:
+                client = redis.Redis.from_url(settings.redis_url, decode_responses=True)
+                client.ping()
+                self._redis = client
+            except Exception:
+                self._retry_at = time.monotonic() + 30
+                logger.info("Redis not available, ingest idempotency cache disabled for 30s")
+        return self._redis
+
+    @staticmethod
+    def _key(project_id: UUID, dedupe_key: str) -> str:
+        # dedupe keys are client-chosen and unbounded; hash them to a fixed size
+        return f"{KEY_PREFIX}:{project_id}:{hashlib.sha256(dedupe_key.encode('utf-8')).hexdigest()}"
+
+    @classmethod
+    def _generation_key(cls, project_id: UUID, dedupe_key: str) -> str:
+        return f"{cls._key(project_id, dedupe_key)}:gen"
+
+    def get(self, project_id: UUID, dedupe_key: str, digest: str) -> Optional[Dict[str, Any]]:
+        """Cached response for this exact payload, or None."""
+        client = self.client
+        if client is None or settings.ingest_idempotency_ttl_seconds <= 0:
+            return None
+        try:
+            raw = client.get(self._key(project_id, dedupe_key))
+        except redis.RedisError:
+            logger.warning("Idempotency cache lookup failed", exc_info=True)
+            return None
+        if raw is None:
+            ingest_idempotency.labels("miss").inc()
+            return None
+        entry = json.loads(raw)
+        if entry.get("digest") != digest:
+            ingest_idempotency.labels("changed").inc()
+            return None
+        ingest_idempotency.labels("hit").inc()
+        return entry["response"]
+
+    def reserve(self, project_id: UUID, dedupe_key: str) -> Optional[int]:
+        """Bump the key's generation before a write whose response may be stored; None disables the store."""
+        client = self.client
+        if client is None or settings.ingest_idempotency_ttl_seconds <= 0:
+            return None
+        key = self._generation_key(project_id, dedupe_key)
+        try:
+            pipe = client.pipeline()
+            pipe.incr(key)
+            pipe.expire(key, settings.ingest_idempotency_ttl_seconds)
+            return int(pipe.execute()[0])
+        except redis.RedisError:
+            logger.warning("Idempotency cache reserve failed", exc_info=True)
+            return None
+
+    def store(
+        self, project_id: UUID, dedupe_key: str, digest: str, response: Dict[str, Any], generation: Optional[int]
+    ) -> None:
+        """Cache a write's response unless another write of the key overlapped it.
+
+        ``generation`` is what ``reserve`` returned before the write; the write's
+        own ``invalidate`` adds one, any other write of the key more.
+        """
+        client = self.client
+        if client is None or generation is None or settings.ingest_idempotency_ttl_seconds <= 0:
+            return
+        try:
+            if self._store is None:
+                self._store = client.register_script(_STORE_IF_GENERATION)
+            stored = self._store(
+                keys=[self._generation_key(project_id, dedupe_key), self._key(project_id, dedupe_key)],
+                args=[
+                    generation + 1,
+                    json.dumps({"digest": digest, "response": response}, separators=(",", ":")),
+                    settings.ingest_idempotency_ttl_seconds,
+                ],
+            )
+        except redis.RedisError:
+            logger.warning("Idempotency cache store failed", exc_info=True)
+            return
+        if not stored:
+            ingest_idempotency.labels("raced").inc()
+
+    def invalidate(self, keys: Iterable[Tuple[UUID, str]]) -> None:
+        """After a write commits: bump the generations of and drop the entries of ``(project_id, dedupe_key)`` pairs."""
+        if settings.ingest_idempotency_ttl_seconds <= 0:
+            return
+        keys = list(keys)
+        client = self.client if keys else None
+        if client is None:
+            return
+        try:
+            pipe = client.pipeline()
+            for project_id, dedupe_key in keys:
+                generation = self._generation_key(project_id, dedupe_key)
+                pipe.incr(generation)
+                pipe.expire(generation, settings.ingest_idempotency_ttl_seconds)
+            pipe.delete(*[self._key(project_id, dedupe_key) for project_id, dedupe_key in keys])
+            pipe.execute()
+        except redis.RedisError:
+            logger.warning("Idempotency cache invalidation failed", exc_info=True)
+
+idempotency_cache = IdempotencyCache()
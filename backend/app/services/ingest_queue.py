@@ -0,0 +1,258 @@
+"""Asynchronous job-run ingest over a Redis Stream.
+
+The API validates and authenticates a run, appends it to the stream and
+answers 202; ``workers/ingest_consumer.py`` drains the stream through a
+consumer group and applies runs with the set-based bulk upsert. Entries
+are acknowledged and deleted only after their batch commits, so a crashed
+consumer's entries are re-claimed by another one after
+``INGEST_QUEUE_CLAIM_IDLE_MS``. Runs rejected by the consumer (unknown
+model version, invalid data) go to a ``<stream>:dead`` stream. A batch
+whose write is rejected as a whole (a foreign key or constraint violation,
+e.g. a run of a deleted project) is split in halves until the offending
+runs are isolated and dead-lettered, so one bad run cannot hold back the
+valid runs it was read with.
+"""
+from __future__ import annotations
+
+import logging
+import time
+from collections import Counter as Tally
+from typing import Dict, List, Optional, Sequence, Tuple
+from uuid import UUID
+
+import redis
+from fastapi import HTTPException
+from pydantic import ValidationError
+from sqlalchemy.orm import Session
+
+from backend.app.auth.api_keys import ApiKeyIdentity
+from backend.app.core.config import get_settings
+from backend.app.models.model import Model
+from backend.app.models.model_version import ModelVersion
+from backend.app.observability.metrics import (
+    ingest_queue_lag,
+    ingest_queue_messages,
+    ingest_queue_oldest_age,
+    ingest_queue_pending,
+)
+from backend.app.schemas.job_run import JobRunCreate
+from backend.app.services.audit_service import AuditEvent, audit_log
+from backend.app.services.emissions_service import schedule_emissions
+from backend.app.services.job_service import bulk_upsert_job_runs
+
+settings = get_settings()
+logger = logging.getLogger(__name__)
+
+Message = Tuple[str, Dict[str, str]]
+
+
+class IngestQueue:
+    def __init__(self):
+        self.stream = settings.ingest_queue_stream
+        self.group = settings.ingest_queue_group
+        self.dead_stream = f"{self.stream}:dead"
+        self._redis = None
+        self._retry_at = 0.0
+        self._group_ready = False
+
+    @property
+    def client(self) -> Optional[redis.Redis]:
+        if self._redis is None and time.monotonic() >= self._retry_at:
+            try:
+                client = redis.Redis.from_url(settings.redis_url, decode_responses=True)
+                client.ping()
+                self._redis = client
+            except Exception:
+                self._retry_at = time.monotonic() + 30
+                logger.info("Redis not available, async ingest disabled for 30s")
+        return self._redis
+
+    # --- producer -------------------------------------------------------
+
+    def enqueue(self, api_key: ApiKeyIdentity, payload: JobRunCreate, request_id: Optional[str] = None) -> Optional[str]:
+        """Append a validated run; returns the entry id, or None when the caller should ingest synchronously."""
+        client = self.client
+        if client is None:
+            return None
+        try:
+            if client.xlen(self.stream) >= settings.ingest_queue_max_length:
+                ingest_queue_messages.labels("overflow").inc()
+                return None
+            entry_id = client.xadd(
+                self.stream,
+                {
+                    "api_key_id": str(api_key.id),
+                    "organization_id": str(api_key.organization_id),
+                    "request_id": request_id or "",
+                    "payload": payload.model_dump_json(exclude_unset=True),
+                },
+            )
+        except redis.RedisError:
+            logger.warning("Async ingest enqueue failed; falling back to synchronous ingest", exc_info=True)
+            return None
+        ingest_queue_messages.labels("accepted").inc()
+        return entry_id
+
+    # --- consumer -------------------------------------------------------
+
+    def ensure_group(self) -> None:
+        if self._group_ready:
+            return
+        try:
+            self.client.xgroup_create(self.stream, self.group, id="0", mkstream=True)
+        except redis.ResponseError as exc:
+            if "BUSYGROUP" not in str(exc):
+                raise
+        self._group_ready = True
+
+    def read(self, consumer: str, count: int, block_ms: int) -> List[Message]:
+        """Stale entries abandoned by dead consumers first, then new ones."""
+        self.ensure_group()
+        client = self.client
+        _, claimed, _ = client.xautoclaim(
+            self.stream, self.group, consumer, min_idle_time=settings.ingest_queue_claim_idle_ms, count=count
+        )
+        messages: List[Message] = [(entry_id, fields) for entry_id, fields in claimed if fields]
+        if len(messages) < count:
+            for _, entries in client.xreadgroup(
+                self.group, consumer, {self.stream: ">"}, count=count - len(messages), block=block_ms
+            ) or []:
+                messages.extend(entries)
+        return messages
+
+    def ack(self, entry_ids: Sequence[str]) -> None:
+        if not entry_ids:
+            return
+        pipe = self.client.pipeline()
+        pipe.xack(self.stream, self.group, *entry_ids)
+        pipe.xdel(self.stream, *entry_ids)
+        pipe.execute()
+
+    def dead_letter(self, fields: Dict[str, str], detail: str) -> None:
+        self.client.xadd(self.dead_stream, {**fields, "detail": detail[:1000]}, maxlen=100_000, approximate=True)
+        ingest_queue_messages.labels("dead").inc()
+
+    def refresh_metrics(self) -> None:
+        """Update lag gauges; cheap enough to call on every scrape."""
+        client = self.client
+        if client is None:
+            return
+        try:
+            groups = {g["name"]: g for g in client.xinfo_groups(self.stream)}
+            info = client.xinfo_stream(self.stream)
+        except redis.ResponseError:
+            return  # stream not created yet
+        except redis.RedisError:
+            logger.warning("Async ingest metrics refresh failed", exc_info=True)
+            return
+        group = groups.get(self.group) or {}
+        lag = group.get("lag")
+        ingest_queue_lag.set(lag if lag is not None else info.get("length", 0))
+        ingest_queue_pending.set(group.get("pending", 0))
+        first = info.get("first-entry")
+        if first:
+            # Acknowledged entries are deleted, so the first entry is the oldest unprocessed one
+            ingest_queue_oldest_age.set(max(0.0, time.time() - int(first[0].split("-")[0]) / 1000))
+        else:
+            ingest_queue_oldest_age.set(0)
+
+
+def apply_messages(db: Session, queue: IngestQueue, messages: Sequence[Message]) -> List[str]:
+    """Upsert a drained batch; returns entry ids that can be acknowledged.
+
+    Per-run failures are dead-lettered and acknowledged. A failure of the
+    whole write raises, leaving every entry pending for redelivery.
+    """
+    items: List[Optional[JobRunCreate]] = []
+    errors: Dict[int, str] = {}
+    for index, (_, fields) in enumerate(messages):
+        try:
+            items.append(JobRunCreate.model_validate_json(fields["payload"]))
+        except (KeyError, ValidationError) as exc:
+            items.append(None)
+            errors[index] = f"Invalid payload: {exc}"
+
+    # Model versions must belong to the run's project; one query for the batch
+    version_ids = {item.model_version_id for item in items if item is not None and item.model_version_id}
+    if version_ids:
+        valid = {
+            (row.id, row.project_id)
+            for row in db.query(ModelVersion.id, Model.project_id)
+            .join(Model, ModelVersion.model_id == Model.id)
+            .filter(ModelVersion.id.in_(version_ids))
+        }
+        for index, item in enumerate(items):
+            if item is not None and item.model_version_id and (item.model_version_id, item.project_id) not in valid:
+                errors[index] = "Invalid model_version_id for this project"
+                items[index] = None
+
+    results = bulk_upsert_job_runs(db, items)
+    outcomes: Dict[int, str] = {}
+    for r in results:
+        if r.status == "error":
+            errors[r.index] = r.detail or "error"
+        else:
+            outcomes[r.index] = r.status
+
+    for index, detail in errors.items():
+        queue.dead_letter(messages[index][1], detail)
+    ingest_queue_messages.labels("applied").inc(len(outcomes))
+
+    # One audit event per key and batch instead of one per run
+    per_key: Dict[Tuple[str, str], Tally] = {}
+    for index, (_, fields) in enumerate(messages):
+        key = (fields.get("api_key_id", ""), fields.get("organization_id", ""))
+        per_key.setdefault(key, Tally())[outcomes.get(index, "error")] += 1
+    for (api_key_id, organization_id), counts in per_key.items():
+        if not organization_id:
+            continue
+        audit_log(
+            AuditEvent(
+                organization_id=UUID(organization_id),
+                actor_type="api_key",
+                actor_api_key_id=UUID(api_key_id) if api_key_id else None,
+                action="job_run.ingest_async",
+                status="failure" if counts.get("error") else "success",
+                resource_type="job_run",
+                metadata=dict(counts),
+            ),
+            db,
+        )
+
+    schedule_emissions([r.id for r in results if r.id is not None])
+    return [entry_id for entry_id, _ in messages]
+
+
+def apply_or_split(db: Session, queue: IngestQueue, messages: Sequence[Message]) -> List[str]:
+    """``apply_messages``, bisecting batches the database rejects; returns entry ids to acknowledge.
+
+    A rejected single run is dead-lettered. Server errors (database down) still
+    raise: retrying later is the right answer for those.
+    """
+    try:
+        return apply_messages(db, queue, messages)
+    except HTTPException as exc:
+        if exc.status_code >= 500:
+            raise
+        if len(messages) == 1:
+            entry_id, fields = messages[0]
+            queue.dead_letter(fields, str(exc.detail))
+            return [entry_id]
+    mid = len(messages) // 2
+    return apply_or_split(db, queue, messages[:mid]) + apply_or_split(db, queue, messages[mid:])
+
+
+def drain_once(db: Session, queue: IngestQueue, consumer: str) -> int:
+    """Read, apply and acknowledge one batch; returns the number of entries handled."""
+    messages = queue.read(consumer, settings.ingest_queue_batch_size, settings.ingest_queue_block_ms)
+    if not messages:
+        return 0
+    try:
+        queue.ack(apply_or_split(db, queue, messages))
+    except HTTPException as exc:
+        logger.error("Async ingest batch of %s failed, left pending: %s", len(messages), exc.detail)
+        return 0
+    return len(messages)
+
+
+ingest_queue = IngestQueue()
@@ -2,17 +2,23 @@
 
 from __future__ import annotations
 
+from dataclasses import dataclass
 from datetime import datetime, timezone
 from hashlib import sha256
-from typing import Any, Dict, Optional, Tuple, Union
-from uuid import UUID
+from typing import Any, Dict, List, Optional, Sequence, Tuple, Union
+from uuid import UUID, uuid4
 
 from fastapi import HTTPException, status
+from sqlalchemy import JSON, cast, func, literal_column, or_, select, tuple_
+from sqlalchemy.dialects.postgresql import JSONB, insert as pg_insert
 from sqlalchemy.exc import IntegrityError
 from sqlalchemy.orm import Session, joinedload
 
 from backend.app.models.job_run import JobRun, JobRunHardware, JobRunEnergy, JobRunCost
 from backend.app.schemas.job_run import JobRunCreate
+from backend.app.services.idempotency_cache import idempotency_cache
+from backend.app.services.outbox import add_emissions_events, handoff_enabled
+from backend.app.utils.pagination import paginate
 
 
 def _parse_dt(value: Any) -> Optional[datetime]:
@@ -83,33 +89,20 @@ def _dedupe_key_for(payload: dict) -> str:
     return sha256(seed.encode("utf-8")).hexdigest()
 
 
-def _apply_hardware(existing: Optional[JobRunHardware], job_run_id: UUID, payload: Dict[str, Any]) -> JobRunHardware:
+def _hardware_values(payload: Dict[str, Any]) -> Dict[str, Any]:
     cpu_count = payload.get("cpu_count")
     gpu_model = payload.get("gpu_model")
     ram_gb = payload.get("ram_gb")
     details = payload.get("details") or {}
+    return {
+        "cpu_count": str(cpu_count) if cpu_count is not None else None,
+        "gpu_model": str(gpu_model) if gpu_model is not None else None,
+        "ram_gb": float(ram_gb) if ram_gb is not None else None,
+        "details": details if isinstance(details, dict) else {},
+    }
 
-    if existing is None:
-        return JobRunHardware(
-            job_run_id=job_run_id,
-            cpu_count=str(cpu_count) if cpu_count is not None else None,
-            gpu_model=str(gpu_model) if gpu_model is not None else None,
-            ram_gb=float(ram_gb) if ram_gb is not None else None,
-            details=details if isinstance(details, dict) else {},
-        )
-
-    if cpu_count is not None:
-        existing.cpu_count = str(cpu_count)
-    if gpu_model is not None:
-        existing.gpu_model = str(gpu_model)
-    if ram_gb is not None:
-        existing.ram_gb = float(ram_gb)
-    if details is not None:
-        existing.details = details if isinstance(details, dict) else {}
-    return existing
 
-
-def _apply_energy(existing: Optional[JobRunEnergy], job_run_id: UUID, payload: Dict[str, Any]) -> JobRunEnergy:
+def _energy_values(payload: Dict[str, Any]) -> Dict[str, Any]:
     def f(key: str, default: float = 0.0) -> float:
         v = payload.get(key, default)
         try:
@@ -120,32 +113,16 @@ def _apply_energy(existing: Optional[JobRunEnergy], job_run_id: UUID, payload: D
                 detail=f"energy.{key} must be a number",
             )
 
-    cpu_kwh = f("cpu_kwh")
-    gpu_kwh = f("gpu_kwh")
-    ram_kwh = f("ram_kwh")
-    total_kwh = f("total_kwh")
-    emissions_kg = f("emissions_kg")
-
-    if existing is None:
-        return JobRunEnergy(
-            job_run_id=job_run_id,
-            cpu_kwh=cpu_kwh,
-            gpu_kwh=gpu_kwh,
-            ram_kwh=ram_kwh,
-            total_kwh=total_kwh,
-            emissions_kg=emissions_kg,
-            compute_status="pending",
-        )
-
-    existing.cpu_kwh = cpu_kwh
-    existing.gpu_kwh = gpu_kwh
-    existing.ram_kwh = ram_kwh
-    existing.total_kwh = total_kwh
-    existing.emissions_kg = emissions_kg
-    return existing
+    return {
+        "cpu_kwh": f("cpu_kwh"),
+        "gpu_kwh": f("gpu_kwh"),
+        "ram_kwh": f("ram_kwh"),
+        "total_kwh": f("total_kwh"),
+        "emissions_kg": f("emissions_kg"),
+    }
 
 
-def _apply_costs(existing: Optional[JobRunCost], job_run_id: UUID, payload: Dict[str, Any]) -> JobRunCost:
+def _cost_values(payload: Dict[str, Any]) -> Dict[str, Any]:
     amount_usd = payload.get("amount_usd", 0.0)
     currency = payload.get("currency", "USD")
     breakdown = payload.get("breakdown") or {}
@@ -157,34 +134,19 @@ def _apply_costs(existing: Optional[JobRunCost], job_run_id: UUID, payload: Dict
             status_code=status.HTTP_422_UNPROCESSABLE_ENTITY,
             detail="costs.amount_usd must be a number",
         )
+    return {
+        "amount_usd": amount_usd_f,
+        "currency": str(currency) if currency else "USD",
+        "breakdown": breakdown if isinstance(breakdown, dict) else {},
+    }
 
-    if existing is None:
-        return JobRunCost(
-            job_run_id=job_run_id,
-            amount_usd=amount_usd_f,
-            currency=str(currency) if currency else "USD",
-            breakdown=breakdown if isinstance(breakdown, dict) else {},
-        )
-
-    existing.amount_usd = amount_usd_f
-    if currency is not None:
-        existing.currency = str(currency) if currency else "USD"
-    if breakdown is not None:
-        existing.breakdown = breakdown if isinstance(breakdown, dict) else {}
-    return existing
 
+def _normalize_job_run(data: Dict[str, Any]) -> Dict[str, Any]:
+    """Validate a dumped ``JobRunCreate`` and return normalized column values.
 
-def upsert_job_run(db: Session, payload: JobRunCreate) -> Tuple[JobRun, bool]:
+    Raises HTTPException(422) on invalid input so single and batch ingest
+    surface identical validation messages.
     """
-    Robust upsert:
-    - If payload.id exists -> update that row.
-    - Else upsert by (project_id, run_name, start_time) to avoid duplicates.
-    - Handles nested hardware/energy/costs (create or update).
-    - Returns (job_run, created_flag).
-    """
-    data = payload.model_dump(exclude_unset=True)
-
-    # Required fields validation (schema should already enforce, but we harden)
     project_id = data.get("project_id")
     run_name = data.get("run_name")
     job_type = data.get("job_type")
@@ -225,125 +187,232 @@ def upsert_job_run(db: Session, payload: JobRunCreate) -> Tuple[JobRun, bool]:
         }
     )
 
-    status_value = _normalize_status(data.get("status"), start_time, end_time)
+    nested: Dict[str, Any] = {}
+    for name in ("hardware", "energy", "costs"):
+        value = data.get(name)
+        if value is not None and not isinstance(value, dict):
+            raise HTTPException(status_code=422, detail=f"{name} must be an object")
+        nested[name] = value
+
+    return {
+        "project_id": project_id,
+        "organization_id": organization_id,
+        "run_name": run_name,
+        "job_type": job_type,
+        "region": region,
+        "start_time": start_time,
+        "end_time": end_time,
+        "status": _normalize_status(data.get("status"), start_time, end_time),
+        "tags": tags,
+        "metadata": metadata_payload,
+        "dedupe_key": dedupe_key,
+        "external_run_id": data.get("external_run_id"),
+        "model_version_id": data.get("model_version_id"),
+        **nested,
+    }
+
+
+@dataclass
+class BulkUpsertResult:
+    """Outcome of one item in a bulk upsert (status: created | updated | unchanged | error)."""
+
+    index: int
+    status: str
+    id: Optional[UUID] = None
+    dedupe_key: Optional[str] = None
+    detail: Optional[str] = None
+
+
+def _nested_values(values: Dict[str, Any]) -> Dict[str, Any]:
+    return {
+        "hardware": _hardware_values(values["hardware"]) if values["hardware"] is not None else None,
+        "energy": _energy_values(values["energy"]) if values["energy"] is not None else None,
+        "costs": _cost_values(values["costs"]) if values["costs"] is not None else None,
+    }
+
+
+def _changed(table, set_: Dict[str, Any]):
+    """True only when ``ON CONFLICT DO UPDATE`` would change the stored row.
+
+    Used as the conflict ``WHERE`` so replayed payloads leave no dead tuples.
+    """
+    clauses = []
+    for name, value in set_.items():
+        if name == "updated_at":
+            continue
+        column = table.c[name]
+        if isinstance(column.type, JSON):
+            # json has no equality operator; compare as jsonb
+            clauses.append(cast(column, JSONB).is_distinct_from(cast(value, JSONB)))
+        else:
+            clauses.append(column.is_distinct_from(value))
+    return or_(*clauses)
 
-    hardware_payload = data.get("hardware")
-    energy_payload = data.get("energy")
-    costs_payload = data.get("costs")
 
-    try:
-        # Load existing
-        obj: Optional[JobRun] = None
-        created = False
-        if data.get("id"):
-            obj = (
-                db.query(JobRun)
-                .options(
-                    joinedload(JobRun.hardware),
-                    joinedload(JobRun.energy),
-                    joinedload(JobRun.costs),
-                )
-                .filter(JobRun.id == data["id"])
-                .first()
-            )
-            if obj is None:
-                raise HTTPException(status_code=404, detail="job_run not found")
-        else:
-            obj = (
-                db.query(JobRun)
-                .options(
-                    joinedload(JobRun.hardware),
-                    joinedload(JobRun.energy),
-                    joinedload(JobRun.costs),
-                )
-                .filter(
-                    JobRun.project_id == project_id,
-                    JobRun.dedupe_key == dedupe_key,
-                )
-                .first()
-            )
+def _bulk_insert_children(
+    db: Session,
+    model,
+    rows: List[Dict[str, Any]],
+    update_columns: Sequence[str],
+    keep_existing: Sequence[str] = (),
+) -> set:
+    """Multi-row upsert of a 1:1 child table keyed on job_run_id; returns written job_run_ids."""
+    if not rows:
+        return set()
+    table = model.__table__
+    stmt = pg_insert(table).values(rows)
+    set_: Dict[str, Any] = {name: stmt.excluded[name] for name in update_columns}
+    for name in keep_existing:
+        # Partial snapshots keep previously reported values
+        set_[name] = func.coalesce(stmt.excluded[name], table.c[name])
+    set_["updated_at"] = stmt.excluded.updated_at
+    stmt = stmt.on_conflict_do_update(
+        index_elements=[table.c.job_run_id], set_=set_, where=_changed(table, set_)
+    ).returning(table.c.job_run_id)
+    return {row.job_run_id for row in db.execute(stmt).all()}
+
+
+def _energy_totals():
+    """Current energy totals for the run, readable in the same statement."""
+    # Raw SQL: SQLAlchemy does not correlate subqueries placed in RETURNING
+    return [
+        literal_column(f"(SELECT e.{name} FROM job_run_energy e WHERE e.job_run_id = job_runs.id)").label(
+            f"energy_{name}"
+        )
+        for name in ("total_kwh", "emissions_kg")
+    ]
 
-        if obj is None:
-            obj = JobRun(
-                project_id=project_id,
-                organization_id=organization_id,
-                run_name=run_name,
-                job_type=job_type,
-                region=region,
-                start_time=start_time,
-                end_time=end_time,
-                status=status_value,
-                tags=tags,
-                run_metadata=metadata_payload,
-                dedupe_key=dedupe_key,
-                external_run_id=data.get("external_run_id"),
-                model_version_id=data.get("model_version_id"),
-            )
-            db.add(obj)
-            db.flush()  # allocate id for nested inserts
-            created = True
-        else:
-            # Update fields (only if provided)
-            obj.project_id = project_id
-            obj.organization_id = organization_id
-            obj.run_name = run_name
-            obj.job_type = job_type
-            obj.region = region
-            obj.start_time = start_time
-            obj.end_time = end_time
-            obj.status = status_value
-            obj.tags = tags
-            obj.run_metadata = metadata_payload
-            obj.dedupe_key = dedupe_key
-            if "external_run_id" in data:
-                obj.external_run_id = data.get("external_run_id")
-            if "model_version_id" in data:
-                obj.model_version_id = data.get("model_version_id")
-
-        # Nested: hardware
-        if hardware_payload is not None:
-            if not isinstance(hardware_payload, dict):
-                raise HTTPException(status_code=422, detail="hardware must be an object")
-            hw = _apply_hardware(obj.hardware, obj.id, hardware_payload)
-            if obj.hardware is None:
-                db.add(hw)
-
-        # Nested: energy (optional direct write; worker will also update later)
-        if energy_payload is not None:
-            if not isinstance(energy_payload, dict):
-                raise HTTPException(status_code=422, detail="energy must be an object")
-            en = _apply_energy(obj.energy, obj.id, energy_payload)
-            if obj.energy is None:
-                db.add(en)
-
-        # Nested: costs
-        if costs_payload is not None:
-            if not isinstance(costs_payload, dict):
-                raise HTTPException(status_code=422, detail="costs must be an object")
-            cs = _apply_costs(obj.costs, obj.id, costs_payload)
-            if obj.costs is None:
-                db.add(cs)
 
-        db.commit()
+def _write_job_runs(
+    db: Session,
+    prepared: Dict[Tuple[Any, str], Tuple[List[int], Dict[str, Any]]],
+    error_label: str,
+) -> Dict[Tuple[Any, str], Tuple[Any, str]]:
+    """
+    Write prepared runs and their nested rows, then commit once.
 
-        # Reload fully for response
-        obj = (
-            db.query(JobRun)
-            .options(
-                joinedload(JobRun.hardware),
-                joinedload(JobRun.energy),
-                joinedload(JobRun.costs),
-            )
-            .filter(JobRun.id == obj.id)
-            .one()
+    Statements per call: one ``INSERT ... ON CONFLICT DO UPDATE ... WHERE
+    (changed) RETURNING`` for job_runs, one per nested table present, and a
+    read-only SELECT only for runs that were already up to date (the
+    conflict ``WHERE`` suppresses their RETURNING row). Nothing is reloaded.
+
+    Returns ``{(project_id, dedupe_key): (row, outcome)}`` where ``row`` has
+    every job_runs column plus current energy totals and ``outcome`` is
+    created | updated | unchanged.
+    """
+    now = datetime.utcnow()
+    run_rows: List[Dict[str, Any]] = []
+    for _, values in prepared.values():
+        run_rows.append(
+            {
+                "id": uuid4(),
+                "project_id": values["project_id"],
+                "organization_id": values["organization_id"],
+                "run_name": values["run_name"],
+                "job_type": values["job_type"],
+                "region": values["region"],
+                "start_time": values["start_time"],
+                "end_time": values["end_time"],
+                "status": values["status"],
+                "tags": values["tags"],
+                "metadata": values["metadata"],
+                "dedupe_key": values["dedupe_key"],
+                "external_run_id": values["external_run_id"],
+                "model_version_id": values["model_version_id"],
+                "created_at": now,
+                "updated_at": now,
+            }
         )
-        return obj, created
 
-    except HTTPException:
-        db.rollback()
-        raise
+    table = JobRun.__table__
+    stmt = pg_insert(table).values(run_rows)
+    excluded = stmt.excluded
+    set_ = {
+        "organization_id": excluded.organization_id,
+        "run_name": excluded.run_name,
+        "job_type": excluded.job_type,
+        "region": excluded.region,
+        "start_time": excluded.start_time,
+        "end_time": excluded.end_time,
+        "status": excluded.status,
+        "tags": excluded.tags,
+        "metadata": excluded.metadata,
+        "external_run_id": func.coalesce(excluded.external_run_id, table.c.external_run_id),
+        "model_version_id": func.coalesce(excluded.model_version_id, table.c.model_version_id),
+        "updated_at": excluded.updated_at,
+    }
+    stmt = stmt.on_conflict_do_update(
+        constraint="ux_job_runs_project_dedupe",
+        set_=set_,
+        where=_changed(table, set_),
+    ).returning(
+        *table.c,
+        # xmax is 0 only for freshly inserted tuples
+        literal_column("(xmax = 0)").label("inserted"),
+        *_energy_totals(),
+    )
+
+    try:
+        written: Dict[Tuple[Any, str], Tuple[Any, str]] = {
+            (row.project_id, row.dedupe_key): (row, "created" if row.inserted else "updated")
+            for row in db.execute(stmt).all()
+        }
+        missing = [key for key in prepared if key not in written]
+        if missing:
+            lookup = select(*table.c, *_energy_totals()).where(
+                tuple_(table.c.project_id, table.c.dedupe_key).in_(missing)
+            )
+            for row in db.execute(lookup).all():
+                written[(row.project_id, row.dedupe_key)] = (row, "unchanged")
+
+        hardware_rows: List[Dict[str, Any]] = []
+        energy_rows: List[Dict[str, Any]] = []
+        cost_rows: List[Dict[str, Any]] = []
+        for key, (_, values) in prepared.items():
+            job_run_id = written[key][0].id
+            base = {"job_run_id": job_run_id, "created_at": now, "updated_at": now}
+            if values["hardware"] is not None:
+                hardware_rows.append({"id": uuid4(), **base, **values["hardware"]})
+            if values["energy"] is not None:
+                energy_rows.append({"id": uuid4(), **base, "compute_status": "pending", **values["energy"]})
+            if values["costs"] is not None:
+                cost_rows.append({"id": uuid4(), **base, **values["costs"]})
+
+        children_written = _bulk_insert_children(
+            db,
+            JobRunHardware,
+            hardware_rows,
+            update_columns=("details",),
+            keep_existing=("cpu_count", "gpu_model", "ram_gb"),
+        )
+        children_written |= _bulk_insert_children(
+            db,
+            JobRunEnergy,
+            energy_rows,
+            update_columns=("cpu_kwh", "gpu_kwh", "ram_kwh", "total_kwh", "emissions_kg"),
+        )
+        children_written |= _bulk_insert_children(
+            db, JobRunCost, cost_rows, update_columns=("amount_usd", "currency", "breakdown")
+        )
+        if handoff_enabled():
+            # Compute requests commit (or roll back) with the runs; replays that changed nothing add none
+            add_emissions_events(
+                db,
+                (
+                    (row.id, row.organization_id)
+                    for row, outcome in written.values()
+                    if outcome != "unchanged" or row.id in children_written
+                ),
+            )
+        db.commit()
     except IntegrityError as e:
         db.rollback()
+        msg = str(getattr(e, "orig", e)).lower()
+        if "foreign key" in msg:
+            raise HTTPException(
+                status_code=status.HTTP_422_UNPROCESSABLE_ENTITY,
+                detail="Invalid foreign key (check project_id/model_version_id)",
+            ) from e
         raise HTTPException(
             status_code=status.HTTP_409_CONFLICT,
             detail="Duplicate or invalid job_run data (constraint violation).",
@@ -352,9 +421,96 @@ def upsert_job_run(db: Session, payload: JobRunCreate) -> Tuple[JobRun, bool]:
         db.rollback()
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
-            detail=f"Job run upsert failed: {str(e)}",
+            detail=f"{error_label}: {str(e)}",
         ) from e
 
+    # Cached ingest responses for these keys no longer describe the stored run
+    idempotency_cache.invalidate(written)
+    for key, (row, outcome) in written.items():
+        if outcome == "unchanged" and row.id in children_written:
+            written[key] = (row, "updated")
+    return written
+
+
+def _job_run_from_row(row: Any, energy: Optional[Dict[str, Any]]) -> JobRun:
+    """Build a detached JobRun for responses from a RETURNING/SELECT row."""
+    mapping = row._mapping
+    obj = JobRun(**{attr.key: mapping[attr.columns[0].key] for attr in JobRun.__mapper__.column_attrs})
+    if energy is not None:
+        obj.energy = JobRunEnergy(job_run_id=obj.id, **energy)
+    elif mapping["energy_total_kwh"] is not None:
+        obj.energy = JobRunEnergy(
+            job_run_id=obj.id,
+            total_kwh=mapping["energy_total_kwh"],
+            emissions_kg=mapping["energy_emissions_kg"],
+        )
+    return obj
+
+
+def validate_job_run(payload: JobRunCreate) -> None:
+    """Raise 422 for payloads the upsert would reject, without database access."""
+    values = _normalize_job_run(payload.model_dump(exclude_unset=True))
+    _nested_values(values)
+
+
+def upsert_job_run(db: Session, payload: JobRunCreate) -> Tuple[JobRun, bool]:
+    """
+    Upsert one run by (project_id, dedupe_key) with nested hardware/energy/costs.
+
+    - One ``INSERT ... ON CONFLICT DO UPDATE ... WHERE (changed) RETURNING``
+      for the run plus one per nested object; unchanged rows are not rewritten.
+    - The returned JobRun is detached and built from RETURNING (no reload);
+      ``energy_kwh``/``carbon_kg_co2e`` reflect the stored energy row.
+    - Returns (job_run, created_flag).
+    """
+    values = _normalize_job_run(payload.model_dump(exclude_unset=True))
+    values.update(_nested_values(values))
+    key = (UUID(str(values["project_id"])), values["dedupe_key"])
+    row, outcome = _write_job_runs(db, {key: ([0], values)}, "Job run upsert failed")[key]
+    return _job_run_from_row(row, values["energy"]), outcome == "created"
+
+
+def bulk_upsert_job_runs(db: Session, payloads: Sequence[Optional[JobRunCreate]]) -> List[BulkUpsertResult]:
+    """
+    Set-based upsert for many job runs in one transaction.
+
+    - Same statements as ``upsert_job_run``, each covering the whole batch.
+    - Items that fail validation are reported as ``error`` and skipped.
+    - ``None`` entries are placeholders for items rejected upstream; they are
+      skipped without a result so callers can keep their own indexes.
+    - Duplicate dedupe keys inside one batch collapse into one row (later items win).
+    """
+    results: Dict[int, BulkUpsertResult] = {}
+    prepared: Dict[Tuple[Any, str], Tuple[List[int], Dict[str, Any]]] = {}
+
+    for index, payload in enumerate(payloads):
+        if payload is None:
+            continue
+        try:
+            values = _normalize_job_run(payload.model_dump(exclude_unset=True))
+            nested = _nested_values(values)
+        except HTTPException as exc:
+            results[index] = BulkUpsertResult(index=index, status="error", detail=str(exc.detail))
+            continue
+        key = (UUID(str(values["project_id"])), values["dedupe_key"])
+        indexes: List[int] = []
+        if key in prepared:
+            # Same semantics as sequential upserts: omitted nested objects keep earlier values
+            indexes, earlier = prepared[key]
+            nested = {name: value if value is not None else earlier[name] for name, value in nested.items()}
+        indexes.append(index)
+        prepared[key] = (indexes, {**values, **nested})
+
+    if not prepared:
+        return [results[i] for i in sorted(results)]
+
+    written = _write_job_runs(db, prepared, "Job run bulk upsert failed")
+    for key, (indexes, _) in prepared.items():
+        row, outcome = written[key]
+        for index in indexes:
+            results[index] = BulkUpsertResult(index=index, status=outcome, id=row.id, dedupe_key=key[1])
+    return [results[i] for i in sorted(results)]
+
 
 def list_job_runs(
     db: Session,
@@ -363,7 +519,9 @@ def list_job_runs(
     start: Optional[datetime] = None,
     end: Optional[datetime] = None,
     limit: int = 50,
-) -> list[JobRun]:
+    cursor: Optional[str] = None,
+) -> Tuple[list[JobRun], Optional[str]]:
+    """One page of the organization's runs, newest first, and the next page's cursor."""
     q = (
         db.query(JobRun)
         .options(
@@ -371,7 +529,6 @@ def list_job_runs(
             joinedload(JobRun.energy),
             joinedload(JobRun.costs),
         )
-        .order_by(JobRun.created_at.desc())
         .filter(JobRun.organization_id == UUID(str(organization_id)))
     )
     if project_id:
@@ -380,7 +537,7 @@ def list_job_runs(
         q = q.filter(JobRun.start_time >= start)
     if end:
         q = q.filter(JobRun.start_time <= end)
-    return q.limit(max(1, min(int(limit), 200))).all()
+    return paginate(q, JobRun.created_at, JobRun.id, cursor=cursor, limit=limit)
 
 
 def get_job_run(db: Session, job_run_id: UUID, organization_id: Optional[Union[UUID, str]] = None) -> JobRun:
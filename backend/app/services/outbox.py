@@ -0,0 +1,86 @@
+"""Transactional outbox between ingest and the worker tier.
+
+Unless runs are computed in process (``SYNC_COMPUTE`` on and
+``EMISSIONS_QUEUE_ENABLED`` off, the default), the job-run upsert adds one
+``outbox`` row per run it created or changed, in the same transaction as the
+run itself:
+a committed run always has its compute request, a rolled-back one never
+does, and handing it over takes no Redis call on the request path.
+
+Relays (``python -m backend.app.workers.outbox_relay``) lock a batch of the
+oldest rows with ``FOR UPDATE SKIP LOCKED``, so any number of them can run
+side by side, hand the runs to the emissions queue and delete the rows in
+the same transaction. A relay that dies after the hand-off but before its
+commit leaves the rows to be handed over again; that is harmless, because
+scheduling a run that is already pending is a no-op.
+"""
+from __future__ import annotations
+
+import logging
+from typing import Dict, Iterable, List, Optional, Tuple
+from uuid import UUID
+
+from sqlalchemy import delete, insert, select
+from sqlalchemy.orm import Session
+
+from backend.app.core.config import get_settings
+from backend.app.models.outbox import OutboxEvent
+from backend.app.observability.metrics import outbox_events
+
+settings = get_settings()
+logger = logging.getLogger(__name__)
+
+EMISSIONS_TOPIC = "emissions.compute"
+
+
+def handoff_enabled() -> bool:
+    """Whether written runs go to the worker tier through the outbox rather than being computed in process.
+
+    ``SYNC_COMPUTE=false`` implies the queue: there is no other durable way to get runs computed.
+    """
+    return settings.emissions_queue_enabled or not settings.sync_compute
+
+
+def add_emissions_events(db: Session, runs: Iterable[Tuple[UUID, Optional[UUID]]]) -> int:
+    """Queue (job_run_id, organization_id) pairs for compute in the caller's transaction; one INSERT."""
+    rows = [
+        {"topic": EMISSIONS_TOPIC, "job_run_id": job_run_id, "organization_id": organization_id}
+        for job_run_id, organization_id in runs
+    ]
+    if rows:
+        db.execute(insert(OutboxEvent).values(rows))
+    return len(rows)
+
+
+def claim_statement(batch_size: int):
+    return (
+        select(OutboxEvent.id, OutboxEvent.organization_id, OutboxEvent.job_run_id)
+        .where(OutboxEvent.topic == EMISSIONS_TOPIC)
+        .order_by(OutboxEvent.id)
+        .limit(batch_size)
+        .with_for_update(skip_locked=True)
+    )
+
+
+def relay_once(db: Session, queue, batch_size: Optional[int] = None) -> int:
+    """Hand one batch of outbox rows to ``queue`` and delete them; returns the rows delivered.
+
+    Rows stay in the outbox (and are retried) when the queue cannot take them.
+    """
+    rows = db.execute(claim_statement(batch_size or settings.outbox_batch_size)).all()
+    if not rows:
+        db.rollback()
+        return 0
+    per_org: Dict[Optional[UUID], List[UUID]] = {}
+    for row in rows:
+        per_org.setdefault(row.organization_id, []).append(row.job_run_id)
+    for organization_id, job_run_ids in per_org.items():
+        if not queue.schedule(job_run_ids, organization_id):
+            db.rollback()
+            outbox_events.labels("retried").inc(len(rows))
+            logger.warning("Emissions queue unavailable; %s outbox rows left for retry", len(rows))
+            return 0
+    db.execute(delete(OutboxEvent).where(OutboxEvent.id.in_([row.id for row in rows])))
+    db.commit()
+    outbox_events.labels("relayed").inc(len(rows))
+    return len(rows)
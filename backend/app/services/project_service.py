@@ -1,15 +1,16 @@
 """Project and API key services."""
-import secrets
-from typing import List
+from datetime import datetime, timezone
+from typing import List, Optional, Tuple
 
 from fastapi import HTTPException
 from sqlalchemy.orm import Session
 
-from backend.app.auth.security import get_password_hash
+from backend.app.auth.api_keys import generate_api_key, hash_api_key, invalidate_api_key_on_commit, verify_api_key
 from backend.app.models.api_key import ApiKey
 from backend.app.models.project import Project
 from backend.app.schemas.api_key import ApiKeyCreate
 from backend.app.schemas.organization import ProjectCreate
+from backend.app.utils.pagination import paginate
 
 
 def create_project(db: Session, org_id, payload: ProjectCreate) -> Project:
@@ -22,9 +23,12 @@ def create_project(db: Session, org_id, payload: ProjectCreate) -> Project:
     return project
 
 
-def list_projects(db: Session, org_id) -> List[Project]:
-    """Return projects for organization."""
-    return db.query(Project).filter(Project.organization_id == org_id).all()
+def list_projects(
+    db: Session, org_id, cursor: Optional[str] = None, limit: int = 50
+) -> Tuple[List[Project], Optional[str]]:
+    """Return one page of projects for organization and the next page's cursor."""
+    q = db.query(Project).filter(Project.organization_id == org_id)
+    return paginate(q, Project.created_at, Project.id, cursor=cursor, limit=limit)
 
 
 def create_api_key(db: Session, user_id, org_id, payload: ApiKeyCreate) -> tuple[ApiKey, str]:
@@ -37,12 +41,14 @@ def create_api_key(db: Session, user_id, org_id, payload: ApiKeyCreate) -> tuple
     if not project:
         raise HTTPException(status_code=404, detail="Project not found")
 
-    raw_key = f"gai_{secrets.token_urlsafe(24)}"
-    key_prefix = raw_key[:12]
+    key_id, raw_key = generate_api_key()
+    hash_scheme, hashed_key = hash_api_key(raw_key)
     api_key = ApiKey(
         name=payload.name,
-        hashed_key=get_password_hash(raw_key),
-        key_prefix=key_prefix,
+        hashed_key=hashed_key,
+        hash_scheme=hash_scheme,
+        key_prefix=raw_key[:12],
+        key_id=key_id,
         organization_id=project.organization_id,
         project_id=project.id,
         user_id=user_id,
@@ -55,23 +61,16 @@ def create_api_key(db: Session, user_id, org_id, payload: ApiKeyCreate) -> tuple
 
 def validate_api_key(db: Session, project_id, token: str) -> bool:
     """Validate hashed API key for ingestion endpoints."""
-    api_keys = (
-        db.query(ApiKey)
-        .filter(
-            ApiKey.project_id == project_id,
-            ApiKey.active.is_(True),
-            ApiKey.revoked_at.is_(None),
-        )
-        .all()
-    )
-    from backend.app.auth.security import verify_password
+    key = verify_api_key(db, token)
+    return key is not None and str(key.project_id) == str(project_id)
 
-    return any(verify_password(token, key.hashed_key) for key in api_keys)
 
-
-def list_api_keys_for_org(db: Session, org_id) -> List[ApiKey]:
-    """List API keys for all projects within organization."""
-    return db.query(ApiKey).filter(ApiKey.organization_id == org_id).all()
+def list_api_keys_for_org(
+    db: Session, org_id, cursor: Optional[str] = None, limit: int = 50
+) -> Tuple[List[ApiKey], Optional[str]]:
+    """List one page of API keys for all projects within organization."""
+    q = db.query(ApiKey).filter(ApiKey.organization_id == org_id)
+    return paginate(q, ApiKey.created_at, ApiKey.id, cursor=cursor, limit=limit)
 
 
 def unblock_api_key(db: Session, org_id, api_key_id) -> ApiKey:
@@ -83,5 +82,22 @@ def unblock_api_key(db: Session, org_id, api_key_id) -> ApiKey:
     if not key:
         raise HTTPException(status_code=404, detail="API key not found")
     key.blocked_until = None
+    invalidate_api_key_on_commit(db, key.id)
+    db.flush()
+    return key
+
+
+def revoke_api_key(db: Session, org_id, api_key_id) -> ApiKey:
+    key = (
+        db.query(ApiKey)
+        .filter(ApiKey.id == api_key_id, ApiKey.organization_id == org_id)
+        .first()
+    )
+    if not key:
+        raise HTTPException(status_code=404, detail="API key not found")
+    if key.revoked_at is None:
+        key.revoked_at = datetime.now(timezone.utc)
+    key.active = False
+    invalidate_api_key_on_commit(db, key.id)
     db.flush()
     return key
@@ -11,6 +11,7 @@ from fastapi import HTTPException, status
 from sqlalchemy import func, text
 from sqlalchemy.orm import Session
 
+from backend.app.auth.api_keys import ApiKeyIdentity, invalidate_api_key_on_commit
 from backend.app.core.config import get_settings
 from backend.app.models.api_key import ApiKey
 from backend.app.auth.context import RequestContext
@@ -43,12 +44,12 @@ class RateLimiter:
         start = ts - (ts % size_sec)
         return dt.datetime.fromtimestamp(start, tz=dt.timezone.utc), start + size_sec
 
-    def _redis_check(self, key: str, limit: int, burst: int) -> RateLimitResult:
+    def _redis_check(self, key: str, limit: int, burst: int, cost: int = 1) -> RateLimitResult:
         now = dt.datetime.utcnow()
         window_start, window_end = self._window(now)
         ttl = window_end - int(now.timestamp())
         pipe = self._redis.pipeline()
-        pipe.incr(key)
+        pipe.incrby(key, cost)
         pipe.expire(key, ttl)
         count, _ = pipe.execute()
         allowed = limit * burst
@@ -58,7 +59,7 @@ class RateLimiter:
             return RateLimitResult(limit=limit, remaining=0, reset_seconds=reset, blocked=True)
         return RateLimitResult(limit=limit, remaining=remaining, reset_seconds=reset, blocked=False)
 
-    def _pg_check(self, db: Session, key: str, limit: int, burst: int) -> RateLimitResult:
+    def _pg_check(self, db: Session, key: str, limit: int, burst: int, cost: int = 1) -> RateLimitResult:
         now = dt.datetime.utcnow()
         window_start, window_end = self._window(now)
         allowed = limit * burst
@@ -73,14 +74,14 @@ class RateLimiter:
                     text(
                         """
                         INSERT INTO rate_limit_counters (key, window_start, count, last_updated)
-                        VALUES (:key, :ws, 1, now())
+                        VALUES (:key, :ws, :cost, now())
                         ON CONFLICT (key) DO UPDATE
-                        SET count = rate_limit_counters.count + 1,
+                        SET count = rate_limit_counters.count + :cost,
                             last_updated = now()
                         RETURNING count
                         """
                     ),
-                    {"key": key, "ws": window_start},
+                    {"key": key, "ws": window_start, "cost": cost},
                 ).scalar()
         except Exception:
             db.rollback()
@@ -97,11 +98,22 @@ class RateLimiter:
             db.rollback()
         return RateLimitResult(limit=limit, remaining=remaining, reset_seconds=reset, blocked=False)
 
-    def check(self, *, key: str, scope: str, limit: int, burst: int, db: Session, context: RequestContext) -> RateLimitResult:
+    def check(
+        self,
+        *,
+        key: str,
+        scope: str,
+        limit: int,
+        burst: int,
+        db: Session,
+        context: RequestContext,
+        cost: int = 1,
+    ) -> RateLimitResult:
+        """Count ``cost`` units (e.g. runs in a batch) against the window."""
         if self._redis:
-            result = self._redis_check(f"rl:{scope}:{key}", limit, burst)
+            result = self._redis_check(f"rl:{scope}:{key}", limit, burst, cost)
         else:
-            result = self._pg_check(db, f"rl:{scope}:{key}", limit, burst)
+            result = self._pg_check(db, f"rl:{scope}:{key}", limit, burst, cost)
         if result.blocked:
             # Abuse tracking for API key
             if context.api_key:
@@ -118,7 +130,7 @@ class RateLimiter:
             )
         return result
 
-    def _handle_abuse(self, db: Session, api_key: ApiKey, context: RequestContext, scope: str):
+    def _handle_abuse(self, db: Session, api_key: ApiKeyIdentity, context: RequestContext, scope: str):
         window_minutes = 10
         threshold = 20
         now = dt.datetime.utcnow()
@@ -156,7 +168,10 @@ class RateLimiter:
             db.commit()
         if count and int(count) > threshold:
             blocked_until = now + dt.timedelta(minutes=10)
-            api_key.blocked_until = blocked_until
+            key_row = db.get(ApiKey, api_key.id)
+            if key_row is not None:
+                key_row.blocked_until = blocked_until
+                invalidate_api_key_on_commit(db, api_key.id)
             try:
                 db.commit()
             except Exception:
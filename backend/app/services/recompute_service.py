@@ -0,0 +1,201 @@
+"""Resumable bulk recompute of stored emissions (e.g. after emission factors change).
+
+A job walks job runs in ``(organization_id, created_at, id)`` order, the
+order of ``ix_job_runs_org_created_id``, ``chunk_size`` runs at a time. Each
+chunk is recomputed by the emissions engine in one pass, and only runs whose
+emissions or status changed are written. The job's cursor and counters are
+updated in the same transaction, so a crash loses at most the uncommitted
+chunk and a restarted job continues after the last committed run.
+
+Throughput is capped at ``max_rows_per_second``; the runner sleeps between
+chunks to stay under it. A job whose heartbeat is older than
+``RECOMPUTE_STALE_SECONDS`` counts as crashed and can be claimed again, as
+can a failed one.
+"""
+from __future__ import annotations
+
+import logging
+import time
+from datetime import datetime, timedelta
+from typing import Callable, List, Optional, Sequence
+from uuid import UUID
+
+from fastapi import HTTPException
+from sqlalchemy import and_, func, or_, select, tuple_, update
+from sqlalchemy.orm import Session
+
+from backend.app.core.config import get_settings
+from backend.app.core.database import SessionLocal
+from backend.app.models.emission_recompute_job import EmissionRecomputeJob
+from backend.app.models.job_run import JobRun
+from backend.app.services.emissions_engine import changed, compute_inputs, load_inputs, persist
+from backend.app.services.factor_resolver import factor_resolver
+
+settings = get_settings()
+logger = logging.getLogger(__name__)
+
+CLAIMABLE = ("pending", "failed")
+FINISHED = ("completed", "cancelled")
+
+
+def _region_filter(regions: Optional[Sequence[str]]):
+    # Prefix match: a new us-east-1 factor also changes us-east-1a. Over-matching is
+    # harmless, unchanged runs are not written.
+    if not regions:
+        return None
+    region = func.lower(JobRun.region)
+    return or_(*[region.like(r.strip().lower().replace("%", r"\%").replace("_", r"\_") + "%") for r in regions])
+
+
+def _filters(job: EmissionRecomputeJob) -> List:
+    clauses = []
+    if job.organization_id is not None:
+        clauses.append(JobRun.organization_id == job.organization_id)
+    region = _region_filter(job.regions)
+    if region is not None:
+        clauses.append(region)
+    return clauses
+
+
+def chunk_statement(job: EmissionRecomputeJob):
+    """Next chunk of run keys after the job's cursor."""
+    stmt = select(JobRun.organization_id, JobRun.created_at, JobRun.id).where(*_filters(job))
+    if job.cursor_id is not None:
+        stmt = stmt.where(
+            tuple_(JobRun.organization_id, JobRun.created_at, JobRun.id)
+            > tuple_(job.cursor_organization_id, job.cursor_created_at, job.cursor_id)
+        )
+    return stmt.order_by(JobRun.organization_id, JobRun.created_at, JobRun.id).limit(job.chunk_size)
+
+
+def create_job(
+    db: Session,
+    organization_id: Optional[UUID] = None,
+    regions: Optional[Sequence[str]] = None,
+    chunk_size: Optional[int] = None,
+    max_rows_per_second: Optional[int] = None,
+    requested_by_user_id: Optional[UUID] = None,
+) -> EmissionRecomputeJob:
+    job = EmissionRecomputeJob(
+        organization_id=organization_id,
+        requested_by_user_id=requested_by_user_id,
+        regions=[r.strip().lower() for r in regions] if regions else None,
+        status="pending",
+        chunk_size=chunk_size or settings.recompute_chunk_rows,
+        max_rows_per_second=max_rows_per_second or settings.recompute_max_rows_per_second,
+        scanned_runs=0,
+        changed_runs=0,
+    )
+    job.total_runs = db.execute(select(func.count()).select_from(JobRun).where(*_filters(job))).scalar()
+    db.add(job)
+    db.flush()
+    return job
+
+
+def claim(db: Session, job_id: UUID) -> Optional[EmissionRecomputeJob]:
+    """Mark a pending, failed or abandoned running job as running by us; None if not claimable."""
+    now = datetime.utcnow()
+    stale = now - timedelta(seconds=settings.recompute_stale_seconds)
+    claimed = db.execute(
+        update(EmissionRecomputeJob)
+        .where(
+            EmissionRecomputeJob.id == job_id,
+            or_(
+                EmissionRecomputeJob.status.in_(CLAIMABLE),
+                and_(EmissionRecomputeJob.status == "running", EmissionRecomputeJob.heartbeat_at < stale),
+            ),
+        )
+        .values(
+            status="running",
+            started_at=func.coalesce(EmissionRecomputeJob.started_at, now),
+            heartbeat_at=now,
+            error=None,
+        )
+        .returning(EmissionRecomputeJob.id)
+        .execution_options(synchronize_session=False)
+    ).scalar()
+    db.commit()
+    return db.get(EmissionRecomputeJob, claimed) if claimed else None
+
+
+def cancel(db: Session, job: EmissionRecomputeJob) -> EmissionRecomputeJob:
+    """Ask a job to stop; pending jobs stop at once, running ones after their current chunk."""
+    if job.status in FINISHED:
+        raise HTTPException(status_code=409, detail=f"Recompute job already {job.status}")
+    if job.status in ("pending", "failed"):
+        job.status = "cancelled"
+        job.finished_at = datetime.utcnow()
+    elif job.status == "running":
+        job.status = "cancelling"
+    return job
+
+
+def process_chunk(db: Session, job: EmissionRecomputeJob) -> int:
+    """Recompute one chunk and advance the checkpoint; returns the runs scanned (0 when done)."""
+    keys = db.execute(chunk_statement(job)).all()
+    if not keys:
+        return 0
+    inputs = load_inputs(db, [key.id for key in keys])
+    batch = compute_inputs(db, inputs)
+    index = changed(inputs, batch)
+    if len(index):
+        persist(db, inputs.take(index), batch.take(index))
+    last = keys[-1]
+    job.cursor_organization_id, job.cursor_created_at, job.cursor_id = last.organization_id, last.created_at, last.id
+    job.scanned_runs = (job.scanned_runs or 0) + len(keys)
+    job.changed_runs = (job.changed_runs or 0) + len(index)
+    job.heartbeat_at = datetime.utcnow()
+    return len(keys)
+
+
+def run_job(
+    job_id: UUID,
+    session_factory=SessionLocal,
+    sleep: Callable[[float], None] = time.sleep,
+    clock: Callable[[], float] = time.monotonic,
+) -> Optional[str]:
+    """Run a job to completion, cancellation or failure; returns its final status (None if not claimed)."""
+    db: Session = session_factory()
+    try:
+        job = claim(db, job_id)
+        if job is None:
+            logger.info("Recompute job %s is not claimable", job_id)
+            return None
+        # Factors may have been edited just before the job was started
+        factor_resolver.invalidate()
+        began, processed = clock(), 0
+        while True:
+            status = db.execute(
+                select(EmissionRecomputeJob.status).where(EmissionRecomputeJob.id == job.id)
+            ).scalar()
+            if status == "cancelling":
+                job.status, job.finished_at = "cancelled", datetime.utcnow()
+                db.commit()
+                return job.status
+            scanned = process_chunk(db, job)
+            if not scanned:
+                job.status, job.finished_at = "completed", datetime.utcnow()
+                db.commit()
+                logger.info("Recompute job %s completed: %s scanned, %s changed", job.id, job.scanned_runs, job.changed_runs)
+                return job.status
+            db.commit()
+            processed += scanned
+            logger.info(
+                "Recompute job %s: %s/%s scanned, %s changed",
+                job.id, job.scanned_runs, job.total_runs, job.changed_runs,
+            )
+            ahead = processed / job.max_rows_per_second - (clock() - began)
+            if ahead > 0:
+                sleep(ahead)
+    except Exception as exc:
+        logger.exception("Recompute job %s failed", job_id)
+        db.rollback()
+        db.execute(
+            update(EmissionRecomputeJob)
+            .where(EmissionRecomputeJob.id == job_id)
+            .values(status="failed", error=str(exc)[:2000])
+        )
+        db.commit()
+        return "failed"
+    finally:
+        db.close()
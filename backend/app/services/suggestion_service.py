@@ -11,7 +11,7 @@ from sqlalchemy.orm import Session, joinedload
 
 from backend.app.models.job_run import JobRun
 from backend.app.models.suggestion import OptimizationSuggestion
-from backend.app.models.region_emission_factor import RegionEmissionFactor
+from backend.app.services.factor_resolver import factor_resolver
 
 ENGINE_VERSION = "v1"
 
@@ -20,16 +20,6 @@ def _hash_key(seed: str) -> str:
     return hashlib.sha256(seed.encode("utf-8")).hexdigest()
 
 
-def _factor_for_region(db: Session, region: str) -> float:
-    rec = (
-        db.query(RegionEmissionFactor)
-        .filter(RegionEmissionFactor.region == region.lower())
-        .order_by(RegionEmissionFactor.version.desc())
-        .first()
-    )
-    return rec.factor_kg_co2e_per_kwh if rec else 0.0004
-
-
 def _ensure_unique(db: Session, suggestion: OptimizationSuggestion) -> OptimizationSuggestion:
     existing = (
         db.query(OptimizationSuggestion)
@@ -85,7 +75,7 @@ def _build_suggestion(
 
 def generate_run_suggestions(db: Session, run: JobRun) -> List[OptimizationSuggestion]:
     energy_kwh = run.energy.total_kwh if run.energy else 0.0
-    carbon = run.energy.emissions_kg if run.energy else energy_kwh * _factor_for_region(db, run.region or "")
+    carbon = run.energy.emissions_kg if run.energy else energy_kwh * factor_resolver.resolve(run.region)
     duration = None
     if run.start_time and run.end_time:
         duration = max((run.end_time - run.start_time).total_seconds(), 0.0)
@@ -95,7 +85,7 @@ def generate_run_suggestions(db: Session, run: JobRun) -> List[OptimizationSugge
 
     # Region switching
     lower_factor = 0.0002
-    if run.region and _factor_for_region(db, run.region) > lower_factor * 1.5:
+    if run.region and factor_resolver.resolve(run.region) > lower_factor * 1.5:
         suggestions.append(
             _build_suggestion(
                 project_id=run.project_id,
@@ -109,7 +99,7 @@ def generate_run_suggestions(db: Session, run: JobRun) -> List[OptimizationSugge
                 confidence=0.6,
                 steps="Evaluate latency and data residency, then migrate workload to a greener region.",
                 rationale="Region emission factor higher than available alternatives.",
-                evidence={"current_region": run.region, "factor": _factor_for_region(db, run.region)},
+                evidence={"current_region": run.region, "factor": factor_resolver.resolve(run.region)},
             )
         )
 
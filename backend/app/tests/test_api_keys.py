@@ -0,0 +1,179 @@
+from datetime import datetime, timedelta, timezone
+from uuid import uuid4
+
+from backend.app.auth import api_keys
+from backend.app.auth.api_keys import ApiKeyCache, ApiKeyIdentity, generate_api_key, key_id_for
+
+
+def _identity():
+    return ApiKeyIdentity(id=uuid4(), project_id=uuid4(), organization_id=uuid4())
+
+
+def test_cache_hit_and_invalidate():
+    cache = ApiKeyCache(ttl_seconds=60, max_entries=10)
+    cache._listener = object()  # no pub/sub in unit tests
+    identity = _identity()
+    cache.put("gai_secret", identity)
+
+    assert cache.get("gai_secret") == identity
+    assert cache.get("gai_other") is None
+    assert "gai_secret" not in cache.digest("gai_secret")
+
+    cache.invalidate(identity.id, broadcast=False)
+    assert cache.get("gai_secret") is None
+
+
+def test_cache_is_bounded():
+    cache = ApiKeyCache(ttl_seconds=60, max_entries=2)
+    cache._listener = object()
+    for i in range(3):
+        cache.put(f"gai_{i}", _identity())
+
+    assert cache.get("gai_0") is None
+    assert cache.get("gai_2") is not None
+
+
+def test_ingest_auth_verifies_key_once_per_request(monkeypatch):
+    from types import SimpleNamespace
+
+    from fastapi import Depends, FastAPI
+    from fastapi.testclient import TestClient
+
+    from backend.app.api.job_runs import get_api_key
+    from backend.app.auth.context import get_request_context
+    from backend.app.core.database import get_db
+
+    stored = SimpleNamespace(
+        id=uuid4(), project_id=uuid4(), organization_id=uuid4(), blocked_until=None, scopes=["ingest"], hashed_key="h",
+        hash_scheme="hmac-sha256",
+    )
+
+    class FakeQuery:
+        def filter(self, *args):
+            return self
+
+        def one_or_none(self):
+            return stored
+
+    class FakeSession:
+        def query(self, *args):
+            return FakeQuery()
+
+    calls = []
+
+    def fake_check(raw, hashed, scheme):
+        calls.append(raw)
+        return True
+
+    monkeypatch.setattr(api_keys, "check_api_key_hash", fake_check)
+    monkeypatch.setattr(api_keys.api_key_cache, "ttl_seconds", 0)
+
+    app = FastAPI()
+
+    @app.get("/probe")
+    def probe(api_key=Depends(get_api_key), ctx=Depends(get_request_context)):
+        return {"same": ctx.api_key is api_key}
+
+    app.dependency_overrides[get_db] = lambda: FakeSession()
+    resp = TestClient(app).get("/probe", headers={"X-API-Key": "gai_test_key"})
+
+    assert resp.status_code == 200
+    assert resp.json() == {"same": True}
+    assert calls == ["gai_test_key"]
+
+
+def test_key_id_embedded_in_new_keys_and_legacy_prefix_fallback():
+    key_id, raw = generate_api_key()
+    assert raw.startswith(f"gai_{key_id}_")
+    assert key_id_for(raw) == key_id
+    assert key_id_for("gai_legacyTokenValue") == "gai_legacyTo"
+
+
+def test_bcrypt_key_is_rehashed_to_hmac_on_verify(monkeypatch):
+    from types import SimpleNamespace
+
+    from backend.app.auth.security import get_password_hash
+
+    _, raw = generate_api_key()
+    stored = SimpleNamespace(
+        id=uuid4(), project_id=uuid4(), organization_id=uuid4(), blocked_until=None, scopes=["ingest"],
+        hashed_key=get_password_hash(raw), hash_scheme="bcrypt",
+    )
+    updates = []
+
+    class FakeQuery:
+        def filter(self, *args):
+            return self
+
+        def one_or_none(self):
+            return stored
+
+        def update(self, values, synchronize_session=None):
+            updates.append({col.key: value for col, value in values.items()})
+            return 1
+
+    class FakeSession:
+        committed = False
+
+        def query(self, *args):
+            return FakeQuery()
+
+        def commit(self):
+            self.committed = True
+
+    monkeypatch.setattr(api_keys.api_key_cache, "ttl_seconds", 0)
+    db = FakeSession()
+
+    assert api_keys.verify_api_key(db, raw).id == stored.id
+    assert db.committed
+    assert updates == [{"hashed_key": api_keys.hash_api_key(raw)[1], "hash_scheme": "hmac-sha256"}]
+    assert api_keys.check_api_key_hash(raw, updates[0]["hashed_key"], "hmac-sha256")
+    assert not api_keys.check_api_key_hash(raw + "x", updates[0]["hashed_key"], "hmac-sha256")
+
+
+def test_ingest_token_authorizes_without_db_and_honours_deny_list(monkeypatch):
+    import time
+
+    from fastapi import Depends, FastAPI
+    from fastapi.testclient import TestClient
+
+    from backend.app.api.job_runs import get_api_key
+    from backend.app.core.database import get_db
+
+    identity = _identity()
+    deny_list = api_keys.ingest_deny_list
+    monkeypatch.setattr(deny_list, "_refresher", object())  # no background refresh in unit tests
+    monkeypatch.setattr(deny_list, "_loaded_at", time.monotonic())
+    monkeypatch.setattr(deny_list, "_revoked", frozenset())
+    monkeypatch.setattr(deny_list, "_blocked", {})
+
+    class NoDb:
+        def __getattr__(self, name):
+            raise AssertionError("ingest token auth must not touch the database")
+
+    app = FastAPI()
+
+    @app.get("/probe")
+    def probe(api_key=Depends(get_api_key)):
+        return {"id": str(api_key.id), "project_id": str(api_key.project_id)}
+
+    app.dependency_overrides[get_db] = lambda: NoDb()
+    client = TestClient(app)
+    token, expires_in = api_keys.issue_ingest_token(identity)
+    headers = {"Authorization": f"Bearer {token}"}
+
+    resp = client.get("/probe", headers=headers)
+    assert resp.status_code == 200
+    assert resp.json() == {"id": str(identity.id), "project_id": str(identity.project_id)}
+    assert expires_in > 0
+
+    monkeypatch.setattr(deny_list, "_blocked", {identity.id: datetime.now(timezone.utc) + timedelta(minutes=5)})
+    assert client.get("/probe", headers=headers).status_code == 403
+
+    monkeypatch.setattr(deny_list, "_revoked", frozenset({identity.id}))
+    assert client.get("/probe", headers=headers).status_code == 401
+
+    monkeypatch.setattr(deny_list, "_revoked", frozenset())
+    monkeypatch.setattr(deny_list, "_blocked", {})
+    monkeypatch.setattr(deny_list, "_loaded_at", time.monotonic() - 10 * deny_list.refresh_seconds)
+    assert client.get("/probe", headers=headers).status_code == 401  # stale deny-list fails closed
@@ -0,0 +1,97 @@
+from datetime import datetime, timezone
+from uuid import uuid4
+
+from sqlalchemy.dialects import postgresql
+from sqlalchemy.orm import Query
+
+from backend.app.api.audit_logs import build_audit_log_query
+from backend.app.schemas.audit_log import AuditLogQuery
+from backend.app.services import audit_partitions as ap
+
+
+class Result:
+    def __init__(self, rows=(), rowcount=0):
+        self._rows = list(rows)
+        self.rowcount = rowcount
+
+    def scalars(self):
+        return iter(self._rows)
+
+    def scalar(self):
+        return self._rows[0] if self._rows else 0
+
+    def __iter__(self):
+        return iter(self._rows)
+
+
+class FakeConnection:
+    def __init__(self, partitions, retention=()):
+        self.partitions = partitions
+        self.retention = list(retention)
+        self.statements = []
+
+    def execute(self, statement, params=None):
+        sql = str(statement)
+        self.statements.append((" ".join(sql.split()), params or {}))
+        if "pg_inherits" in sql:
+            return Result(self.partitions)
+        if "audit_retention_days" in sql:
+            return Result(self.retention)
+        if sql.lstrip().startswith("DELETE"):
+            return Result(rowcount=3)
+        return Result()
+
+    def commit(self):
+        pass
+
+
+def test_month_arithmetic_and_names():
+    start = ap.month_start(datetime(2026, 11, 17, 8, 30, tzinfo=timezone.utc))
+    assert start == datetime(2026, 11, 1, tzinfo=timezone.utc)
+    assert ap.add_months(start, 2) == datetime(2027, 1, 1, tzinfo=timezone.utc)
+    assert ap.partition_name(ap.add_months(start, 2)) == "audit_logs_p2027_01"
+
+
+def test_ensure_partitions_creates_missing_months():
+    conn = FakeConnection(["audit_logs_p2026_10", "audit_logs_default"])
+    created = ap.ensure_partitions(conn, datetime(2026, 10, 17, tzinfo=timezone.utc), months_ahead=2)
+
+    assert created == ["audit_logs_p2026_11", "audit_logs_p2026_12"]
+    ddl = [sql for sql, _ in conn.statements if sql.startswith("CREATE TABLE")]
+    assert ddl[0] == (
+        "CREATE TABLE audit_logs_p2026_11 PARTITION OF audit_logs "
+        "FOR VALUES FROM ('2026-11-01 00:00:00+00') TO ('2026-12-01 00:00:00+00')"
+    )
+
+
+def test_retention_expires_old_partitions_and_trims_short_retention_orgs(monkeypatch):
+    monkeypatch.setattr(ap.settings, "audit_retention_days", 90)
+    monkeypatch.setattr(ap.settings, "audit_retention_action", "drop")
+    short_org = uuid4()
+    conn = FakeConnection(
+        ["audit_logs_p2025_12", "audit_logs_p2026_06", "audit_logs_p2026_10"],
+        retention=[(short_org, 30)],
+    )
+
+    summary = ap.apply_retention(conn, datetime(2026, 10, 17, tzinfo=timezone.utc))
+
+    assert summary["expired_partitions"] == ["audit_logs_p2025_12", "audit_logs_p2026_06"]
+    assert ("DROP TABLE audit_logs_p2026_06", {}) in conn.statements
+    deletes = [params for sql, params in conn.statements if sql.startswith("DELETE")]
+    assert deletes[0]["orgs"] == [str(short_org)]
+    assert deletes[0]["cutoff"] == datetime(2026, 9, 17, tzinfo=timezone.utc)
+
+
+def test_listing_query_always_bounds_created_at(monkeypatch):
+    bound = datetime(2026, 9, 1, tzinfo=timezone.utc)
+    monkeypatch.setattr("backend.app.api.audit_logs.retention_cutoff", lambda db, org: bound)
+
+    class NoDb:
+        def query(self, *entities):
+            return Query(entities)
+
+    sql = str(
+        build_audit_log_query(NoDb(), uuid4(), AuditLogQuery(action="job_run.ingest"))
+        .statement.compile(dialect=postgresql.dialect(), compile_kwargs={"literal_binds": True})
+    )
+    assert "audit_logs.created_at >= '2026-09-01 00:00:00+00:00'" in sql
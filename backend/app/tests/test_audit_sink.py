@@ -0,0 +1,191 @@
+import subprocess
+import sys
+from uuid import uuid4
+
+import pytest
+
+from sqlalchemy.exc import IntegrityError, OperationalError
+
+from backend.app.services import audit_service
+from backend.app.services.audit_service import AuditEvent, AuditSink
+
+
+class Killed(BaseException):
+    """The writer dying mid-statement, e.g. a daemon thread at interpreter exit."""
+
+
+class RecordingSession:
+    batches = []
+    fail = False
+    reject = None
+    kill = False
+
+    def execute(self, statement, rows):
+        if RecordingSession.kill:
+            raise Killed()
+        if RecordingSession.fail:
+            raise OperationalError("INSERT", {}, Exception("connection refused"))
+        if any(row["action"] == RecordingSession.reject for row in rows):
+            raise IntegrityError("INSERT", {}, Exception("check constraint"))
+        RecordingSession.batches.append(list(rows))
+
+    def commit(self):
+        pass
+
+    def rollback(self):
+        pass
+
+    def close(self):
+        pass
+
+
+def _sink(monkeypatch, tmp_path, **overrides):
+    RecordingSession.batches = []
+    RecordingSession.fail = False
+    RecordingSession.reject = None
+    RecordingSession.kill = False
+    monkeypatch.setattr(audit_service, "SessionLocal", RecordingSession)
+    monkeypatch.setattr(audit_service.settings, "audit_spool_path", str(tmp_path / "spool.ndjson"))
+    monkeypatch.setattr(audit_service.settings, "audit_flush_interval_ms", 10_000)
+    for name, value in overrides.items():
+        monkeypatch.setattr(audit_service.settings, name, value)
+    return AuditSink()
+
+
+def _event(i=0):
+    return AuditEvent(organization_id=uuid4(), action=f"unit.test.{i}", metadata={"i": i, "org": uuid4()})
+
+
+def test_events_are_flushed_in_multi_row_batches(monkeypatch, tmp_path):
+    sink = _sink(monkeypatch, tmp_path, audit_flush_max_events=3)
+    for i in range(7):
+        sink.submit(_event(i))
+    sink.close()
+
+    assert [len(batch) for batch in RecordingSession.batches] == [3, 3, 1]
+    assert RecordingSession.batches[0][0]["action"] == "unit.test.0"
+    # metadata is made JSON-safe when the event is queued
+    assert isinstance(RecordingSession.batches[0][0]["metadata"]["org"], str)
+
+
+def test_unwritable_batches_are_spooled_and_replayed(monkeypatch, tmp_path):
+    sink = _sink(monkeypatch, tmp_path)
+    RecordingSession.fail = True
+    sink.submit(_event(1))
+    sink.submit(_event(2))
+    sink.close()
+    assert (tmp_path / "spool.ndjson").read_text().count("\n") == 2
+
+    RecordingSession.fail = False
+    sink = _sink(monkeypatch, tmp_path)
+    sink.submit(_event(3))
+    sink.close()
+
+    assert [row["action"] for batch in RecordingSession.batches for row in batch] == [
+        "unit.test.3",
+        "unit.test.1",
+        "unit.test.2",
+    ]
+    assert not (tmp_path / "spool.ndjson").exists()
+
+
+def test_replay_skips_corrupt_lines_and_does_not_respool_rejected_rows(monkeypatch, tmp_path):
+    sink = _sink(monkeypatch, tmp_path)
+    RecordingSession.reject = "unit.test.2"
+    lines = [audit_service._row_to_json(audit_service._audit_row(_event(i))) for i in (1, 2)]
+    (tmp_path / "spool.ndjson").write_text(lines[0] + "\n" + '{"action": "unit.te' + "\n" + lines[1] + "\n")
+    dropped = audit_service.audit_events.labels("dropped")._value.get()
+
+    sink.submit(_event(3))
+    sink.close()
+
+    written = [row["action"] for batch in RecordingSession.batches for row in batch]
+    assert written == ["unit.test.3", "unit.test.1"]
+    assert audit_service.audit_events.labels("dropped")._value.get() == dropped + 1
+    assert not (tmp_path / "spool.ndjson").exists()
+    assert list(tmp_path.iterdir()) == []
+
+
+def test_replay_interrupted_by_process_death_is_taken_over(monkeypatch, tmp_path):
+    sink = _sink(monkeypatch, tmp_path)
+    spool = tmp_path / "spool.ndjson"
+    spool.write_text("".join(audit_service._row_to_json(audit_service._audit_row(_event(i))) + "\n" for i in (1, 2)))
+    RecordingSession.kill = True
+    with pytest.raises(Killed):
+        sink._replay_spool()
+    (claimed,) = tmp_path.glob("spool.ndjson.*.replay")
+    assert not spool.exists()
+
+    # The claiming process is gone; a later process picks its file up
+    dead = subprocess.Popen([sys.executable, "-c", "pass"])
+    dead.wait()
+    claimed.rename(tmp_path / f"spool.ndjson.{dead.pid}.1.replay")
+    sink = _sink(monkeypatch, tmp_path)
+    sink.submit(_event(3))
+    sink.close()
+
+    written = sorted(row["action"] for batch in RecordingSession.batches for row in batch)
+    assert written == ["unit.test.1", "unit.test.2", "unit.test.3"]
+    assert list(tmp_path.iterdir()) == []
+
+
+def test_replay_failure_respools_and_keeps_the_writer_alive(monkeypatch, tmp_path):
+    sink = _sink(monkeypatch, tmp_path)
+    spool = tmp_path / "spool.ndjson"
+    spool.write_text(audit_service._row_to_json(audit_service._audit_row(_event(1))) + "\n")
+
+    def broken(db, rows):
+        if rows[0]["action"] == "unit.test.1":
+            raise KeyError("aggregate_key")
+        RecordingSession.batches.append(list(rows))
+
+    monkeypatch.setattr(audit_service, "_write_rows", broken)
+    sink.submit(_event(2))
+    sink.close()
+
+    assert [row["action"] for batch in RecordingSession.batches for row in batch] == ["unit.test.2"]
+    assert spool.read_text().count("unit.test.1") == 1
+    assert list(tmp_path.glob("*.replay")) == []
+
+
+def test_full_queue_drops_instead_of_blocking(monkeypatch, tmp_path):
+    sink = _sink(monkeypatch, tmp_path, audit_queue_max_events=1)
+    monkeypatch.setattr(sink, "_ensure_started", lambda: None)
+    before = audit_service.audit_events.labels("dropped")._value.get()
+    sink.submit(_event(1))
+    sink.submit(_event(2))
+    assert audit_service.audit_events.labels("dropped")._value.get() == before + 1
+
+
+def test_aggregate_policy_collapses_successes_and_keeps_failures(monkeypatch, tmp_path):
+    sink = _sink(monkeypatch, tmp_path)
+    monkeypatch.setattr(
+        audit_service,
+        "audit_policies",
+        audit_service.parse_audit_policies("job_run.ingest=aggregate(1h), report.download=sampled(0)"),
+    )
+    org, key = uuid4(), uuid4()
+    for _ in range(4):
+        sink.submit(AuditEvent(organization_id=org, actor_type="api_key", actor_api_key_id=key, action="job_run.ingest"))
+    sink.submit(
+        AuditEvent(organization_id=org, actor_type="api_key", actor_api_key_id=key, action="job_run.ingest", status="failure")
+    )
+    sink.submit(AuditEvent(organization_id=org, action="report.download"))
+    sink.close()
+
+    plain, aggregates = audit_service._coalesce([row for batch in RecordingSession.batches for row in batch])
+    assert [row["status"] for row in plain] == ["failure"]
+    assert len(aggregates) == 1
+    assert aggregates[0]["event_count"] == 4
+    assert aggregates[0]["first_at"] <= aggregates[0]["last_at"]
+    assert aggregates[0]["created_at"].minute == 0
+
+
+def test_parse_audit_policies_rejects_malformed_entries():
+    assert audit_service.parse_audit_policies("a=full, b=sampled(0.5)")["b"].rate == 0.5
+    for spec in ("a=sampled(2)", "a=aggregate(0)", "a=every(5)", "=full"):
+        try:
+            audit_service.parse_audit_policies(spec)
+        except ValueError:
+            continue
+        raise AssertionError(f"{spec} should be rejected")
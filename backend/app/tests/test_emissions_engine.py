@@ -0,0 +1,93 @@
+from datetime import datetime, timezone
+from types import SimpleNamespace
+from uuid import uuid4
+
+import numpy as np
+from sqlalchemy.dialects import postgresql
+
+from backend.app.services import emissions_engine as engine
+
+NOW = datetime(2026, 1, 1, 12, tzinfo=timezone.utc).timestamp()
+HOUR = 3600.0
+
+
+def _row(**overrides):
+    values = dict(
+        id=uuid4(),
+        energy_id=uuid4(),
+        region="us-east-1",
+        total_kwh=None,
+        cpu_kwh=None,
+        gpu_kwh=None,
+        ram_kwh=None,
+        start_epoch=NOW - 2 * HOUR,
+        end_epoch=NOW - HOUR,
+        power_watts=None,
+        cpu_count=None,
+        gpu_count=None,
+        emissions_kg=None,
+        compute_status=None,
+    )
+    values.update(overrides)
+    return SimpleNamespace(**values)
+
+
+def test_compute_batch_applies_energy_fallbacks_in_order(monkeypatch):
+    monkeypatch.setattr(engine.settings, "default_cpu_w_per_core", 10.0)
+    monkeypatch.setattr(engine.settings, "default_gpu_w", 150.0)
+    monkeypatch.setattr(engine.settings, "default_base_overhead_w", 30.0)
+    rows = [
+        _row(total_kwh=2.0, cpu_kwh=9.0),
+        _row(cpu_kwh=1.0, gpu_kwh="0.5", ram_kwh=None),
+        _row(power_watts="500", end_epoch=None),  # still running: measured up to now
+        _row(cpu_count="4", gpu_count="2"),
+        _row(cpu_count="4", end_epoch=None),  # running without telemetry
+        _row(power_watts="n/a", start_epoch=None, end_epoch=None),
+    ]
+    inputs = engine.RunInputs.from_rows(rows)
+    batch = engine.compute_batch(inputs, np.full(len(rows), 0.0004), NOW)
+
+    assert [engine.METHODS[m] for m in batch.method] == [
+        "reported", "components", "power_hint", "hardware_estimate", "none", "none",
+    ]
+    assert np.allclose(batch.energy_kwh, [2.0, 1.5, 1.0, 0.37, 0.0, 0.0])
+    assert np.allclose(batch.emissions_kg, batch.energy_kwh * 0.0004)
+    assert batch.ok.tolist() == [True, True, True, True, False, False]
+    assert batch.result(3)["carbon_intensity_g_per_kwh"] == 0.4
+
+
+class RecordingSession:
+    def __init__(self):
+        self.statements = []
+
+    def execute(self, statement):
+        self.statements.append(str(statement.compile(dialect=postgresql.dialect())))
+
+
+def test_persist_writes_batch_with_one_update_and_one_upsert():
+    rows = [_row(total_kwh=1.0), _row(total_kwh=2.0), _row(energy_id=None, total_kwh=3.0)]
+    inputs = engine.RunInputs.from_rows(rows)
+    batch = engine.compute_batch(inputs, np.full(3, 0.0004), NOW)
+    db = RecordingSession()
+    engine.persist(db, inputs, batch)
+
+    update_energy, upsert_energy, complete_runs = db.statements
+    assert update_energy.startswith("UPDATE job_run_energy SET")
+    assert "FROM (VALUES" in update_energy
+    assert upsert_energy.startswith("INSERT INTO job_run_energy")
+    assert "ON CONFLICT (job_run_id) DO UPDATE" in upsert_energy
+    assert complete_runs.startswith("UPDATE job_runs SET status=")
+
+
+def test_changed_selects_only_rows_whose_result_moved():
+    rows = [
+        _row(total_kwh=1.0, emissions_kg=0.0004, compute_status="success"),
+        _row(total_kwh=1.0, emissions_kg=0.0005, compute_status="success"),
+        _row(total_kwh=1.0, emissions_kg=0.0004, compute_status="pending"),
+        _row(start_epoch=None, emissions_kg=0.0, compute_status="incomplete"),
+    ]
+    inputs = engine.RunInputs.from_rows(rows)
+    batch = engine.compute_batch(inputs, np.full(4, 0.0004), NOW)
+    index = engine.changed(inputs, batch)
+    assert index.tolist() == [1, 2]
+    assert batch.take(index).job_run_ids == [rows[1].id, rows[2].id]
@@ -0,0 +1,117 @@
+from uuid import uuid4
+
+from backend.app.services import emissions_queue as eq
+from backend.app.services import emissions_service, outbox
+
+
+class FakeQueue:
+    def __init__(self, messages):
+        self.messages = messages
+        self.acked = []
+
+    def read(self, consumer, count, block_ms):
+        return self.messages[:count]
+
+    def ack(self, entry_ids):
+        self.acked.extend(entry_ids)
+
+
+class FakeSession:
+    def __init__(self):
+        self.commits = self.rollbacks = 0
+
+    def commit(self):
+        self.commits += 1
+
+    def rollback(self):
+        self.rollbacks += 1
+
+
+def test_drain_once_computes_distinct_runs_in_one_pass(monkeypatch):
+    a, b = uuid4(), uuid4()
+    queue = FakeQueue([("1-0", {"job_run_id": str(a)}), ("2-0", {"job_run_id": str(b)}),
+                       ("3-0", {"job_run_id": str(a)}), ("4-0", {"job_run_id": "junk"})])
+    calls = []
+    monkeypatch.setattr(eq, "compute_emissions", lambda db, ids: calls.append(ids))
+    db = FakeSession()
+
+    assert eq.drain_once(db, queue, "w1", batch_size=10) == 4
+    assert calls == [[a, b]]
+    assert db.commits == 1 and queue.acked == ["1-0", "2-0", "3-0", "4-0"]
+
+
+def test_failed_batch_is_left_pending(monkeypatch):
+    queue = FakeQueue([("1-0", {"job_run_id": str(uuid4())})])
+
+    def boom(db, ids):
+        raise RuntimeError("db down")
+
+    monkeypatch.setattr(eq, "compute_emissions", boom)
+    db = FakeSession()
+
+    assert eq.drain_once(db, queue, "w1") == 0
+    assert db.rollbacks == 1 and queue.acked == []
+
+
+def test_in_process_compute_only_without_the_queue(monkeypatch):
+    computed = []
+    monkeypatch.setattr(emissions_service, "compute_emissions_for_job_runs", computed.append)
+    run = uuid4()
+
+    for sync_compute, queue_enabled in [(True, True), (False, True), (False, False)]:
+        monkeypatch.setattr(outbox.settings, "sync_compute", sync_compute)
+        monkeypatch.setattr(outbox.settings, "emissions_queue_enabled", queue_enabled)
+        assert outbox.handoff_enabled()
+        emissions_service.schedule_emissions([run, run])
+    assert computed == []  # handed over through the outbox
+
+    monkeypatch.setattr(outbox.settings, "sync_compute", True)
+    monkeypatch.setattr(outbox.settings, "emissions_queue_enabled", False)
+    emissions_service.schedule_emissions([run, run])
+    assert computed == [[run]]
+
+
+class PendingSet:
+    """Redis stand-in for the ZADD NX / SADD pipeline on the pending sets."""
+
+    def __init__(self):
+        self.scores = {}
+        self.tenants = set()
+        self.results = []
+
+    def pipeline(self, transaction=True):
+        return self
+
+    def zadd(self, key, mapping, nx=False):
+        new = {(key, member): score for member, score in mapping.items() if (key, member) not in self.scores}
+        self.scores.update(new)
+        self.results.append(len(new))
+
+    def sadd(self, key, member):
+        self.tenants.add(member)
+        self.results.append(1)
+
+    def execute(self):
+        results, self.results = self.results, []
+        return results
+
+
+def _count(outcome):
+    return eq.emissions_queue_runs.labels(outcome)._value.get()
+
+
+def test_repeated_schedules_coalesce_within_the_window(monkeypatch):
+    monkeypatch.setattr(eq.settings, "emissions_queue_debounce_ms", 5000)
+    queue = eq.EmissionsQueue()
+    queue._redis = PendingSet()
+    run, other = uuid4(), uuid4()
+    scheduled, coalesced = _count("scheduled"), _count("coalesced")
+
+    assert queue.schedule([run])
+    key = (queue.pending_key(eq.NO_TENANT), str(run))
+    due = queue._redis.scores[key]
+    assert queue.schedule([run, other]) and queue.schedule([run])
+
+    assert queue._redis.scores[key] == due  # not pushed back by the repeats
+    assert _count("scheduled") - scheduled == 2
+    assert _count("coalesced") - coalesced == 2
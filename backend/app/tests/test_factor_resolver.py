@@ -0,0 +1,66 @@
+from backend.app.services import factor_resolver as fr
+
+
+def test_snapshot_resolves_longest_token_prefix(monkeypatch):
+    monkeypatch.setattr(fr.settings, "default_carbon_intensity_g_per_kwh", 500.0)
+    monkeypatch.setattr(fr.settings, "carbon_intensity_map_json", '{"ap-south-1": 700}')
+    snapshot = fr.compile_snapshot(
+        [("us-east-1", 0.0003, "v2"), ("us-east-1", 0.0009, "v10"), ("eu-north-1", 0.00004, "v1")]
+    )
+
+    assert snapshot.resolve("us-east-1a") == 0.0009  # v10 is newer than v2
+    assert snapshot.resolve("US-EAST-2") == 0.00038  # falls back to the "us" family
+    assert snapshot.resolve("us-east-10") == 0.00038  # not a prefix of us-east-1
+    assert snapshot.resolve("ap-south-1") == 0.7
+    assert snapshot.resolve("sa-east-1") == snapshot.resolve(None) == 0.5
+    assert snapshot.resolve("in") == snapshot.resolve("IN-west") == 0.0007
+    assert snapshot.resolve_many(["eu-north-1b", "eu-west-9", "eu-north-1b"]).tolist() == [0.00004, 0.00025, 0.00004]
+
+
+class FactorTable:
+    """Session stand-in serving the watermark and rows of region_emission_factors."""
+
+    def __init__(self):
+        self.rows = [("us-east-1", 0.0003, "v1")]
+        self.version = 1
+        self.row_reads = 0
+
+    def __call__(self):
+        return self
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+    def execute(self, statement):
+        table = self
+
+        class Result:
+            def one(self):
+                return (len(table.rows), table.version)
+
+            def all(self):
+                table.row_reads += 1
+                return list(table.rows)
+
+        return Result()
+
+
+def test_resolver_reloads_only_when_watermark_moves(monkeypatch):
+    monkeypatch.setattr(fr.settings, "emission_factor_refresh_seconds", 60)
+    table = FactorTable()
+    resolver = fr.FactorResolver(session_factory=table)
+
+    first = resolver.snapshot()
+    assert resolver.resolve("us-east-1") == 0.0003
+    resolver.invalidate()
+    assert resolver.snapshot() is first
+    assert table.row_reads == 1
+
+    table.rows, table.version = [("us-east-1", 0.0001, "v2")], 2
+    assert resolver.resolve("us-east-1") == 0.0003  # within the refresh interval
+    resolver.invalidate()
+    assert resolver.resolve("us-east-1b") == 0.0001
+    assert table.row_reads == 2
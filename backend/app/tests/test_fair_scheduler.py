@@ -0,0 +1,29 @@
+from collections import Counter
+
+from backend.app.services.fair_scheduler import DeficitRoundRobin
+
+
+def test_shares_follow_weights_regardless_of_backlog():
+    drr = DeficitRoundRobin(quantum=10)
+    backlog = {"noisy": 500_000, "pro": 1_000, "small": 1_000}
+    weights = {"noisy": 1, "pro": 4, "small": 1}
+    taken = Counter()
+    for _ in range(20):
+        batch = drr.select(backlog, weights, budget=60)
+        assert sum(batch.values()) == 60
+        taken.update(batch)
+        for tenant, n in batch.items():
+            backlog[tenant] -= n
+
+    assert taken["pro"] == 4 * taken["noisy"] == 4 * taken["small"] == 800
+
+
+def test_idle_tenants_leave_the_round_and_lose_their_credit():
+    drr = DeficitRoundRobin(quantum=10)
+    assert drr.select({"a": 3, "b": 100}, {}, budget=50) == {"a": 3, "b": 47}
+    assert "a" not in drr.deficit
+
+    # a newcomer is served within one round even with a small budget
+    first = drr.select({"b": 53, "c": 5}, {}, budget=10)
+    second = drr.select({"b": 53 - first.get("b", 0), "c": 5 - first.get("c", 0)}, {}, budget=10)
+    assert first.get("c", 0) + second.get("c", 0) == 5
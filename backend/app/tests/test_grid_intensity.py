@@ -0,0 +1,64 @@
+from datetime import date
+
+import numpy as np
+import pytest
+
+from sqlalchemy.dialects import postgresql
+
+from backend.app.services.grid_intensity import HOUR, effective_factors, load_series, series_from_rows
+
+DAY0 = 1_767_225_600.0  # 2026-01-01T00:00:00Z
+
+
+def test_series_integrates_partial_hours_and_falls_back_in_gaps():
+    hourly = [100.0, 200.0, None, 400.0] + [500.0] * 20
+    series = series_from_rows([("US-East-1", date(2026, 1, 1), hourly)])
+    regions = ["us-east-1"] * 5 + ["eu-west-1"]
+    start = np.array([0.5, 0.0, 2.0, 23.0, 23.5, 0.0]) * HOUR + DAY0
+    end = np.array([1.5, 4.0, 3.0, 25.0, 23.5, 1.0]) * HOUR + DAY0
+    static = np.full(6, 0.3)
+
+    factors = effective_factors(series, regions, start, end, static)
+
+    assert factors[0] == pytest.approx(0.15)  # half of hour 0, half of hour 1
+    assert factors[1] == pytest.approx((0.1 + 0.2 + 0.3 + 0.4) / 4)  # hour 2 is a gap
+    assert factors[2] == pytest.approx(0.3)
+    assert factors[3] == pytest.approx((0.5 + 0.3) / 2)  # runs past the last stored day
+    assert factors[4] == factors[5] == 0.3  # zero-length run, region without a series
+
+
+def test_missing_days_inside_the_range_are_gaps():
+    series = series_from_rows(
+        [("r", date(2026, 1, 1), [100.0] * 24), ("r", date(2026, 1, 3), [300.0] * 24)]
+    )
+    start = np.array([DAY0])
+    end = np.array([DAY0 + 72 * HOUR])
+    assert effective_factors(series, ["r"], start, end, np.array([0.2]))[0] == pytest.approx(0.2)
+
+
+def test_regions_use_the_series_of_their_longest_token_prefix():
+    series = series_from_rows(
+        [("us-east-1", date(2026, 1, 1), [100.0] * 24), ("us", date(2026, 1, 1), [500.0] * 24)]
+    )
+    regions = ["us-east-1a", "US-EAST-1", "us-east-10", "us-west-2", "eu-west-1"]
+    start = np.full(5, DAY0)
+    end = start + HOUR
+
+    factors = effective_factors(series, regions, start, end, np.full(5, 0.3))
+
+    assert factors.tolist() == pytest.approx([0.1, 0.1, 0.5, 0.5, 0.3])
+
+
+def test_load_series_queries_every_token_prefix():
+    class Session:
+        def execute(self, stmt):
+            self.params = stmt.compile(dialect=postgresql.dialect()).params
+            return self
+
+        def all(self):
+            return []
+
+    db = Session()
+    load_series(db, ["us-east-1a", None], DAY0, DAY0 + HOUR)
+
+    assert sorted(db.params["region_1"]) == ["us", "us-east", "us-east-1", "us-east-1a"]
@@ -0,0 +1,172 @@
+from datetime import datetime
+from types import SimpleNamespace
+from uuid import uuid4
+
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+from sqlalchemy.dialects import postgresql
+
+from backend.app.api import job_runs
+from backend.app.auth.api_keys import ApiKeyIdentity
+from backend.app.core.database import get_db
+from backend.app.schemas.job_run import JobRunCreate
+from backend.app.services import job_service
+
+RUN = {"run_name": "r", "job_type": "training", "region": "us-east-1", "start_time": "2026-01-01T00:00:00"}
+
+
+class FakeRedis:
+    def __init__(self):
+        self.data = {}
+        self.results = []
+
+    def get(self, key):
+        return self.data.get(key)
+
+    def set(self, key, value, ex=None):
+        self.data[key] = value
+
+    def delete(self, *keys):
+        for key in keys:
+            self.data.pop(key, None)
+        self.results.append(len(keys))
+
+    def incr(self, key):
+        self.data[key] = str(int(self.data.get(key, 0)) + 1)
+        self.results.append(int(self.data[key]))
+
+    def expire(self, key, seconds):
+        self.results.append(True)
+
+    def pipeline(self, transaction=True):
+        return self
+
+    def execute(self):
+        results, self.results = self.results, []
+        return results
+
+    def register_script(self, script):
+        def store_if_generation(keys, args):
+            if self.data.get(keys[0]) != str(args[0]):
+                return 0
+            self.data[keys[1]] = args[1]
+            return 1
+
+        return store_if_generation
+
+
+class UpsertSession:
+    """Answers the job_runs INSERT ... RETURNING with the row it was given."""
+
+    def execute(self, stmt):
+        compiled = stmt.compile(dialect=postgresql.dialect())
+        params = compiled.params
+        if not str(compiled).startswith("INSERT INTO job_runs "):
+            return SimpleNamespace(all=lambda: [])
+        row = SimpleNamespace(
+            id=params["id_m0"],
+            project_id=params["project_id_m0"],
+            organization_id=params["organization_id_m0"],
+            dedupe_key=params["dedupe_key_m0"],
+            inserted=False,
+        )
+        return SimpleNamespace(all=lambda: [row])
+
+    def commit(self):
+        pass
+
+    def rollback(self):
+        pass
+
+
+def _client(monkeypatch, identity, writes, audits, concurrent_write=None):
+    def fake_upsert(db, payload):
+        writes.append(payload)
+        if concurrent_write is not None:
+            concurrent_write()
+        # as _write_job_runs does after its commit
+        job_service.idempotency_cache.invalidate([(payload.project_id, payload.dedupe_key)])
+        now = datetime(2026, 1, 1)
+        run = SimpleNamespace(
+            id=uuid4(),
+            created_at=now,
+            updated_at=now,
+            status="completed",
+            run_metadata=None,
+            **payload.model_dump(exclude={"hardware", "energy", "costs", "metadata", "status"}),
+        )
+        return run, len(writes) == 1
+
+    monkeypatch.setattr(job_runs.idempotency_cache, "_redis", FakeRedis())
+    monkeypatch.setattr(job_runs.idempotency_cache, "_store", None)
+    monkeypatch.setattr(job_runs, "upsert_job_run", fake_upsert)
+    monkeypatch.setattr(job_runs.rate_limiter, "check", lambda **kw: SimpleNamespace(limit=10, remaining=9))
+    monkeypatch.setattr(job_runs, "audit_log", lambda event, db: audits.append(event))
+    monkeypatch.setattr(job_runs.settings, "sync_compute", False)
+
+    app = FastAPI()
+    app.include_router(job_runs.router, prefix="/job-runs")
+    app.dependency_overrides[job_runs.get_api_key] = lambda: identity
+    app.dependency_overrides[get_db] = lambda: None
+    return TestClient(app)
+
+
+def test_replayed_payload_is_served_from_cache_and_changed_payload_is_written(monkeypatch):
+    identity = ApiKeyIdentity(id=uuid4(), project_id=uuid4(), organization_id=uuid4())
+    writes, audits = [], []
+    client = _client(monkeypatch, identity, writes, audits)
+
+    first = client.post("/job-runs/", json={**RUN, "dedupe_key": "d1"})
+    replay = client.post("/job-runs/", json={**RUN, "dedupe_key": "d1"})
+    changed = client.post("/job-runs/", json={**RUN, "dedupe_key": "d1", "end_time": "2026-01-01T01:00:00"})
+
+    assert first.status_code == 201
+    assert replay.status_code == 200
+    assert replay.headers["Idempotent-Replayed"] == "true"
+    assert replay.json() == first.json()
+    assert changed.status_code == 200
+    assert "Idempotent-Replayed" not in changed.headers
+    assert len(writes) == 2
+    assert [a.metadata.get("replayed") for a in audits] == [None, True, None]
+
+
+def test_write_through_another_path_invalidates_the_cached_response(monkeypatch):
+    identity = ApiKeyIdentity(id=uuid4(), project_id=uuid4(), organization_id=uuid4())
+    writes, audits = [], []
+    client = _client(monkeypatch, identity, writes, audits)
+    run_a = {**RUN, "dedupe_key": "d1"}
+
+    assert client.post("/job-runs/", json=run_a).status_code == 201
+    # The same key rewritten by a batch, the NDJSON stream or the async consumer
+    run_b = JobRunCreate(
+        **{**RUN, "dedupe_key": "d1", "end_time": "2026-01-01T01:00:00"},
+        project_id=identity.project_id,
+        organization_id=identity.organization_id,
+    )
+    assert job_service.bulk_upsert_job_runs(UpsertSession(), [run_b])[0].status == "updated"
+    retry = client.post("/job-runs/", json=run_a)
+
+    assert "Idempotent-Replayed" not in retry.headers
+    assert len(writes) == 2
+
+
+def test_response_of_a_write_overlapped_by_another_is_not_cached(monkeypatch):
+    identity = ApiKeyIdentity(id=uuid4(), project_id=uuid4(), organization_id=uuid4())
+    writes, audits = [], []
+    run_b = JobRunCreate(
+        **{**RUN, "dedupe_key": "d1", "end_time": "2026-01-01T01:00:00"},
+        project_id=identity.project_id,
+        organization_id=identity.organization_id,
+    )
+    # B commits and invalidates after A's commit but before A stores its response
+    overlapping = [lambda: job_service.bulk_upsert_job_runs(UpsertSession(), [run_b])]
+    client = _client(monkeypatch, identity, writes, audits, lambda: overlapping and overlapping.pop()())
+    run_a = {**RUN, "dedupe_key": "d1"}
+
+    assert client.post("/job-runs/", json=run_a).status_code == 201
+    retry = client.post("/job-runs/", json=run_a)
+
+    assert "Idempotent-Replayed" not in retry.headers
+    assert len(writes) == 2
+    # the retry's write was not overlapped, so its response is cached again
+    assert client.post("/job-runs/", json=run_a).headers["Idempotent-Replayed"] == "true"
@@ -0,0 +1,131 @@
+import gzip
+import json
+from datetime import datetime, timezone
+from types import SimpleNamespace
+from uuid import uuid4
+
+import msgpack
+import pytest
+import zstandard
+from fastapi import FastAPI, HTTPException
+from fastapi.testclient import TestClient
+
+from backend.app.api import job_runs
+from backend.app.auth.api_keys import ApiKeyIdentity
+from backend.app.core.database import get_db
+from backend.app.services.job_service import BulkUpsertResult
+from backend.app.utils.compression import StreamDecompressor, decompress_body
+
+
+def _client(monkeypatch, written):
+    identity = ApiKeyIdentity(id=uuid4(), project_id=uuid4(), organization_id=uuid4())
+
+    def fake_bulk(db, items):
+        written.extend(item for item in items if item is not None)
+        return [
+            BulkUpsertResult(index=i, status="created", id=uuid4(), dedupe_key=item.dedupe_key)
+            for i, item in enumerate(items)
+            if item is not None
+        ]
+
+    monkeypatch.setattr(job_runs, "bulk_upsert_job_runs", fake_bulk)
+    monkeypatch.setattr(job_runs.rate_limiter, "check", lambda **kw: SimpleNamespace(limit=1, remaining=1))
+    monkeypatch.setattr(job_runs, "audit_log", lambda event, db: None)
+    monkeypatch.setattr(job_runs.settings, "sync_compute", False)
+
+    app = FastAPI()
+    app.include_router(job_runs.router, prefix="/job-runs")
+    app.dependency_overrides[job_runs.get_api_key] = lambda: identity
+    app.dependency_overrides[get_db] = lambda: None
+    return TestClient(app)
+
+
+def _run(i):
+    return {
+        "run_name": f"r{i}",
+        "job_type": "training",
+        "region": "us-east-1",
+        "start_time": datetime(2026, 1, 1, tzinfo=timezone.utc),
+        "tags": {"team": "ml", "i": str(i)},
+    }
+
+
+def test_batch_accepts_zstd_msgpack(monkeypatch):
+    written = []
+    client = _client(monkeypatch, written)
+    body = zstandard.ZstdCompressor().compress(msgpack.packb({"runs": [_run(0), _run(1)]}, datetime=True))
+
+    resp = client.post(
+        "/job-runs/batch",
+        content=body,
+        headers={"Content-Type": "application/msgpack", "Content-Encoding": "zstd"},
+    )
+
+    assert resp.status_code == 200, resp.text
+    assert resp.json()["created"] == 2
+    assert [w.run_name for w in written] == ["r0", "r1"]
+    assert written[0].start_time == datetime(2026, 1, 1, tzinfo=timezone.utc)
+
+
+def test_batch_accepts_gzip_json(monkeypatch):
+    written = []
+    client = _client(monkeypatch, written)
+    runs = [{**_run(i), "start_time": "2026-01-01T00:00:00Z"} for i in range(3)]
+    body = gzip.compress(json.dumps({"runs": runs}).encode("utf-8"))
+
+    resp = client.post(
+        "/job-runs/batch",
+        content=body,
+        headers={"Content-Type": "application/json", "Content-Encoding": "gzip"},
+    )
+
+    assert resp.status_code == 200, resp.text
+    assert resp.json()["created"] == 3
+
+
+def test_batch_rejects_compression_bomb_and_unknown_encoding(monkeypatch):
+    client = _client(monkeypatch, [])
+    bomb = gzip.compress(b'{"runs": [' + b" " * (8 * 1024 * 1024) + b"]}")
+
+    resp = client.post(
+        "/job-runs/batch", content=bomb, headers={"Content-Type": "application/json", "Content-Encoding": "gzip"}
+    )
+    assert resp.status_code == 413
+
+    resp = client.post(
+        "/job-runs/batch", content=b"{}", headers={"Content-Type": "application/json", "Content-Encoding": "br"}
+    )
+    assert resp.status_code == 415
+
+
+def test_stream_accepts_msgpack_sequence(monkeypatch):
+    written = []
+    client = _client(monkeypatch, written)
+    body = b"".join(msgpack.packb(_run(i), datetime=True) for i in range(3)) + msgpack.packb({"run_name": "x"})
+
+    resp = client.post("/job-runs/stream", content=gzip.compress(body), headers={
+        "Content-Type": "application/msgpack",
+        "Content-Encoding": "gzip",
+    })
+
+    assert resp.status_code == 200, resp.text
+    out = [json.loads(line) for line in resp.text.splitlines()]
+    assert [r["status"] for r in out[:-1]] == ["created", "created", "created", "error"]
+    assert out[-1]["summary"]["lines"] == 4
+
+
+def test_decompressor_limits_total_size_and_ratio():
+    data = zstandard.ZstdCompressor().compress(b"\0" * (4 * 1024 * 1024))
+    assert len(decompress_body(data, "zstd")) == 4 * 1024 * 1024
+    with pytest.raises(HTTPException) as exc:
+        decompress_body(data, "zstd", max_ratio=100)
+    assert exc.value.status_code == 413
+    with pytest.raises(HTTPException) as exc:
+        decompress_body(gzip.compress(b"x" * 2048), "gzip", max_bytes=1024)
+    assert exc.value.status_code == 413
+
+    decoder = StreamDecompressor("gzip")
+    list(decoder.feed(gzip.compress(b"payload")[:-4]))
+    with pytest.raises(HTTPException) as exc:
+        list(decoder.finish())
+    assert exc.value.status_code == 400
@@ -0,0 +1,118 @@
+import json
+from types import SimpleNamespace
+from uuid import uuid4
+
+from fastapi import FastAPI, HTTPException
+from fastapi.testclient import TestClient
+
+from backend.app.api import job_runs
+from backend.app.auth.api_keys import ApiKeyIdentity
+from backend.app.core.database import get_db
+from backend.app.schemas.job_run import JobRunCreate
+from backend.app.services import ingest_queue as iq
+from backend.app.services.job_service import BulkUpsertResult
+
+RUN = {"run_name": "r", "job_type": "training", "region": "us-east-1", "start_time": "2026-01-01T00:00:00"}
+
+
+def test_prefer_respond_async_queues_and_returns_202(monkeypatch):
+    identity = ApiKeyIdentity(id=uuid4(), project_id=uuid4(), organization_id=uuid4())
+    queued = []
+
+    def fake_enqueue(api_key, payload, request_id=None):
+        queued.append(payload)
+        return "1700000000000-0"
+
+    def no_sync_write(*args, **kwargs):
+        raise AssertionError("async ingest must not write synchronously")
+
+    monkeypatch.setattr(job_runs.ingest_queue, "enqueue", fake_enqueue)
+    monkeypatch.setattr(job_runs, "upsert_job_run", no_sync_write)
+    monkeypatch.setattr(job_runs.rate_limiter, "check", lambda **kw: SimpleNamespace(limit=10, remaining=9))
+
+    app = FastAPI()
+    app.include_router(job_runs.router, prefix="/job-runs")
+    app.dependency_overrides[job_runs.get_api_key] = lambda: identity
+    app.dependency_overrides[get_db] = lambda: None
+
+    resp = TestClient(app).post("/job-runs/", json={**RUN, "dedupe_key": "d1"}, headers={"Prefer": "respond-async"})
+
+    assert resp.status_code == 202
+    assert resp.json() == {"status": "queued", "dedupe_key": "d1", "queue_id": "1700000000000-0"}
+    assert queued[0].project_id == identity.project_id
+
+
+def test_apply_messages_upserts_batch_and_dead_letters_rejects(monkeypatch):
+    org_id, key_id = uuid4(), uuid4()
+    good = JobRunCreate(**RUN, project_id=uuid4(), organization_id=org_id, dedupe_key="a")
+    messages = [
+        ("1-0", {"api_key_id": str(key_id), "organization_id": str(org_id), "payload": good.model_dump_json()}),
+        ("2-0", {"api_key_id": str(key_id), "organization_id": str(org_id), "payload": json.dumps({"run_name": 1})}),
+    ]
+    dead, audits, batches = [], [], []
+
+    def fake_bulk(db, items):
+        batches.append(items)
+        return [BulkUpsertResult(index=0, status="created", id=uuid4(), dedupe_key="a")]
+
+    monkeypatch.setattr(iq, "bulk_upsert_job_runs", fake_bulk)
+    monkeypatch.setattr(iq, "audit_log", lambda event, db: audits.append(event))
+    monkeypatch.setattr(iq.settings, "sync_compute", False)
+    queue = SimpleNamespace(dead_letter=lambda fields, detail: dead.append(detail))
+
+    acked = iq.apply_messages(None, queue, messages)
+
+    assert acked == ["1-0", "2-0"]
+    assert len(batches) == 1 and batches[0][1] is None
+    assert len(dead) == 1 and dead[0].startswith("Invalid payload")
+    assert audits[0].action == "job_run.ingest_async"
+    assert audits[0].metadata == {"created": 1, "error": 1}
+
+
+def test_rejected_batch_is_bisected_and_only_the_bad_run_dead_lettered(monkeypatch):
+    org_id = str(uuid4())
+    payloads = [JobRunCreate(**RUN, project_id=uuid4(), dedupe_key=key) for key in ["a", "b", "bad", "c", "d"]]
+    messages = [
+        (f"{i}-0", {"organization_id": org_id, "payload": payload.model_dump_json()})
+        for i, payload in enumerate(payloads)
+    ]
+    applied, dead, acked = [], [], []
+
+    def fake_bulk(db, items):
+        if any(item.dedupe_key == "bad" for item in items):
+            raise HTTPException(status_code=422, detail="Invalid foreign key")
+        applied.extend(item.dedupe_key for item in items)
+        return [
+            BulkUpsertResult(index=i, status="created", id=uuid4(), dedupe_key=item.dedupe_key)
+            for i, item in enumerate(items)
+        ]
+
+    monkeypatch.setattr(iq, "bulk_upsert_job_runs", fake_bulk)
+    monkeypatch.setattr(iq, "audit_log", lambda event, db: None)
+    monkeypatch.setattr(iq.settings, "sync_compute", False)
+    queue = SimpleNamespace(
+        read=lambda consumer, count, block_ms: messages,
+        ack=acked.extend,
+        dead_letter=lambda fields, detail: dead.append((fields, detail)),
+    )
+
+    assert iq.drain_once(None, queue, "c1") == 5
+    assert sorted(applied) == ["a", "b", "c", "d"]
+    assert [json.loads(f["payload"])["dedupe_key"] for f, _ in dead] == ["bad"]
+    assert sorted(acked) == sorted(entry_id for entry_id, _ in messages)
+
+
+def test_server_errors_leave_the_batch_pending(monkeypatch):
+    messages = [("1-0", {"payload": JobRunCreate(**RUN, project_id=uuid4(), dedupe_key="a").model_dump_json()})]
+
+    def down(db, items):
+        raise HTTPException(status_code=500, detail="Job run bulk upsert failed: connection refused")
+
+    monkeypatch.setattr(iq, "bulk_upsert_job_runs", down)
+    acked, dead = [], []
+    queue = SimpleNamespace(
+        read=lambda consumer, count, block_ms: messages, ack=acked.extend, dead_letter=lambda f, d: dead.append(d)
+    )
+
+    assert iq.drain_once(None, queue, "c1") == 0
+    assert acked == [] and dead == []
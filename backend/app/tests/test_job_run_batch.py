@@ -0,0 +1,134 @@
+from datetime import datetime, timedelta
+from uuid import uuid4
+
+from sqlalchemy.dialects import postgresql
+
+from backend.app.models.job_run import JobRun
+from backend.app.schemas.job_run import JobRunCreate
+from backend.app.services.job_service import bulk_upsert_job_runs, upsert_job_run
+
+
+class Row:
+    def __init__(self, **values):
+        self.__dict__.update(values)
+        self._mapping = values
+
+
+class RecordingSession:
+    """Captures compiled statements and echoes RETURNING rows for job_runs.
+
+    With ``unchanged=True`` the conflict WHERE is treated as false: the
+    INSERT returns nothing and the follow-up SELECT returns the stored rows.
+    """
+
+    def __init__(self, unchanged=False):
+        self.unchanged = unchanged
+        self.statements = []
+        self.committed = False
+        self._stored = []
+
+    def execute(self, stmt):
+        compiled = stmt.compile(dialect=postgresql.dialect())
+        sql = str(compiled)
+        self.statements.append(sql)
+        params = compiled.params
+        rows = []
+        if sql.startswith("INSERT INTO job_runs "):
+            i = 0
+            while f"dedupe_key_m{i}" in params:
+                values = {c.key: params.get(f"{c.key}_m{i}") for c in JobRun.__table__.c}
+                rows.append(Row(**values, inserted=True, energy_total_kwh=None, energy_emissions_kg=None))
+                i += 1
+            self._stored = rows
+            if self.unchanged:
+                rows = []
+        elif sql.startswith("SELECT"):
+            rows = self._stored
+
+        class _Result:
+            def all(self_inner):
+                return rows
+
+        return _Result()
+
+    def commit(self):
+        self.committed = True
+
+    def rollback(self):
+        pass
+
+
+def _payload(project_id, org_id, **extra):
+    data = dict(
+        run_name="r",
+        job_type="training",
+        region="us-east-1",
+        start_time=datetime(2026, 1, 1),
+        project_id=project_id,
+        organization_id=org_id,
+    )
+    data.update(extra)
+    return JobRunCreate(**data)
+
+
+def test_bulk_upsert_uses_set_based_statements():
+    project_id, org_id = uuid4(), uuid4()
+    payloads = [
+        _payload(project_id, org_id, dedupe_key="a", energy={"total_kwh": 1.0}),
+        _payload(project_id, org_id, dedupe_key="b", hardware={"gpu_model": "A100"}),
+        _payload(project_id, org_id, dedupe_key="a", costs={"amount_usd": 2}),
+        None,
+    ]
+    db = RecordingSession()
+    results = bulk_upsert_job_runs(db, payloads)
+
+    assert [r.index for r in results] == [0, 1, 2]
+    assert results[0].id == results[2].id  # duplicate dedupe key collapses
+    assert {r.status for r in results} == {"created"}
+    assert db.committed
+    # job_runs + hardware + energy + costs, one statement each
+    assert len(db.statements) == 4
+    assert "ON CONFLICT ON CONSTRAINT ux_job_runs_project_dedupe" in db.statements[0]
+    assert all("ON CONFLICT (job_run_id)" in s for s in db.statements[1:])
+
+
+def test_bulk_upsert_reports_item_errors():
+    project_id, org_id = uuid4(), uuid4()
+    start = datetime(2026, 1, 1)
+    bad = _payload(project_id, org_id, start_time=start, end_time=start - timedelta(hours=1))
+    db = RecordingSession()
+    results = bulk_upsert_job_runs(db, [bad])
+
+    assert results[0].status == "error"
+    assert "end_time" in results[0].detail
+    assert db.statements == []
+
+
+def test_upsert_job_run_single_statement_batch_without_reload():
+    project_id, org_id = uuid4(), uuid4()
+    db = RecordingSession()
+    job_run, created = upsert_job_run(db, _payload(project_id, org_id, dedupe_key="a", energy={"total_kwh": 2.5}))
+
+    assert created
+    assert job_run.dedupe_key == "a"
+    assert job_run.energy_kwh == 2.5
+    assert db.committed
+    # job_runs + energy; no pre-select, no reload
+    assert len(db.statements) == 2
+    assert "job_runs.run_name IS DISTINCT FROM excluded.run_name" in db.statements[0]
+    assert "RETURNING" in db.statements[0]
+
+
+def test_upsert_job_run_skips_unchanged_rows():
+    project_id, org_id = uuid4(), uuid4()
+    db = RecordingSession(unchanged=True)
+    job_run, created = upsert_job_run(db, _payload(project_id, org_id, dedupe_key="a"))
+
+    assert not created
+    assert job_run.dedupe_key == "a"
+    assert db.statements[1].startswith("SELECT")
+    assert len(db.statements) == 2
+
+    db = RecordingSession(unchanged=True)
+    results = bulk_upsert_job_runs(db, [_payload(project_id, org_id, dedupe_key="a")])
+    assert results[0].status == "unchanged"
@@ -0,0 +1,107 @@
+import csv
+import io
+import json
+from datetime import datetime
+from types import SimpleNamespace
+from uuid import uuid4
+
+import pyarrow.parquet as pq
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+from sqlalchemy.dialects import postgresql
+
+from backend.app.api import job_runs
+from backend.app.core.database import get_db
+from backend.app.services import export_service
+from backend.app.services.export_service import COLUMN_NAMES, build_export_statement
+
+
+def _row(i):
+    values = dict.fromkeys(COLUMN_NAMES)
+    values.update(
+        id=uuid4(),
+        run_name=f"run-{i}",
+        start_time=datetime(2026, 1, 1, 0, i),
+        tags={"team": "nlp"},
+        total_kwh=1.5 * i,
+        cost_usd=0.25,
+    )
+    return tuple(values.values())
+
+
+class StreamingSession:
+    """Serves rows in partitions and fails if read after get_db closed it."""
+
+    def __init__(self, rows):
+        self.rows = rows
+        self.closed = False
+        self.options = None
+
+    def execute(self, stmt):
+        self.options = stmt.get_execution_options()
+        session = self
+
+        class Result:
+            def partitions(self, size):
+                for offset in range(0, len(session.rows), size):
+                    assert not session.closed
+                    yield session.rows[offset : offset + size]
+
+            def close(self):
+                pass
+
+        return Result()
+
+
+def _client(monkeypatch, session):
+    monkeypatch.setattr(job_runs, "audit_log", lambda event, db: None)
+    monkeypatch.setattr(export_service.settings, "export_batch_rows", 2)
+
+    def _db():
+        session.closed = False
+        try:
+            yield session
+        finally:
+            session.closed = True
+
+    app = FastAPI()
+    app.include_router(job_runs.router, prefix="/job-runs")
+    app.dependency_overrides[get_db] = _db
+    app.dependency_overrides[job_runs.get_current_user] = lambda: SimpleNamespace(id=uuid4(), organization_id=uuid4())
+    app.dependency_overrides[job_runs.get_request_context] = lambda: SimpleNamespace(request_id="r")
+    return TestClient(app)
+
+
+def test_export_streams_csv_ndjson_and_parquet_through_a_server_side_cursor(monkeypatch):
+    rows = [_row(i) for i in range(5)]
+    session = StreamingSession(rows)
+    client = _client(monkeypatch, session)
+
+    response = client.get("/job-runs/export", params={"format": "csv"})
+    assert response.status_code == 200
+    assert session.options == {"stream_results": True, "yield_per": 2}
+    records = list(csv.DictReader(io.StringIO(response.text)))
+    assert [r["run_name"] for r in records] == [f"run-{i}" for i in range(5)]
+    assert records[1]["tags"] == '{"team":"nlp"}' and records[1]["end_time"] == ""
+
+    response = client.get("/job-runs/export", params={"format": "ndjson"})
+    lines = [json.loads(line) for line in response.text.splitlines()]
+    assert lines[3]["total_kwh"] == 4.5 and lines[3]["start_time"] == "2026-01-01T00:03:00"
+
+    response = client.get("/job-runs/export", params={"format": "parquet"})
+    parquet = pq.ParquetFile(io.BytesIO(response.content))
+    assert parquet.metadata.num_row_groups == 3
+    assert parquet.read().column("run_name").to_pylist() == [f"run-{i}" for i in range(5)]
+
+    assert client.get("/job-runs/export", params={"tag": "team"}).status_code == 400
+
+
+def test_export_statement_applies_filters():
+    sql = str(
+        build_export_statement(uuid4(), project_id=uuid4(), start=datetime(2025, 4, 1), tags={"team": "nlp"})
+        .compile(dialect=postgresql.dialect())
+    )
+    assert "LEFT OUTER JOIN job_run_energy" in sql
+    assert "job_runs.project_id =" in sql and "job_runs.start_time >=" in sql
+    assert "CAST(job_runs.tags AS JSONB) @>" in sql
+    assert sql.endswith("ORDER BY job_runs.created_at, job_runs.id")
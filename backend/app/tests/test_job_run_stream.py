@@ -0,0 +1,76 @@
+import gzip
+import json
+from types import SimpleNamespace
+from uuid import uuid4
+
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+from backend.app.api import job_runs
+from backend.app.auth.api_keys import ApiKeyIdentity
+from backend.app.core.database import get_db
+from backend.app.services.job_service import BulkUpsertResult
+from backend.app.utils.ndjson import LineSplitter, LineTooLong
+
+
+def _client(monkeypatch, chunks):
+    identity = ApiKeyIdentity(id=uuid4(), project_id=uuid4(), organization_id=uuid4())
+
+    def fake_bulk(db, items):
+        chunks.append(len(items))
+        return [
+            BulkUpsertResult(index=i, status="created", id=uuid4(), dedupe_key=item.dedupe_key)
+            for i, item in enumerate(items)
+            if item is not None
+        ]
+
+    monkeypatch.setattr(job_runs, "bulk_upsert_job_runs", fake_bulk)
+    monkeypatch.setattr(job_runs.rate_limiter, "check", lambda **kw: SimpleNamespace(limit=1, remaining=1))
+    monkeypatch.setattr(job_runs, "audit_log", lambda event, db: None)
+    monkeypatch.setattr(job_runs.settings, "sync_compute", False)
+    monkeypatch.setattr(job_runs.settings, "ingest_stream_chunk_rows", 2)
+
+    app = FastAPI()
+    app.include_router(job_runs.router, prefix="/job-runs")
+    app.dependency_overrides[job_runs.get_api_key] = lambda: identity
+    app.dependency_overrides[get_db] = lambda: None
+    return TestClient(app)
+
+
+def _run(i):
+    return {"run_name": f"r{i}", "job_type": "training", "region": "us-east-1", "start_time": "2026-01-01T00:00:00"}
+
+
+def test_stream_ingest_writes_in_chunks_and_reports_each_line(monkeypatch):
+    chunks = []
+    client = _client(monkeypatch, chunks)
+    lines = [json.dumps(_run(0)), "{not json", json.dumps(_run(2)), "", json.dumps(_run(3)), json.dumps({"run_name": "x"})]
+    body = gzip.compress("\n".join(lines).encode("utf-8"))
+
+    resp = client.post(
+        "/job-runs/stream",
+        content=body,
+        headers={"Content-Type": "application/x-ndjson", "Content-Encoding": "gzip"},
+    )
+
+    assert resp.status_code == 200
+    out = [json.loads(line) for line in resp.text.splitlines()]
+    assert [r["status"] for r in out[:-1]] == ["created", "error", "created", "created", "error"]
+    assert [r["index"] for r in out[:-1]] == [0, 1, 2, 3, 4]
+    assert out[-1]["summary"]["created"] == 3
+    assert out[-1]["summary"]["errors"] == 2
+    assert chunks == [2, 2, 1]
+
+
+def test_stream_ingest_rejects_other_content_types(monkeypatch):
+    client = _client(monkeypatch, [])
+    resp = client.post("/job-runs/stream", content=b"[]", headers={"Content-Type": "application/json"})
+    assert resp.status_code == 415
+
+
+def test_line_splitter_bounds_line_length():
+    splitter = LineSplitter(max_line_bytes=8)
+    got = list(splitter.feed(b"short\n" + b"x" * 20)) + list(splitter.feed(b"yy\nok"))
+    assert got[0] == b"short"
+    assert isinstance(got[1], LineTooLong)
+    assert splitter.finish() == b"ok"
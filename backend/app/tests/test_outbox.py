@@ -0,0 +1,65 @@
+from types import SimpleNamespace
+from uuid import uuid4
+
+from sqlalchemy.dialects import postgresql
+
+from backend.app.services import outbox
+
+
+class OutboxSession:
+    def __init__(self, rows):
+        self.rows = rows
+        self.statements = []
+        self.commits = self.rollbacks = 0
+
+    def execute(self, statement):
+        self.statements.append(statement)
+        return SimpleNamespace(all=lambda: self.rows)
+
+    def commit(self):
+        self.commits += 1
+
+    def rollback(self):
+        self.rollbacks += 1
+
+
+class RecordingQueue:
+    def __init__(self, available=True):
+        self.available = available
+        self.scheduled = []
+
+    def schedule(self, job_run_ids, organization_id=None):
+        self.scheduled.append((organization_id, job_run_ids))
+        return self.available
+
+
+def _rows():
+    org_a, org_b = uuid4(), uuid4()
+    return [SimpleNamespace(id=i, organization_id=org, job_run_id=uuid4()) for i, org in enumerate([org_a, org_b, org_a])]
+
+
+def test_claim_skips_rows_locked_by_other_relays():
+    sql = str(outbox.claim_statement(500).compile(dialect=postgresql.dialect()))
+    assert sql.endswith("ORDER BY outbox.id \n LIMIT %(param_1)s FOR UPDATE SKIP LOCKED")
+
+
+def test_relay_hands_over_per_organization_then_deletes():
+    rows = _rows()
+    db, queue = OutboxSession(rows), RecordingQueue()
+
+    assert outbox.relay_once(db, queue, batch_size=10) == 3
+    assert queue.scheduled == [
+        (rows[0].organization_id, [rows[0].job_run_id, rows[2].job_run_id]),
+        (rows[1].organization_id, [rows[1].job_run_id]),
+    ]
+    delete = str(db.statements[-1].compile(dialect=postgresql.dialect()))
+    assert delete.startswith("DELETE FROM outbox WHERE outbox.id IN")
+    assert db.commits == 1
+
+
+def test_rows_stay_when_the_queue_is_down():
+    db = OutboxSession(_rows())
+
+    assert outbox.relay_once(db, RecordingQueue(available=False), batch_size=10) == 0
+    assert db.commits == 0 and db.rollbacks == 1
+    assert len(db.statements) == 1  # nothing deleted
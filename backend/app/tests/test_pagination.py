@@ -0,0 +1,59 @@
+from datetime import datetime, timedelta
+from types import SimpleNamespace
+from uuid import uuid4
+
+import pytest
+from fastapi import HTTPException
+from sqlalchemy.dialects import postgresql
+
+from backend.app.models.job_run import JobRun
+from backend.app.utils.pagination import decode_cursor, encode_cursor, paginate
+
+
+class RecordingQuery:
+    """Serves rows newest first and keeps the clauses paginate() adds."""
+
+    def __init__(self, rows):
+        self.rows = rows
+        self.filters = []
+        self.limit_value = None
+
+    def filter(self, clause):
+        self.filters.append(clause)
+        return self
+
+    def order_by(self, *clauses):
+        return self
+
+    def limit(self, value):
+        self.limit_value = value
+        return self
+
+    def all(self):
+        return self.rows[: self.limit_value]
+
+
+def test_cursor_round_trips_and_rejects_garbage():
+    moment, row_id = datetime(2026, 10, 17, 12, 30, 5, 123456), uuid4()
+    assert decode_cursor(encode_cursor(moment, row_id)) == (moment, row_id)
+    with pytest.raises(HTTPException) as exc:
+        decode_cursor("not-a-cursor")
+    assert exc.value.status_code == 400
+
+
+def test_paginate_returns_next_cursor_only_when_more_rows_exist():
+    start = datetime(2026, 10, 17)
+    rows = [SimpleNamespace(created_at=start - timedelta(minutes=i), id=uuid4()) for i in range(5)]
+
+    query = RecordingQuery(rows)
+    page, next_cursor = paginate(query, JobRun.created_at, JobRun.id, limit=2)
+    assert page == rows[:2]
+    assert query.limit_value == 3
+    assert decode_cursor(next_cursor) == (rows[1].created_at, rows[1].id)
+
+    query = RecordingQuery(rows[2:])
+    page, next_cursor = paginate(query, JobRun.created_at, JobRun.id, cursor=next_cursor, limit=3)
+    assert page == rows[2:]
+    assert next_cursor is None
+    sql = str(query.filters[0].compile(dialect=postgresql.dialect()))
+    assert sql.startswith("(job_runs.created_at, job_runs.id) < (")
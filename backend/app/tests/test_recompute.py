@@ -0,0 +1,76 @@
+from datetime import datetime
+from types import SimpleNamespace
+from uuid import uuid4
+
+from sqlalchemy.dialects import postgresql
+
+from backend.app.models.emission_recompute_job import EmissionRecomputeJob
+from backend.app.services import recompute_service as rs
+
+
+def test_chunk_statement_resumes_after_cursor_in_index_order():
+    org = uuid4()
+    job = EmissionRecomputeJob(
+        organization_id=org,
+        regions=["us-east-1"],
+        chunk_size=500,
+        cursor_organization_id=org,
+        cursor_created_at=datetime(2026, 1, 1),
+        cursor_id=uuid4(),
+    )
+    sql = str(rs.chunk_statement(job).compile(dialect=postgresql.dialect()))
+
+    assert "(job_runs.organization_id, job_runs.created_at, job_runs.id) > (" in sql
+    assert "lower(job_runs.region) LIKE" in sql
+    assert "ORDER BY job_runs.organization_id, job_runs.created_at, job_runs.id \n LIMIT" in sql
+
+
+class StatusSession:
+    """Session stand-in reporting the job's status as the API last set it."""
+
+    def __init__(self, statuses):
+        self.statuses = list(statuses)
+        self.commits = 0
+
+    def __call__(self):
+        return self
+
+    def execute(self, statement):
+        return SimpleNamespace(scalar=lambda: self.statuses.pop(0) if len(self.statuses) > 1 else self.statuses[0])
+
+    def commit(self):
+        self.commits += 1
+
+    def rollback(self):
+        pass
+
+    def close(self):
+        pass
+
+
+def _claimed(monkeypatch, chunks):
+    job = SimpleNamespace(id=uuid4(), status="running", max_rows_per_second=1000, scanned_runs=0,
+                          total_runs=sum(chunks), changed_runs=0, finished_at=None)
+    monkeypatch.setattr(rs, "claim", lambda db, job_id: job)
+    sizes = iter(chunks + [0])
+    monkeypatch.setattr(rs, "process_chunk", lambda db, j: next(sizes))
+    return job
+
+
+def test_run_job_throttles_and_commits_per_chunk(monkeypatch):
+    job = _claimed(monkeypatch, [500, 500, 500])
+    session, slept = StatusSession(["running"]), []
+
+    status = rs.run_job(job.id, session_factory=session, sleep=slept.append, clock=lambda: 0.0)
+
+    assert status == "completed" and job.finished_at is not None
+    assert slept == [0.5, 1.0, 1.5]
+    assert session.commits == 4
+
+
+def test_run_job_stops_when_cancelled(monkeypatch):
+    job = _claimed(monkeypatch, [500, 500, 500])
+    session = StatusSession(["running", "cancelling"])
+
+    assert rs.run_job(job.id, session_factory=session, sleep=lambda s: None, clock=lambda: 0.0) == "cancelled"
+    assert session.commits == 2
@@ -0,0 +1,54 @@
+import signal
+import sys
+import time
+
+import pytest
+
+from backend.app.workers.supervisor import Supervisor
+
+pytestmark = pytest.mark.skipif(sys.platform == "win32", reason="workers are forked")
+
+
+def _wait_until(predicate, timeout=5.0):
+    deadline = time.monotonic() + timeout
+    while not predicate():
+        assert time.monotonic() < deadline
+        time.sleep(0.02)
+
+
+def test_exited_workers_are_replaced_and_crash_loops_back_off():
+    supervisor = Supervisor({"ok": (2, lambda: None), "bad": (1, lambda: sys.exit(3))}, grace_seconds=1)
+    assert supervisor.reap() == 3
+    _wait_until(lambda: all(not slot.process.is_alive() for slot in supervisor.slots))
+
+    assert supervisor.reap() == 2  # recycled workers come back at once, the crashing one waits
+    bad = supervisor.slots[2]
+    assert bad.process is None and bad.backoff == 1.0
+    supervisor.stop()
+
+
+def test_stop_drains_in_flight_work_then_kills_stragglers(tmp_path):
+    def draining():
+        stop = []
+        signal.signal(signal.SIGTERM, lambda *_: stop.append(True))
+        (tmp_path / "ready").touch()
+        while not stop:
+            time.sleep(0.01)
+        time.sleep(0.2)  # finish the batch in hand
+        (tmp_path / "drained").touch()
+
+    def stuck():
+        signal.signal(signal.SIGTERM, signal.SIG_IGN)
+        (tmp_path / "stuck").touch()
+        time.sleep(30)
+
+    supervisor = Supervisor({"drain": (1, draining), "stuck": (1, stuck)}, grace_seconds=1)
+    supervisor.reap()
+    _wait_until(lambda: (tmp_path / "ready").exists() and (tmp_path / "stuck").exists())
+
+    supervisor.stop()
+
+    drain, stuck_slot = supervisor.slots
+    assert (tmp_path / "drained").exists() and drain.process.exitcode == 0
+    assert stuck_slot.process.exitcode == -signal.SIGKILL
+    assert supervisor.reap() == 0  # nothing restarts once stopping
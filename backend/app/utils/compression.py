@@ -0,0 +1,122 @@
+"""Incremental request-body decompression with zip-bomb limits."""
+from __future__ import annotations
+
+import zlib
+from typing import Iterator, Optional
+
+import zstandard
+from fastapi import HTTPException, status
+
+# Upper bound on bytes produced per gzip step, so one small compressed
+# chunk can never expand into one huge buffer.
+STEP_BYTES = 64 * 1024
+# zstd has no output cap per call, so input is fed in slices this small
+# (worst case a few MiB of output per slice) and limits are checked between them.
+ZSTD_SLICE_BYTES = 256
+# Ratio limits only apply past this much output, so tiny bodies never trip them
+RATIO_GRACE_BYTES = 1024 * 1024
+
+SUPPORTED_ENCODINGS = ("identity", "gzip", "zstd")
+
+
+class StreamDecompressor:
+    """Decode a ``Content-Encoding`` (identity, gzip or zstd) chunk by chunk.
+
+    ``max_bytes`` caps total decoded output and ``max_ratio`` caps decoded /
+    encoded size; exceeding either raises 413 before the output is buffered.
+    """
+
+    def __init__(self, encoding: Optional[str], max_bytes: Optional[int] = None, max_ratio: Optional[float] = None):
+        self.encoding = (encoding or "identity").strip().lower()
+        self.max_bytes = max_bytes
+        self.max_ratio = max_ratio
+        self.bytes_in = 0
+        self.bytes_out = 0
+        self._zlib = None
+        self._zstd = None
+        if self.encoding in ("", "identity"):
+            self.encoding = "identity"
+        elif self.encoding in ("gzip", "x-gzip"):
+            self._zlib = zlib.decompressobj(16 + zlib.MAX_WBITS)
+        elif self.encoding == "zstd":
+            self._zstd = zstandard.ZstdDecompressor().decompressobj()
+        else:
+            raise HTTPException(
+                status_code=status.HTTP_415_UNSUPPORTED_MEDIA_TYPE,
+                detail=f"Unsupported Content-Encoding: {encoding}",
+            )
+
+    def _emit(self, out: bytes) -> bytes:
+        self.bytes_out += len(out)
+        if self.max_bytes is not None and self.bytes_out > self.max_bytes:
+            raise HTTPException(
+                status_code=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE,
+                detail=f"Decoded body exceeds {self.max_bytes} bytes",
+            )
+        if (
+            self.max_ratio is not None
+            and self.encoding != "identity"
+            and self.bytes_out > RATIO_GRACE_BYTES
+            and self.bytes_out > self.max_ratio * max(self.bytes_in, 1)
+        ):
+            raise HTTPException(
+                status_code=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE,
+                detail=f"Compression ratio exceeds {self.max_ratio:g}",
+            )
+        return out
+
+    def feed(self, chunk: bytes) -> Iterator[bytes]:
+        if not chunk:
+            return
+        if self._zlib is not None:
+            yield from self._feed_gzip(chunk)
+        elif self._zstd is not None:
+            yield from self._feed_zstd(chunk)
+        else:
+            self.bytes_in += len(chunk)
+            yield self._emit(chunk)
+
+    def _feed_gzip(self, chunk: bytes) -> Iterator[bytes]:
+        self.bytes_in += len(chunk)
+        data = chunk
+        try:
+            while data:
+                out = self._zlib.decompress(data, STEP_BYTES)
+                if out:
+                    yield self._emit(out)
+                data = self._zlib.unconsumed_tail
+        except zlib.error as exc:
+            raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Malformed gzip body") from exc
+
+    def _feed_zstd(self, chunk: bytes) -> Iterator[bytes]:
+        try:
+            for start in range(0, len(chunk), ZSTD_SLICE_BYTES):
+                piece = chunk[start : start + ZSTD_SLICE_BYTES]
+                self.bytes_in += len(piece)
+                out = self._zstd.decompress(piece)
+                if out:
+                    yield self._emit(out)
+        except zstandard.ZstdError as exc:
+            raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Malformed zstd body") from exc
+
+    def finish(self) -> Iterator[bytes]:
+        if self._zlib is not None:
+            tail = self._zlib.flush()
+            if tail:
+                yield self._emit(tail)
+            if not self._zlib.eof:
+                raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Truncated gzip body")
+        elif self._zstd is not None and not self._zstd.eof:
+            raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Truncated zstd body")
+
+
+def decompress_body(
+    body: bytes, encoding: Optional[str], max_bytes: Optional[int] = None, max_ratio: Optional[float] = None
+) -> bytes:
+    """Decode a whole (already read) body under the same limits."""
+    decoder = StreamDecompressor(encoding, max_bytes=max_bytes, max_ratio=max_ratio)
+    if decoder.encoding == "identity":
+        return body
+    parts = list(decoder.feed(body))
+    parts.extend(decoder.finish())
+    return b"".join(parts)
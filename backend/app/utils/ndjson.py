@@ -0,0 +1,115 @@
+"""Incremental splitting of record streams (NDJSON lines, MessagePack objects)."""
+from __future__ import annotations
+
+from dataclasses import dataclass
+from typing import Any, Iterator, Optional
+
+import msgpack
+from fastapi import HTTPException, status
+
+
+class LineTooLong(Exception):
+    """Marker yielded in place of a line longer than the configured maximum."""
+
+
+class LineSplitter:
+    """Split a byte stream into lines without buffering more than ``max_line_bytes``.
+
+    Overlong lines are skipped up to the next newline and reported as a
+    ``LineTooLong`` instance so callers keep their line numbering.
+    """
+
+    def __init__(self, max_line_bytes: int):
+        self.max_line_bytes = max_line_bytes
+        self._buffer = bytearray()
+        self._skipping = False
+
+    def feed(self, data: bytes) -> Iterator[bytes | LineTooLong]:
+        start = 0
+        while True:
+            newline = data.find(b"\n", start)
+            if newline < 0:
+                break
+            piece = data[start:newline]
+            start = newline + 1
+            if self._skipping:
+                self._skipping = False
+                yield LineTooLong()
+                continue
+            if len(self._buffer) + len(piece) > self.max_line_bytes:
+                self._buffer.clear()
+                yield LineTooLong()
+                continue
+            self._buffer += piece
+            line = bytes(self._buffer)
+            self._buffer.clear()
+            yield line
+        rest = data[start:]
+        if self._skipping:
+            return
+        if len(self._buffer) + len(rest) > self.max_line_bytes:
+            self._buffer.clear()
+            self._skipping = True
+        else:
+            self._buffer += rest
+
+    def finish(self) -> Optional[bytes | LineTooLong]:
+        """Trailing line without a newline, if any."""
+        if self._skipping:
+            self._skipping = False
+            return LineTooLong()
+        if self._buffer:
+            line = bytes(self._buffer)
+            self._buffer.clear()
+            return line
+        return None
+
+
+@dataclass
+class Decoded:
+    """An already-decoded record (MessagePack streams have no lines to parse)."""
+
+    value: Any
+
+
+class MsgpackSplitter:
+    """Split a byte stream into consecutive MessagePack objects.
+
+    MessagePack has no delimiter to resynchronise on, so an object larger than
+    ``max_object_bytes`` (413) or malformed input (400) ends the stream.
+    """
+
+    FEED_BYTES = 64 * 1024
+
+    def __init__(self, max_object_bytes: int):
+        self.max_object_bytes = max_object_bytes
+        self._unpacker = msgpack.Unpacker(
+            raw=False, timestamp=3, strict_map_key=False, max_buffer_size=max_object_bytes + self.FEED_BYTES
+        )
+        self._fed = 0
+
+    def _drain(self) -> Iterator[Decoded]:
+        try:
+            for value in self._unpacker:
+                yield Decoded(value)
+        except (ValueError, msgpack.UnpackException) as exc:
+            raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Malformed MessagePack body") from exc
+
+    def feed(self, data: bytes) -> Iterator[Decoded]:
+        for start in range(0, len(data), self.FEED_BYTES):
+            piece = data[start : start + self.FEED_BYTES]
+            try:
+                self._unpacker.feed(piece)
+            except msgpack.BufferFull as exc:
+                raise HTTPException(
+                    status_code=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE,
+                    detail=f"MessagePack object exceeds {self.max_object_bytes} bytes",
+                ) from exc
+            self._fed += len(piece)
+            yield from self._drain()
+
+    def finish(self) -> Optional[Decoded]:
+        """MessagePack input must end on an object boundary."""
+        if self._unpacker.tell() != self._fed:
+            raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Truncated MessagePack body")
+        return None
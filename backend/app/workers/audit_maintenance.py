@@ -0,0 +1,47 @@
+"""Audit log partition maintenance: upcoming partitions and retention.
+
+Run daily (cron, k8s CronJob) or keep it running with --loop:
+    python -m backend.app.workers.audit_maintenance [--loop --interval 3600]
+"""
+import argparse
+import logging
+import time
+
+from backend.app.core.database import engine
+from backend.app.services.audit_partitions import run_maintenance
+
+logger = logging.getLogger("greenai.audit_maintenance")
+
+
+def run_once() -> None:
+    with engine.connect() as conn:
+        summary = run_maintenance(conn)
+    if summary is not None:
+        logger.info(
+            "Audit maintenance: created=%s expired=%s deleted_rows=%s",
+            summary["created_partitions"],
+            summary["expired_partitions"],
+            summary["deleted_rows"],
+        )
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--loop", action="store_true", help="keep running, once per --interval seconds")
+    parser.add_argument("--interval", type=int, default=3600)
+    args = parser.parse_args()
+    logging.basicConfig(level=logging.INFO)
+    while True:
+        try:
+            run_once()
+        except Exception:
+            if not args.loop:
+                raise
+            logger.exception("Audit maintenance run failed")
+        if not args.loop:
+            return
+        time.sleep(args.interval)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,51 @@
+"""Import hourly grid carbon intensity from CSV into grid_intensity_days.
+
+    python -m backend.app.workers.grid_intensity_import intensity.csv [--source electricitymaps]
+
+Columns: region, hour (ISO 8601, UTC if no offset), g_co2e_per_kwh. Hours
+already stored for a region and day are overwritten, others are kept.
+"""
+import argparse
+import csv
+import logging
+from datetime import datetime
+from itertools import islice
+
+from backend.app.core.database import SessionLocal
+from backend.app.services.grid_intensity import upsert_hourly
+
+logger = logging.getLogger("greenai.grid_intensity_import")
+
+_BATCH_POINTS = 50_000
+
+
+def _points(path: str):
+    with open(path, newline="") as handle:
+        for row in csv.DictReader(handle):
+            yield row["region"], datetime.fromisoformat(row["hour"]), float(row["g_co2e_per_kwh"])
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("path")
+    parser.add_argument("--source", default=None)
+    args = parser.parse_args()
+    logging.basicConfig(level=logging.INFO)
+
+    points = _points(args.path)
+    days = 0
+    db = SessionLocal()
+    try:
+        while True:
+            batch = list(islice(points, _BATCH_POINTS))
+            if not batch:
+                break
+            days += upsert_hourly(db, batch, source=args.source)
+            db.commit()
+    finally:
+        db.close()
+    logger.info("Wrote %d region-days of grid intensity", days)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,44 @@
+"""Async ingest consumer: drains the Redis Stream into Postgres in batches.
+
+Run one or more per deployment (each joins the same consumer group):
+    python -m backend.app.workers.ingest_consumer
+"""
+import logging
+import os
+import socket
+import time
+
+from prometheus_client import start_http_server
+
+from backend.app.core.config import get_settings
+from backend.app.core.database import SessionLocal
+from backend.app.observability.metrics import registry
+from backend.app.services.ingest_queue import drain_once, ingest_queue
+
+logger = logging.getLogger("greenai.ingest_consumer")
+settings = get_settings()
+
+
+def main() -> None:
+    logging.basicConfig(level=logging.INFO)
+    consumer = f"{socket.gethostname()}-{os.getpid()}"
+    if settings.worker_metrics_port:
+        start_http_server(settings.worker_metrics_port, registry=registry)
+    logger.info("Ingest consumer %s reading %s", consumer, ingest_queue.stream)
+    while True:
+        if ingest_queue.client is None:
+            time.sleep(5)
+            continue
+        db = SessionLocal()
+        try:
+            drain_once(db, ingest_queue, consumer)
+        except Exception:
+            logger.exception("Ingest consumer iteration failed")
+            time.sleep(1)
+        finally:
+            db.close()
+        ingest_queue.refresh_metrics()
+
+
+if __name__ == "__main__":
+    main()
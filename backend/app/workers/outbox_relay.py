@@ -0,0 +1,54 @@
+"""Outbox relay: hands runs committed to the outbox to the emissions queue.
+
+    python -m backend.app.workers.outbox_relay
+
+Any number can run (the supervisor starts WORKER_OUTBOX_PROCESSES); batches
+are locked with SKIP LOCKED so relays never deliver the same rows at once.
+On SIGTERM the relay finishes its current batch and exits.
+"""
+import logging
+import signal
+import threading
+
+from backend.app.core.config import get_settings
+from backend.app.core.database import SessionLocal
+from backend.app.services.emissions_queue import emissions_queue
+from backend.app.services.outbox import relay_once
+
+logger = logging.getLogger("greenai.outbox_relay")
+settings = get_settings()
+
+
+def run_relay(max_tasks: int = 0) -> int:
+    """Relay until SIGTERM, or ``max_tasks`` non-empty batches; returns the batches relayed."""
+    stopping = threading.Event()
+    for signum in (signal.SIGTERM, signal.SIGINT):
+        signal.signal(signum, lambda *_: stopping.set())
+    logger.info("Outbox relay started")
+    done = 0
+    while not stopping.is_set():
+        db = SessionLocal()
+        try:
+            relayed = relay_once(db, emissions_queue)
+        except Exception:
+            logger.exception("Outbox relay iteration failed")
+            relayed = 0
+        finally:
+            db.close()
+        if relayed < settings.outbox_batch_size:
+            # Caught up (or the queue is down): poll instead of spinning
+            stopping.wait(settings.outbox_poll_ms / 1000)
+        if relayed:
+            done += 1
+            if max_tasks and done >= max_tasks:
+                break
+    return done
+
+
+def main() -> None:
+    logging.basicConfig(level=logging.INFO)
+    run_relay()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,67 @@
+"""Recompute stored emissions in bulk, e.g. after emission factors or grid data change.
+
+    python -m backend.app.workers.recompute_emissions [--organization-id ID] [--region us-east-1 ...]
+        [--chunk-size 1000] [--max-rows-per-second 2000]
+    python -m backend.app.workers.recompute_emissions --resume JOB_ID
+
+Without --organization-id every organization's runs are recomputed. Only runs
+whose emissions changed are written. Progress is checkpointed per chunk; after
+a crash, --resume continues the job from its last committed chunk.
+"""
+import argparse
+import logging
+from uuid import UUID
+
+from backend.app.core.database import SessionLocal
+from backend.app.models.emission_recompute_job import EmissionRecomputeJob
+from backend.app.services.recompute_service import create_job, run_job
+
+logger = logging.getLogger("greenai.recompute_emissions")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--organization-id", type=UUID, default=None)
+    parser.add_argument("--region", action="append", default=[], help="region prefix; repeatable")
+    parser.add_argument("--chunk-size", type=int, default=None)
+    parser.add_argument("--max-rows-per-second", type=int, default=None)
+    parser.add_argument("--resume", type=UUID, default=None, metavar="JOB_ID")
+    args = parser.parse_args()
+    logging.basicConfig(level=logging.INFO)
+
+    job_id = args.resume
+    if job_id is None:
+        db = SessionLocal()
+        try:
+            job = create_job(
+                db,
+                organization_id=args.organization_id,
+                regions=args.region,
+                chunk_size=args.chunk_size,
+                max_rows_per_second=args.max_rows_per_second,
+            )
+            db.commit()
+            job_id = job.id
+            logger.info("Created recompute job %s for %s runs", job_id, job.total_runs)
+        finally:
+            db.close()
+
+    status = run_job(job_id)
+    if status is None:
+        raise SystemExit(f"Recompute job {job_id} is not resumable (finished, or running elsewhere)")
+    db = SessionLocal()
+    try:
+        job = db.get(EmissionRecomputeJob, job_id)
+        logger.info(
+            "Recompute job %s %s: %s/%s scanned, %s changed%s",
+            job_id, job.status, job.scanned_runs, job.total_runs, job.changed_runs,
+            f" ({job.error})" if job.error else "",
+        )
+    finally:
+        db.close()
+    if status == "failed":
+        raise SystemExit(1)
+
+
+if __name__ == "__main__":
+    main()
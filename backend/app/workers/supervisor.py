@@ -0,0 +1,156 @@
+"""Run a pool of worker processes per queue and keep it at size.
+
+    python -m backend.app.workers.supervisor [--emissions 0] [--rq 1] [--outbox 1] [--prefetch 1] [--max-tasks 1000]
+
+--emissions 0 starts one emissions batch worker per core (``os.cpu_count()``);
+each process has its own database and Redis connections, so throughput grows
+with processes until Postgres is the bottleneck. Workers exit after
+--max-tasks tasks (batches for emissions workers) to bound memory growth
+and are replaced; a worker that crashes is replaced too, with a backoff if
+it keeps crashing on start.
+
+On SIGTERM or SIGINT the supervisor forwards SIGTERM: workers stop taking
+work, finish what they hold and exit. Workers still running after
+WORKER_SHUTDOWN_GRACE_SECONDS are killed; their unacknowledged stream
+entries are re-claimed by other workers.
+"""
+from __future__ import annotations
+
+import argparse
+import logging
+import multiprocessing
+import os
+import signal
+import time
+from dataclasses import dataclass
+from functools import partial
+from typing import Callable, Dict, List, Optional, Tuple
+
+from backend.app.core.config import get_settings
+
+logger = logging.getLogger("greenai.supervisor")
+settings = get_settings()
+
+# A worker exiting this soon after start with an error is crash-looping
+_MIN_UPTIME_SECONDS = 5.0
+_MAX_BACKOFF_SECONDS = 30.0
+
+
+def _child(target: Callable[[], object]) -> None:
+    # Forked children inherit the supervisor's handlers; the worker installs its own
+    for signum in (signal.SIGTERM, signal.SIGINT):
+        signal.signal(signum, signal.SIG_DFL)
+    logging.basicConfig(level=logging.INFO)
+    target()
+
+
+@dataclass
+class Slot:
+    queue: str
+    index: int
+    target: Callable[[], object]
+    process: Optional[multiprocessing.process.BaseProcess] = None
+    started_at: float = 0.0
+    not_before: float = 0.0
+    backoff: float = 0.0
+
+    @property
+    def name(self) -> str:
+        return f"{self.queue}-{self.index}"
+
+
+class Supervisor:
+    def __init__(self, pools: Dict[str, Tuple[int, Callable[[], object]]], grace_seconds: float, clock=time.monotonic):
+        self.slots: List[Slot] = [
+            Slot(queue, index, target) for queue, (size, target) in pools.items() for index in range(size)
+        ]
+        self.grace_seconds = grace_seconds
+        self.clock = clock
+        self.stopping = False
+        self._context = multiprocessing.get_context("fork")
+
+    def spawn(self, slot: Slot) -> None:
+        slot.process = self._context.Process(target=_child, args=(slot.target,), name=slot.name)
+        slot.process.start()
+        slot.started_at = self.clock()
+        logger.info("Started worker %s (pid %s)", slot.name, slot.process.pid)
+
+    def reap(self) -> int:
+        """Replace exited workers; returns how many were (re)started."""
+        started = 0
+        now = self.clock()
+        for slot in self.slots:
+            if slot.process is not None and slot.process.is_alive():
+                continue
+            if slot.process is not None:
+                code = slot.process.exitcode
+                slot.process.join()
+                slot.process = None
+                if code != 0 and now - slot.started_at < _MIN_UPTIME_SECONDS:
+                    slot.backoff = min(max(slot.backoff * 2, 1.0), _MAX_BACKOFF_SECONDS)
+                    slot.not_before = now + slot.backoff
+                    logger.warning("Worker %s exited with %s on start; retrying in %.0fs", slot.name, code, slot.backoff)
+                else:
+                    slot.backoff = 0.0
+                    logger.info("Worker %s exited with %s; replacing it", slot.name, code)
+            if now >= slot.not_before and not self.stopping:
+                self.spawn(slot)
+                started += 1
+        return started
+
+    def stop(self) -> None:
+        """SIGTERM every worker, wait for them to drain, kill stragglers after the grace period."""
+        self.stopping = True
+        alive = [slot.process for slot in self.slots if slot.process is not None and slot.process.is_alive()]
+        logger.info("Draining %s workers (grace %ss)", len(alive), self.grace_seconds)
+        for process in alive:
+            os.kill(process.pid, signal.SIGTERM)
+        deadline = self.clock() + self.grace_seconds
+        for process in alive:
+            process.join(max(0.0, deadline - self.clock()))
+        for process in alive:
+            if process.is_alive():
+                logger.warning("Worker %s did not drain in time; killing it", process.name)
+                process.kill()
+                process.join()
+
+    def run(self, poll_seconds: float = 0.5) -> None:
+        def _request_stop(*_):
+            self.stopping = True
+
+        for signum in (signal.SIGTERM, signal.SIGINT):
+            signal.signal(signum, _request_stop)
+        while not self.stopping:
+            self.reap()
+            time.sleep(poll_seconds)
+        self.stop()
+
+
+def main() -> None:
+    from backend.app.workers.outbox_relay import run_relay
+    from backend.app.workers.worker import run_batch, run_rq
+
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--emissions", type=int, default=settings.worker_emissions_processes,
+                        help="emissions batch workers (0: one per core)")
+    parser.add_argument("--rq", type=int, default=settings.worker_rq_processes, help="RQ workers on the default queue")
+    parser.add_argument("--outbox", type=int, default=settings.worker_outbox_processes, help="outbox relays")
+    parser.add_argument("--prefetch", type=int, default=settings.worker_prefetch_batches)
+    parser.add_argument("--max-tasks", type=int, default=settings.worker_max_tasks)
+    parser.add_argument("--grace", type=float, default=settings.worker_shutdown_grace_seconds)
+    args = parser.parse_args()
+    logging.basicConfig(level=logging.INFO)
+
+    pools = {
+        "emissions": (
+            args.emissions or os.cpu_count() or 1,
+            partial(run_batch, prefetch=args.prefetch, max_tasks=args.max_tasks, metrics=False),
+        ),
+        "rq": (args.rq, partial(run_rq, args.max_tasks)),
+        "outbox": (args.outbox, partial(run_relay, args.max_tasks)),
+    }
+    Supervisor(pools, args.grace).run()
+
+
+if __name__ == "__main__":
+    main()
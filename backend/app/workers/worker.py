@@ -1,5 +1,25 @@
-"""Simple RQ worker entrypoint."""
+"""Worker entrypoint.
+
+    python worker.py                      # RQ worker on the default queue
+    python worker.py --batch [--batch-size 500] [--prefetch 1] [--max-tasks 0]
+
+--batch computes queued emissions (EMISSIONS_QUEUE_ENABLED or
+SYNC_COMPUTE=false) many runs per transaction instead of one RQ task per
+run; run as many as needed, they share the stream's consumer group. A reader thread keeps up to --prefetch
+batches read ahead so Redis round trips overlap with computing. On SIGTERM,
+or after --max-tasks batches, the worker stops reading and exits once the
+batches it already holds are done. To run a pool, use
+``python -m backend.app.workers.supervisor``.
+"""
+import argparse
+import logging
 import os
+import queue
+import signal
+import socket
+import threading
+import time
+
 import redis
 from rq import Worker, Queue, Connection
 
@@ -8,8 +28,91 @@ listen = ["default"]
 redis_url = os.environ.get("REDIS_URL", "redis://redis:6379/0")
 conn = redis.from_url(redis_url)
 
+logger = logging.getLogger("greenai.worker")
 
-if __name__ == "__main__":
+
+def run_rq(max_tasks: int = 0) -> None:
+    """RQ worker; finishes the current job on SIGTERM (warm shutdown)."""
     with Connection(conn):
         worker = Worker(list(map(Queue, listen)))
-        worker.work()
+        worker.work(max_jobs=max_tasks or None)
+
+
+def run_batch(batch_size: int | None = None, prefetch: int = 1, max_tasks: int = 0, metrics: bool = True) -> int:
+    """Emissions batch worker; returns the number of batches processed."""
+    from prometheus_client import start_http_server
+
+    from backend.app.core.config import get_settings
+    from backend.app.core.database import SessionLocal
+    from backend.app.observability.metrics import registry
+    from backend.app.services.emissions_queue import emissions_queue, process_messages
+
+    settings = get_settings()
+    batch_size = batch_size or settings.emissions_queue_batch_size
+    consumer = f"{socket.gethostname()}-{os.getpid()}"
+    stopping = threading.Event()
+    for signum in (signal.SIGTERM, signal.SIGINT):
+        signal.signal(signum, lambda *_: stopping.set())
+    if metrics and settings.worker_metrics_port:
+        start_http_server(settings.worker_metrics_port, registry=registry)
+
+    # Bounded: the reader blocks once `prefetch` batches are waiting
+    ready: "queue.Queue[list]" = queue.Queue(maxsize=max(prefetch, 1))
+
+    def read_ahead() -> None:
+        while not stopping.is_set():
+            if emissions_queue.client is None:
+                stopping.wait(5)
+                continue
+            try:
+                messages = emissions_queue.read(consumer, batch_size, settings.emissions_queue_block_ms)
+            except Exception:
+                logger.exception("Emissions queue read failed")
+                stopping.wait(1)
+                continue
+            if messages:
+                ready.put(messages)
+
+    reader = threading.Thread(target=read_ahead, name="emissions-prefetch", daemon=True)
+    reader.start()
+    logger.info("Emissions batch worker %s reading %s", consumer, emissions_queue.stream)
+
+    done = 0
+    # Batches already read are delivered to this consumer: finish them before exiting
+    while reader.is_alive() or not ready.empty():
+        try:
+            messages = ready.get(timeout=0.5)
+        except queue.Empty:
+            continue
+        db = SessionLocal()
+        try:
+            process_messages(db, emissions_queue, messages)
+        except Exception:
+            logger.exception("Emissions batch iteration failed")
+            time.sleep(1)
+        finally:
+            db.close()
+        done += 1
+        if max_tasks and done >= max_tasks and not stopping.is_set():
+            logger.info("Emissions batch worker %s recycling after %s batches", consumer, done)
+            stopping.set()
+    return done
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--batch", action="store_true", help="compute queued emissions in batches")
+    parser.add_argument("--batch-size", type=int, default=None)
+    parser.add_argument("--prefetch", type=int, default=1, help="batches read ahead (with --batch)")
+    parser.add_argument("--max-tasks", type=int, default=0, help="exit after this many tasks/batches (0: never)")
+    args = parser.parse_args()
+    logging.basicConfig(level=logging.INFO)
+
+    if args.batch:
+        run_batch(args.batch_size, prefetch=args.prefetch, max_tasks=args.max_tasks)
+    else:
+        run_rq(args.max_tasks)
+
+
+if __name__ == "__main__":
+    main()
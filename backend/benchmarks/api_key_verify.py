@@ -0,0 +1,44 @@
+"""Compare API key verification cost: legacy bcrypt vs peppered HMAC-SHA256.
+
+Usage (needs the usual backend env, e.g. JWT_SECRET_KEY):
+    python -m backend.benchmarks.api_key_verify [--rounds 20]
+"""
+import argparse
+import time
+
+from backend.app.auth.api_keys import (
+    HASH_SCHEME_BCRYPT,
+    check_api_key_hash,
+    generate_api_key,
+    hash_api_key,
+)
+from backend.app.auth.security import get_password_hash
+
+
+def _per_call_ms(fn, rounds: int) -> float:
+    start = time.perf_counter()
+    for _ in range(rounds):
+        assert fn()
+    return (time.perf_counter() - start) * 1000 / rounds
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--rounds", type=int, default=20, help="bcrypt rounds (HMAC runs 1000x as many)")
+    args = parser.parse_args()
+
+    _, raw = generate_api_key()
+    bcrypt_hash = get_password_hash(raw)
+    hmac_scheme, hmac_hash = hash_api_key(raw)
+
+    bcrypt_ms = _per_call_ms(lambda: check_api_key_hash(raw, bcrypt_hash, HASH_SCHEME_BCRYPT), args.rounds)
+    hmac_ms = _per_call_ms(lambda: check_api_key_hash(raw, hmac_hash, hmac_scheme), args.rounds * 1000)
+
+    print(f"{'scheme':<12} {'per verify':>14}")
+    print(f"{HASH_SCHEME_BCRYPT:<12} {bcrypt_ms * 1000:>11.1f} us")
+    print(f"{hmac_scheme:<12} {hmac_ms * 1000:>11.1f} us")
+    print(f"speedup: {bcrypt_ms / hmac_ms:,.0f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,65 @@
+"""Partitions scanned by the audit log listing query, with and without a time range.
+
+Runs EXPLAIN (no rows are read or written) against the configured
+DATABASE_URL after migration 0013:
+    python -m backend.benchmarks.audit_partition_pruning --organization-id <uuid> [--days 7]
+
+Prints, per case, the audit_logs partitions left in the plan. A bounded
+range keeps only the months it overlaps; the "retention" case is what
+list_audit_logs does when no from_ts is given.
+"""
+import argparse
+import json
+import uuid
+from datetime import datetime, timedelta, timezone
+
+from sqlalchemy import text
+from sqlalchemy.dialects import postgresql
+
+from backend.app.api.audit_logs import build_audit_log_query
+from backend.app.core.database import SessionLocal
+from backend.app.schemas.audit_log import AuditLogQuery
+
+
+def _partitions(plan) -> set:
+    found = set()
+    if isinstance(plan, dict):
+        name = plan.get("Relation Name")
+        if name and name.startswith("audit_logs"):
+            found.add(name)
+        for value in plan.values():
+            found |= _partitions(value)
+    elif isinstance(plan, list):
+        for item in plan:
+            found |= _partitions(item)
+    return found
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--organization-id", type=uuid.UUID, required=True)
+    parser.add_argument("--days", type=int, default=7)
+    args = parser.parse_args()
+
+    now = datetime.now(timezone.utc)
+    cases = [
+        ("last N days", AuditLogQuery(from_ts=now - timedelta(days=args.days), to_ts=now)),
+        ("retention", AuditLogQuery()),
+        ("all time", AuditLogQuery(from_ts=datetime(1970, 1, 1, tzinfo=timezone.utc))),
+    ]
+    db = SessionLocal()
+    try:
+        for label, query in cases:
+            statement = build_audit_log_query(db, args.organization_id, query).statement
+            sql = str(statement.compile(dialect=postgresql.dialect(), compile_kwargs={"literal_binds": True}))
+            plan = db.execute(text(f"EXPLAIN (FORMAT JSON) {sql}")).scalar()
+            if isinstance(plan, str):
+                plan = json.loads(plan)
+            scanned = sorted(_partitions(plan))
+            print(f"{label:<12} {len(scanned):>3} partitions: {', '.join(scanned)}")
+    finally:
+        db.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,80 @@
+"""Emissions compute throughput: one task per run versus batched workers.
+
+Runs against the configured DATABASE_URL (Postgres) and recomputes the most
+recent runs of an existing project, so point it at a scratch database:
+    python -m backend.benchmarks.emissions_worker --project-id <uuid> [--runs 2000] [--batch-size 500]
+
+The per-run pass calls the RQ task (one session, input query, write and
+commit per run); the batched pass does what ``worker.py --batch`` does per
+stream read. Redis is not involved, so the numbers are the database side only.
+"""
+import argparse
+import time
+import uuid
+
+from sqlalchemy import event, select
+
+from backend.app.core.database import SessionLocal, engine
+from backend.app.models.job_run import JobRun
+from backend.app.services.emissions_engine import compute_emissions
+from backend.app.workers.tasks import compute_energy_and_emissions
+
+
+def _per_run(ids) -> None:
+    for job_run_id in ids:
+        compute_energy_and_emissions(str(job_run_id))
+
+
+def _batched(ids, batch_size: int) -> None:
+    for offset in range(0, len(ids), batch_size):
+        db = SessionLocal()
+        try:
+            compute_emissions(db, ids[offset : offset + batch_size])
+            db.commit()
+        finally:
+            db.close()
+
+
+def _run_pass(label: str, ids, fn) -> None:
+    statements = 0
+
+    def _count(*_args, **_kwargs):
+        nonlocal statements
+        statements += 1
+
+    event.listen(engine, "before_cursor_execute", _count)
+    try:
+        start = time.perf_counter()
+        fn(ids)
+        elapsed = time.perf_counter() - start
+    finally:
+        event.remove(engine, "before_cursor_execute", _count)
+    print(f"{label:<10} {len(ids) / elapsed:>10.0f} {statements / len(ids):>11.2f} {elapsed:>9.2f}")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--project-id", type=uuid.UUID, required=True)
+    parser.add_argument("--runs", type=int, default=2000)
+    parser.add_argument("--batch-size", type=int, default=500)
+    args = parser.parse_args()
+
+    with SessionLocal() as db:
+        ids = list(
+            db.execute(
+                select(JobRun.id)
+                .where(JobRun.project_id == args.project_id)
+                .order_by(JobRun.created_at.desc())
+                .limit(args.runs)
+            ).scalars()
+        )
+    if not ids:
+        raise SystemExit("No job runs in that project")
+
+    print(f"{'pass':<10} {'runs/s':>10} {'stmts/run':>11} {'seconds':>9}")
+    _run_pass("per-run", ids, _per_run)
+    _run_pass("batched", ids, lambda ids: _batched(ids, args.batch_size))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,90 @@
+"""Latency of other organizations' emissions while one tenant replays a backfill.
+
+No database or Redis needed:
+    python -m backend.benchmarks.fair_queue [--backfill 500000] [--tenants 20] [--rate 10] [--capacity 5000]
+
+Simulates the worker tier computing ``--capacity`` runs/s in batches of
+``--batch``. At t=0 a noisy tenant queues ``--backfill`` runs; ``--tenants``
+other organizations each ingest runs as a Poisson process of ``--rate``
+runs/s for ``--seconds``. Batches are filled either in arrival order (one
+shared queue) or by ``DeficitRoundRobin`` over per-tenant queues, and the
+wait of every run of the other tenants is reported.
+"""
+import argparse
+from collections import deque
+
+import numpy as np
+
+from backend.app.services.fair_scheduler import DeficitRoundRobin
+
+NOISY = "noisy"
+
+
+def _arrivals(args, rng):
+    runs = [(0.0, NOISY)] * args.backfill
+    for tenant in range(args.tenants):
+        count = rng.poisson(args.rate * args.seconds)
+        runs += [(t, f"t{tenant}") for t in rng.uniform(0, args.seconds, count)]
+    runs.sort(key=lambda run: run[0])
+    return runs
+
+
+def _simulate(runs, args, fair: bool):
+    batch_seconds = args.batch / args.capacity
+    drr = DeficitRoundRobin(args.quantum)
+    weights = {NOISY: args.noisy_weight}
+    shared, per_tenant = deque(), {}
+    waits, noisy_done, now, i = [], 0, 0.0, 0
+    while now < args.seconds:
+        while i < len(runs) and runs[i][0] <= now:
+            if fair:
+                per_tenant.setdefault(runs[i][1], deque()).append(runs[i][0])
+            else:
+                shared.append(runs[i])
+            i += 1
+        if fair:
+            take = drr.select({t: len(q) for t, q in per_tenant.items() if q}, weights, args.batch)
+            chosen = [(per_tenant[t].popleft(), t) for t, n in take.items() for _ in range(n)]
+        else:
+            chosen = [shared.popleft() for _ in range(min(args.batch, len(shared)))]
+        if not chosen:
+            if i == len(runs):
+                break
+            now = runs[i][0]
+            continue
+        now += batch_seconds
+        for arrived, tenant in chosen:
+            if tenant == NOISY:
+                noisy_done += 1
+            else:
+                waits.append(now - arrived)
+    # Runs still queued at the end count with their wait so far
+    queued = list(shared) + [(t, tenant) for tenant, q in per_tenant.items() for t in q]
+    waits += [now - arrived for arrived, tenant in queued if tenant != NOISY]
+    return np.array(waits), noisy_done
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--backfill", type=int, default=500_000)
+    parser.add_argument("--tenants", type=int, default=20)
+    parser.add_argument("--rate", type=float, default=10.0)
+    parser.add_argument("--seconds", type=float, default=300.0)
+    parser.add_argument("--capacity", type=float, default=5000.0)
+    parser.add_argument("--batch", type=int, default=500)
+    parser.add_argument("--quantum", type=int, default=50)
+    parser.add_argument("--noisy-weight", type=float, default=1.0)
+    args = parser.parse_args()
+    runs = _arrivals(args, np.random.default_rng(7))
+
+    print(f"{'policy':<8} {'p50 s':>8} {'p99 s':>8} {'max s':>8} {'backfill runs/s':>16}")
+    for label, fair in (("fifo", False), ("drr", True)):
+        waits, noisy_done = _simulate(runs, args, fair)
+        print(
+            f"{label:<8} {np.percentile(waits, 50):>8.2f} {np.percentile(waits, 99):>8.2f} "
+            f"{waits.max():>8.2f} {noisy_done / args.seconds:>16.0f}"
+        )
+
+
+if __name__ == "__main__":
+    main()
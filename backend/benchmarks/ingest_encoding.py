@@ -0,0 +1,98 @@
+"""Bytes on the wire and server-side parse time per ingest body encoding.
+
+No database needed:
+    python -m backend.benchmarks.ingest_encoding [--runs 500] [--repeat 20]
+
+Builds a /job-runs/batch body of SDK-shaped runs (hardware details, tags and
+metadata dicts) and, for each encoding, reports the encoded size and the time
+to decode it and validate its runs into ``JobRunCreate`` as the batch
+endpoint does.
+"""
+import argparse
+import gzip
+import json
+import statistics
+import time
+from datetime import datetime, timedelta, timezone
+
+import msgpack
+import zstandard
+
+from backend.app.middleware.body_decoding import unpack_msgpack
+from backend.app.schemas.job_run import JobRunBatchCreate, JobRunCreate
+from backend.app.utils.compression import decompress_body
+
+
+def _runs(count: int):
+    start = datetime(2026, 1, 1, tzinfo=timezone.utc)
+    return [
+        {
+            "run_name": f"train-resnet50-{i}",
+            "job_type": "training",
+            "region": "us-east-1",
+            "cloud_provider": "aws",
+            "instance_type": "p4d.24xlarge",
+            "start_time": start + timedelta(minutes=i),
+            "end_time": start + timedelta(minutes=i + 45),
+            "dedupe_key": f"sdk-{i:08d}",
+            "hardware": {
+                "gpu_model": "NVIDIA A100-SXM4-40GB",
+                "gpu_count": 8,
+                "cpu_count": 96,
+                "ram_gb": 1152,
+                "details": {"driver": "535.104.05", "cuda": "12.2", "hostname": f"ip-10-0-{i % 255}-17"},
+            },
+            "energy": {"total_kwh": 12.5 + i % 7, "gpu_kwh": 10.1, "cpu_kwh": 2.4},
+            "tags": {"team": "vision", "env": "prod", "experiment": f"exp-{i % 40}"},
+            "metadata": {"framework": "pytorch", "version": "2.3.1", "epochs": 90, "batch_size": 256, "lr": 0.1},
+        }
+        for i in range(count)
+    ]
+
+
+def _json_body(runs) -> bytes:
+    return json.dumps({"runs": runs}, default=lambda v: v.isoformat()).encode("utf-8")
+
+
+def _msgpack_body(runs) -> bytes:
+    return msgpack.packb({"runs": runs}, datetime=True)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--runs", type=int, default=500)
+    parser.add_argument("--repeat", type=int, default=20)
+    args = parser.parse_args()
+
+    runs = _runs(args.runs)
+    raw_json, raw_msgpack = _json_body(runs), _msgpack_body(runs)
+    zstd = zstandard.ZstdCompressor(level=3)
+    cases = [
+        ("json", raw_json, "identity", json.loads),
+        ("json+gzip", gzip.compress(raw_json, compresslevel=5), "gzip", json.loads),
+        ("json+zstd", zstd.compress(raw_json), "zstd", json.loads),
+        ("msgpack", raw_msgpack, "identity", unpack_msgpack),
+        ("msgpack+zstd", zstd.compress(raw_msgpack), "zstd", unpack_msgpack),
+    ]
+
+    print(f"{args.runs} runs per body")
+    print(f"{'encoding':<14} {'bytes':>10} {'vs json':>8} {'decode ms':>10} {'validate ms':>12}")
+    for label, body, encoding, parse in cases:
+        decode_ms, validate_ms = [], []
+        for _ in range(args.repeat):
+            start = time.perf_counter()
+            doc = parse(decompress_body(body, encoding, max_bytes=64 * 1024 * 1024, max_ratio=100))
+            mid = time.perf_counter()
+            for run in JobRunBatchCreate.model_validate(doc).runs:
+                JobRunCreate.model_validate(run)
+            end = time.perf_counter()
+            decode_ms.append((mid - start) * 1000)
+            validate_ms.append((end - mid) * 1000)
+        print(
+            f"{label:<14} {len(body):>10} {len(body) / len(raw_json):>8.2f} "
+            f"{statistics.median(decode_ms):>10.2f} {statistics.median(validate_ms):>12.2f}"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,89 @@
+"""Per-ingest statement count and latency of ``upsert_job_run``.
+
+Runs against the configured DATABASE_URL (Postgres) and writes job runs
+into an existing project, so point it at a scratch database:
+    python -m backend.benchmarks.job_run_upsert --project-id <uuid> --organization-id <uuid> [--runs 200]
+
+Three passes over the same dedupe keys: new rows (created), an identical
+replay (unchanged, no rows rewritten) and a replay with a new end_time
+(updated).
+"""
+import argparse
+import statistics
+import time
+import uuid
+from datetime import datetime, timedelta
+
+from sqlalchemy import event
+
+from backend.app.core.database import SessionLocal, engine
+from backend.app.schemas.job_run import JobRunCreate
+from backend.app.services.job_service import upsert_job_run
+
+
+def _payload(project_id, organization_id, dedupe_key: str, end_time: datetime) -> JobRunCreate:
+    start = datetime(2026, 1, 1)
+    return JobRunCreate(
+        run_name="bench",
+        job_type="training",
+        region="us-east-1",
+        start_time=start,
+        end_time=end_time,
+        project_id=project_id,
+        organization_id=organization_id,
+        dedupe_key=dedupe_key,
+        hardware={"gpu_model": "A100", "cpu_count": 8},
+        energy={"total_kwh": 1.5, "gpu_kwh": 1.0, "cpu_kwh": 0.5},
+        costs={"amount_usd": 3.2},
+    )
+
+
+def _run_pass(label: str, payloads) -> None:
+    statements = 0
+
+    def _count(*_args, **_kwargs):
+        nonlocal statements
+        statements += 1
+
+    event.listen(engine, "before_cursor_execute", _count)
+    latencies = []
+    try:
+        for payload in payloads:
+            db = SessionLocal()
+            try:
+                start = time.perf_counter()
+                upsert_job_run(db, payload)
+                latencies.append((time.perf_counter() - start) * 1000)
+            finally:
+                db.close()
+    finally:
+        event.remove(engine, "before_cursor_execute", _count)
+
+    latencies.sort()
+    p95 = latencies[int(len(latencies) * 0.95) - 1]
+    print(
+        f"{label:<10} {statements / len(payloads):>12.1f} "
+        f"{statistics.median(latencies):>10.2f} {p95:>10.2f}"
+    )
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--project-id", type=uuid.UUID, required=True)
+    parser.add_argument("--organization-id", type=uuid.UUID, required=True)
+    parser.add_argument("--runs", type=int, default=200)
+    args = parser.parse_args()
+
+    prefix = f"bench-{uuid.uuid4().hex[:8]}"
+    keys = [f"{prefix}-{i}" for i in range(args.runs)]
+    end = datetime(2026, 1, 1, 1)
+
+    print(f"{'pass':<10} {'stmts/ingest':>12} {'p50 ms':>10} {'p95 ms':>10}")
+    _run_pass("created", [_payload(args.project_id, args.organization_id, k, end) for k in keys])
+    _run_pass("unchanged", [_payload(args.project_id, args.organization_id, k, end) for k in keys])
+    later = end + timedelta(minutes=5)
+    _run_pass("updated", [_payload(args.project_id, args.organization_id, k, later) for k in keys])
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,54 @@
+"""Unique job_run_id on 1:1 child tables (enables set-based batch upserts).
+
+Revision ID: 0009_job_run_children_unique
+Revises: 0008_phase3_audit_and_rate_limit
+Create Date: 2026-10-17
+"""
+
+from alembic import op
+from sqlalchemy import inspect
+
+
+# revision identifiers, used by Alembic.
+revision = "0009_job_run_children_unique"
+down_revision = "0008_phase3_audit_and_rate_limit"
+branch_labels = None
+depends_on = None
+
+
+CHILD_TABLES = {
+    "job_run_hardware": "ux_job_run_hardware_job_run",
+    "job_run_energy": "ux_job_run_energy_job_run",
+    "job_run_costs": "ux_job_run_costs_job_run",
+}
+
+
+def upgrade() -> None:
+    bind = op.get_bind()
+    insp = inspect(bind)
+
+    for table, constraint in CHILD_TABLES.items():
+        if not insp.has_table(table):
+            continue
+        # Keep the most recently updated row per job run before enforcing 1:1
+        op.execute(
+            f"""
+            DELETE FROM {table} t
+            USING (
+                SELECT id,
+                       row_number() OVER (PARTITION BY job_run_id ORDER BY updated_at DESC, id DESC) AS rn
+                FROM {table}
+            ) d
+            WHERE t.id = d.id AND d.rn > 1
+            """
+        )
+        op.create_unique_constraint(constraint, table, ["job_run_id"])
+
+
+def downgrade() -> None:
+    bind = op.get_bind()
+    insp = inspect(bind)
+
+    for table, constraint in CHILD_TABLES.items():
+        if insp.has_table(table):
+            op.drop_constraint(constraint, table, type_="unique")
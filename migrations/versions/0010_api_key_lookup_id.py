@@ -0,0 +1,55 @@
+"""Indexed key_id on api_keys for single-row API key lookup.
+
+Legacy keys are backfilled with their 12-character key_prefix when that
+prefix is unique; keys without a prefix or sharing one with another key
+keep key_id NULL and can no longer authenticate (they must be rotated).
+
+Revision ID: 0010_api_key_lookup_id
+Revises: 0009_job_run_children_unique
+Create Date: 2026-10-17
+"""
+
+import sqlalchemy as sa
+from alembic import op
+from sqlalchemy import inspect
+
+
+# revision identifiers, used by Alembic.
+revision = "0010_api_key_lookup_id"
+down_revision = "0009_job_run_children_unique"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    bind = op.get_bind()
+    insp = inspect(bind)
+    if not insp.has_table("api_keys"):
+        return
+
+    columns = {c["name"] for c in insp.get_columns("api_keys")}
+    if "key_id" not in columns:
+        op.add_column("api_keys", sa.Column("key_id", sa.String(length=32), nullable=True))
+
+    op.execute(
+        """
+        UPDATE api_keys k
+        SET key_id = k.key_prefix
+        WHERE k.key_id IS NULL
+          AND k.key_prefix IS NOT NULL
+          AND NOT EXISTS (
+              SELECT 1 FROM api_keys o
+              WHERE o.key_prefix = k.key_prefix AND o.id <> k.id
+          )
+        """
+    )
+    op.create_index("ux_api_keys_key_id", "api_keys", ["key_id"], unique=True)
+
+
+def downgrade() -> None:
+    bind = op.get_bind()
+    insp = inspect(bind)
+    if not insp.has_table("api_keys"):
+        return
+    op.drop_index("ux_api_keys_key_id", table_name="api_keys")
+    op.drop_column("api_keys", "key_id")
@@ -0,0 +1,40 @@
+"""Per-row hash scheme on api_keys (existing rows are bcrypt).
+
+Revision ID: 0011_api_key_hash_scheme
+Revises: 0010_api_key_lookup_id
+Create Date: 2026-10-17
+"""
+
+import sqlalchemy as sa
+from alembic import op
+from sqlalchemy import inspect
+
+
+# revision identifiers, used by Alembic.
+revision = "0011_api_key_hash_scheme"
+down_revision = "0010_api_key_lookup_id"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    bind = op.get_bind()
+    insp = inspect(bind)
+    if not insp.has_table("api_keys"):
+        return
+    columns = {c["name"] for c in insp.get_columns("api_keys")}
+    if "hash_scheme" not in columns:
+        op.add_column(
+            "api_keys",
+            sa.Column("hash_scheme", sa.String(length=16), nullable=False, server_default=sa.text("'bcrypt'")),
+        )
+
+
+def downgrade() -> None:
+    # HMAC digests cannot be turned back into bcrypt hashes; those keys must be rotated.
+    bind = op.get_bind()
+    insp = inspect(bind)
+    if not insp.has_table("api_keys"):
+        return
+    op.execute("UPDATE api_keys SET active = false WHERE hash_scheme <> 'bcrypt'")
+    op.drop_column("api_keys", "hash_scheme")
@@ -0,0 +1,54 @@
+"""Aggregated audit rows: event_count, first_at/last_at and a per-window key.
+
+Revision ID: 0012_audit_aggregation
+Revises: 0011_api_key_hash_scheme
+Create Date: 2026-10-17
+"""
+
+import sqlalchemy as sa
+from alembic import op
+from sqlalchemy import inspect
+
+
+# revision identifiers, used by Alembic.
+revision = "0012_audit_aggregation"
+down_revision = "0011_api_key_hash_scheme"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    bind = op.get_bind()
+    insp = inspect(bind)
+    if not insp.has_table("audit_logs"):
+        return
+    columns = {c["name"] for c in insp.get_columns("audit_logs")}
+    if "event_count" not in columns:
+        op.add_column(
+            "audit_logs", sa.Column("event_count", sa.Integer(), nullable=False, server_default=sa.text("1"))
+        )
+    if "first_at" not in columns:
+        op.add_column("audit_logs", sa.Column("first_at", sa.DateTime(timezone=True), nullable=True))
+    if "last_at" not in columns:
+        op.add_column("audit_logs", sa.Column("last_at", sa.DateTime(timezone=True), nullable=True))
+    if "aggregate_key" not in columns:
+        op.add_column("audit_logs", sa.Column("aggregate_key", sa.String(length=64), nullable=True))
+    op.create_index(
+        "ux_audit_aggregate_window",
+        "audit_logs",
+        ["aggregate_key", "created_at"],
+        unique=True,
+        postgresql_where=sa.text("aggregate_key IS NOT NULL"),
+    )
+
+
+def downgrade() -> None:
+    bind = op.get_bind()
+    insp = inspect(bind)
+    if not insp.has_table("audit_logs"):
+        return
+    op.drop_index("ux_audit_aggregate_window", table_name="audit_logs")
+    op.drop_column("audit_logs", "aggregate_key")
+    op.drop_column("audit_logs", "last_at")
+    op.drop_column("audit_logs", "first_at")
+    op.drop_column("audit_logs", "event_count")
@@ -0,0 +1,150 @@
+"""Monthly range partitions for audit_logs; per-org audit retention.
+
+audit_logs is rebuilt as a table partitioned by RANGE (created_at) with one
+partition per UTC month (audit_logs_pYYYY_MM) plus a DEFAULT partition for
+rows outside the created ranges. The primary key becomes (id, created_at),
+as Postgres requires the partition key in every unique index. Existing rows
+are copied into partitions spanning their months; partitions for the next
+three months are created up front, later ones by the maintenance task
+(python -m backend.app.workers.audit_maintenance).
+
+Revision ID: 0013_audit_logs_partitioned
+Revises: 0012_audit_aggregation
+Create Date: 2026-10-17
+"""
+
+import sqlalchemy as sa
+from alembic import op
+from sqlalchemy import inspect
+from sqlalchemy.dialects import postgresql
+
+
+# revision identifiers, used by Alembic.
+revision = "0013_audit_logs_partitioned"
+down_revision = "0012_audit_aggregation"
+branch_labels = None
+depends_on = None
+
+COLUMNS = (
+    "id, created_at, organization_id, actor_user_id, actor_type, actor_api_key_id, action, resource_type, "
+    "resource_id, status, ip, user_agent, request_id, metadata, event_count, first_at, last_at, aggregate_key"
+)
+INDEXES = ("ix_audit_org_created", "ix_audit_org_action_created", "ix_audit_org_actor_created", "ix_audit_org_resource")
+
+
+def _columns():
+    return [
+        sa.Column("id", postgresql.UUID(as_uuid=True), nullable=False, server_default=sa.text("gen_random_uuid()")),
+        sa.Column("created_at", sa.DateTime(timezone=True), nullable=False, server_default=sa.text("now()")),
+        sa.Column("organization_id", postgresql.UUID(as_uuid=True), sa.ForeignKey("organizations.id", ondelete="CASCADE"), nullable=False),
+        sa.Column("actor_user_id", postgresql.UUID(as_uuid=True), sa.ForeignKey("users.id", ondelete="SET NULL"), nullable=True),
+        sa.Column("actor_type", sa.String(length=20), nullable=False),
+        sa.Column("actor_api_key_id", postgresql.UUID(as_uuid=True), sa.ForeignKey("api_keys.id", ondelete="SET NULL"), nullable=True),
+        sa.Column("action", sa.String(length=80), nullable=False),
+        sa.Column("resource_type", sa.String(length=60), nullable=True),
+        sa.Column("resource_id", postgresql.UUID(as_uuid=True), nullable=True),
+        sa.Column("status", sa.String(length=20), nullable=False, server_default=sa.text("'success'")),
+        sa.Column("ip", sa.String(length=80), nullable=True),
+        sa.Column("user_agent", sa.Text(), nullable=True),
+        sa.Column("request_id", sa.String(length=80), nullable=True),
+        sa.Column("metadata", postgresql.JSONB(astext_type=sa.Text()), nullable=False, server_default=sa.text("'{}'::jsonb")),
+        sa.Column("event_count", sa.Integer(), nullable=False, server_default=sa.text("1")),
+        sa.Column("first_at", sa.DateTime(timezone=True), nullable=True),
+        sa.Column("last_at", sa.DateTime(timezone=True), nullable=True),
+        sa.Column("aggregate_key", sa.String(length=64), nullable=True),
+    ]
+
+
+def _create_indexes() -> None:
+    op.create_index("ix_audit_org_created", "audit_logs", ["organization_id", "created_at"])
+    op.create_index("ix_audit_org_action_created", "audit_logs", ["organization_id", "action", "created_at"])
+    op.create_index("ix_audit_org_actor_created", "audit_logs", ["organization_id", "actor_user_id", "created_at"])
+    op.create_index("ix_audit_org_resource", "audit_logs", ["organization_id", "resource_type", "resource_id"])
+    op.create_index(
+        "ux_audit_aggregate_window",
+        "audit_logs",
+        ["aggregate_key", "created_at"],
+        unique=True,
+        postgresql_where=sa.text("aggregate_key IS NOT NULL"),
+    )
+
+
+def _drop_indexes(table: str) -> None:
+    for name in (*INDEXES, "ux_audit_aggregate_window"):
+        op.execute(f"DROP INDEX IF EXISTS {name}")
+    op.execute(f"ALTER TABLE {table} DROP CONSTRAINT IF EXISTS audit_logs_pkey")
+
+
+def upgrade() -> None:
+    bind = op.get_bind()
+    insp = inspect(bind)
+
+    if insp.has_table("organizations"):
+        org_columns = {c["name"] for c in insp.get_columns("organizations")}
+        if "audit_retention_days" not in org_columns:
+            op.add_column("organizations", sa.Column("audit_retention_days", sa.Integer(), nullable=True))
+
+    if not insp.has_table("audit_logs"):
+        return
+    relkind = bind.execute(sa.text("SELECT relkind FROM pg_class WHERE oid = 'audit_logs'::regclass")).scalar()
+    if relkind == "p":
+        return
+
+    op.execute("ALTER TABLE audit_logs RENAME TO audit_logs_unpartitioned")
+    _drop_indexes("audit_logs_unpartitioned")
+
+    op.create_table(
+        "audit_logs",
+        *_columns(),
+        sa.PrimaryKeyConstraint("id", "created_at", name="audit_logs_pkey"),
+        postgresql_partition_by="RANGE (created_at)",
+    )
+    _create_indexes()
+    op.execute("CREATE TABLE audit_logs_default PARTITION OF audit_logs DEFAULT")
+    # One partition per UTC month from the oldest row through three months ahead
+    op.execute(
+        """
+        DO $$
+        DECLARE
+            m timestamp;
+            last_month timestamp := date_trunc('month', now() AT TIME ZONE 'UTC') + interval '3 months';
+        BEGIN
+            SELECT date_trunc('month', coalesce(min(created_at), now()) AT TIME ZONE 'UTC')
+              INTO m FROM audit_logs_unpartitioned;
+            WHILE m <= last_month LOOP
+                EXECUTE format(
+                    'CREATE TABLE %I PARTITION OF audit_logs FOR VALUES FROM (%L) TO (%L)',
+                    'audit_logs_p' || to_char(m, 'YYYY_MM'),
+                    m::text || '+00',
+                    (m + interval '1 month')::text || '+00'
+                );
+                m := m + interval '1 month';
+            END LOOP;
+        END $$;
+        """
+    )
+    op.execute(f"INSERT INTO audit_logs ({COLUMNS}) SELECT {COLUMNS} FROM audit_logs_unpartitioned")
+    op.drop_table("audit_logs_unpartitioned")
+
+
+def downgrade() -> None:
+    bind = op.get_bind()
+    insp = inspect(bind)
+    if insp.has_table("audit_logs"):
+        relkind = bind.execute(sa.text("SELECT relkind FROM pg_class WHERE oid = 'audit_logs'::regclass")).scalar()
+        if relkind == "p":
+            op.execute("ALTER TABLE audit_logs RENAME TO audit_logs_partitioned")
+            _drop_indexes("audit_logs_partitioned")
+            op.create_table("audit_logs", *_columns(), sa.PrimaryKeyConstraint("id", name="audit_logs_pkey"))
+            _create_indexes()
+            op.execute(
+                f"INSERT INTO audit_logs ({COLUMNS}) SELECT {COLUMNS} FROM audit_logs_partitioned "
+                "ON CONFLICT (id) DO NOTHING"
+            )
+            # Dropping the parent drops every attached partition; detached archives are left alone
+            op.execute("DROP TABLE audit_logs_partitioned CASCADE")
+
+    if insp.has_table("organizations"):
+        org_columns = {c["name"] for c in insp.get_columns("organizations")}
+        if "audit_retention_days" in org_columns:
+            op.drop_column("organizations", "audit_retention_days")
@@ -0,0 +1,53 @@
+"""Composite (scope, created_at, id) indexes backing keyset pagination.
+
+List endpoints page with ``WHERE (created_at, id) < (:k, :id) ORDER BY
+created_at DESC, id DESC``; each index below turns that into one index seek
+per page. On audit_logs the new index supersedes ix_audit_org_created.
+Suggestions are scoped through their project, so they get a plain
+(created_at, id) index.
+
+Revision ID: 0014_keyset_pagination_indexes
+Revises: 0013_audit_logs_partitioned
+Create Date: 2026-10-17
+"""
+
+from alembic import op
+from sqlalchemy import inspect
+
+
+# revision identifiers, used by Alembic.
+revision = "0014_keyset_pagination_indexes"
+down_revision = "0013_audit_logs_partitioned"
+branch_labels = None
+depends_on = None
+
+INDEXES = (
+    ("ix_job_runs_org_created_id", "job_runs", ["organization_id", "created_at", "id"]),
+    ("ix_reports_org_created_id", "reports", ["organization_id", "created_at", "id"]),
+    ("ix_projects_org_created_id", "projects", ["organization_id", "created_at", "id"]),
+    ("ix_api_keys_org_created_id", "api_keys", ["organization_id", "created_at", "id"]),
+    ("ix_suggestions_created_id", "optimization_suggestions", ["created_at", "id"]),
+    ("ix_audit_org_created_id", "audit_logs", ["organization_id", "created_at", "id"]),
+)
+
+
+def _existing(insp, table):
+    return {ix["name"] for ix in insp.get_indexes(table)}
+
+
+def upgrade() -> None:
+    insp = inspect(op.get_bind())
+    for name, table, columns in INDEXES:
+        if insp.has_table(table) and name not in _existing(insp, table):
+            op.create_index(name, table, columns)
+    if insp.has_table("audit_logs"):
+        op.execute("DROP INDEX IF EXISTS ix_audit_org_created")
+
+
+def downgrade() -> None:
+    insp = inspect(op.get_bind())
+    if insp.has_table("audit_logs") and "ix_audit_org_created" not in _existing(insp, "audit_logs"):
+        op.create_index("ix_audit_org_created", "audit_logs", ["organization_id", "created_at"])
+    for name, table, _ in INDEXES:
+        if insp.has_table(table):
+            op.execute(f"DROP INDEX IF EXISTS {name}")
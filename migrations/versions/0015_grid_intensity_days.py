@@ -0,0 +1,41 @@
+"""Hourly grid carbon intensity per region, one 24-value array row per UTC day.
+
+Revision ID: 0015_grid_intensity_days
+Revises: 0014_keyset_pagination_indexes
+Create Date: 2026-10-17
+"""
+
+import sqlalchemy as sa
+from alembic import op
+from sqlalchemy import inspect
+from sqlalchemy.dialects import postgresql
+
+
+# revision identifiers, used by Alembic.
+revision = "0015_grid_intensity_days"
+down_revision = "0014_keyset_pagination_indexes"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    insp = inspect(op.get_bind())
+    if insp.has_table("grid_intensity_days"):
+        return
+    op.create_table(
+        "grid_intensity_days",
+        sa.Column("region", sa.String(), nullable=False),
+        sa.Column("day", sa.Date(), nullable=False),
+        sa.Column("hourly_g_per_kwh", postgresql.ARRAY(sa.Float()), nullable=False),
+        sa.Column("source", sa.String(), nullable=True),
+        sa.Column("created_at", sa.DateTime(), nullable=False, server_default=sa.text("now()")),
+        sa.Column("updated_at", sa.DateTime(), nullable=False, server_default=sa.text("now()")),
+        sa.PrimaryKeyConstraint("region", "day", name="grid_intensity_days_pkey"),
+        sa.CheckConstraint("cardinality(hourly_g_per_kwh) = 24", name="ck_grid_intensity_days_24_hours"),
+    )
+
+
+def downgrade() -> None:
+    insp = inspect(op.get_bind())
+    if insp.has_table("grid_intensity_days"):
+        op.drop_table("grid_intensity_days")
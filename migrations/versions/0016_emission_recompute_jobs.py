@@ -0,0 +1,53 @@
+"""Checkpointed bulk emissions recompute jobs.
+
+Revision ID: 0016_emission_recompute_jobs
+Revises: 0015_grid_intensity_days
+Create Date: 2026-10-17
+"""
+
+import sqlalchemy as sa
+from alembic import op
+from sqlalchemy import inspect
+from sqlalchemy.dialects import postgresql
+
+
+# revision identifiers, used by Alembic.
+revision = "0016_emission_recompute_jobs"
+down_revision = "0015_grid_intensity_days"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    insp = inspect(op.get_bind())
+    if insp.has_table("emission_recompute_jobs"):
+        return
+    op.create_table(
+        "emission_recompute_jobs",
+        sa.Column("id", postgresql.UUID(as_uuid=True), primary_key=True, server_default=sa.text("gen_random_uuid()")),
+        sa.Column("created_at", sa.DateTime(), nullable=False, server_default=sa.text("now()")),
+        sa.Column("updated_at", sa.DateTime(), nullable=False, server_default=sa.text("now()")),
+        sa.Column("organization_id", postgresql.UUID(as_uuid=True), sa.ForeignKey("organizations.id", ondelete="CASCADE"), nullable=True),
+        sa.Column("requested_by_user_id", postgresql.UUID(as_uuid=True), sa.ForeignKey("users.id", ondelete="SET NULL"), nullable=True),
+        sa.Column("regions", sa.JSON(), nullable=True),
+        sa.Column("status", sa.String(length=20), nullable=False, server_default=sa.text("'pending'")),
+        sa.Column("chunk_size", sa.Integer(), nullable=False),
+        sa.Column("max_rows_per_second", sa.Integer(), nullable=False),
+        sa.Column("total_runs", sa.Integer(), nullable=True),
+        sa.Column("scanned_runs", sa.Integer(), nullable=False, server_default=sa.text("0")),
+        sa.Column("changed_runs", sa.Integer(), nullable=False, server_default=sa.text("0")),
+        sa.Column("cursor_organization_id", postgresql.UUID(as_uuid=True), nullable=True),
+        sa.Column("cursor_created_at", sa.DateTime(), nullable=True),
+        sa.Column("cursor_id", postgresql.UUID(as_uuid=True), nullable=True),
+        sa.Column("started_at", sa.DateTime(), nullable=True),
+        sa.Column("heartbeat_at", sa.DateTime(), nullable=True),
+        sa.Column("finished_at", sa.DateTime(), nullable=True),
+        sa.Column("error", sa.Text(), nullable=True),
+    )
+    op.create_index("ix_emission_recompute_jobs_organization_id", "emission_recompute_jobs", ["organization_id"])
+
+
+def downgrade() -> None:
+    insp = inspect(op.get_bind())
+    if insp.has_table("emission_recompute_jobs"):
+        op.drop_table("emission_recompute_jobs")
@@ -0,0 +1,38 @@
+"""Transactional outbox for the ingest-to-worker handoff.
+
+Revision ID: 0017_outbox
+Revises: 0016_emission_recompute_jobs
+Create Date: 2026-10-17
+"""
+
+import sqlalchemy as sa
+from alembic import op
+from sqlalchemy import inspect
+from sqlalchemy.dialects import postgresql
+
+
+# revision identifiers, used by Alembic.
+revision = "0017_outbox"
+down_revision = "0016_emission_recompute_jobs"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    insp = inspect(op.get_bind())
+    if insp.has_table("outbox"):
+        return
+    op.create_table(
+        "outbox",
+        sa.Column("id", sa.BigInteger(), sa.Identity(always=False), primary_key=True),
+        sa.Column("topic", sa.String(length=50), nullable=False),
+        sa.Column("organization_id", postgresql.UUID(as_uuid=True), nullable=True),
+        sa.Column("job_run_id", postgresql.UUID(as_uuid=True), nullable=False),
+        sa.Column("created_at", sa.DateTime(), nullable=False, server_default=sa.text("now()")),
+    )
+
+
+def downgrade() -> None:
+    insp = inspect(op.get_bind())
+    if insp.has_table("outbox"):
+        op.drop_table("outbox")
@@ -1,11 +1,19 @@
 """Telemetry sender with simple offline cache."""
+import gzip
 import json
 import os
-from typing import Dict, Any, List
+import time
+from typing import Dict, Any, List, Tuple
 import requests
 
 CACHE_PATH = os.path.expanduser("~/.greenai/cache.json")
 
+# (api_base, api_key) -> (ingest token, expiry as time.time())
+_TOKENS: Dict[Tuple[str, str], Tuple[str, float]] = {}
+_TOKEN_REFRESH_MARGIN = 60
+# Bodies above this size are sent gzip-encoded
+_GZIP_MIN_BYTES = 1024
+
 
 def _load_cache() -> List[Dict[str, Any]]:
     if not os.path.exists(CACHE_PATH):
@@ -35,11 +43,38 @@ def flush_cache(api_base: str, api_key: str) -> None:
     _save_cache(remaining)
 
 
+def _auth_headers(api_base: str, api_key: str, renew: bool = False) -> Dict[str, str]:
+    """Bearer ingest token exchanged from the API key; falls back to X-API-Key."""
+    cache_key = (api_base, api_key)
+    cached = _TOKENS.get(cache_key)
+    if cached and not renew and cached[1] - _TOKEN_REFRESH_MARGIN > time.time():
+        return {"Authorization": f"Bearer {cached[0]}"}
+    try:
+        resp = requests.post(f"{api_base}/job-runs/ingest-token", headers={"X-API-Key": api_key}, timeout=10)
+        if resp.status_code == 200:
+            body = resp.json()
+            _TOKENS[cache_key] = (body["access_token"], time.time() + int(body.get("expires_in", 0)))
+            return {"Authorization": f"Bearer {body['access_token']}"}
+    except Exception:
+        pass
+    _TOKENS.pop(cache_key, None)
+    return {"X-API-Key": api_key}
+
+
 def send_payload(api_base: str, api_key: str, payload: Dict[str, Any], cache_on_fail: bool = True) -> None:
     """Send telemetry payload to backend with optional caching."""
-    headers = {"Content-Type": "application/json", "X-API-Key": api_key}
+    body = json.dumps(payload).encode("utf-8")
+    content = {"Content-Type": "application/json"}
+    if len(body) >= _GZIP_MIN_BYTES:
+        body = gzip.compress(body, compresslevel=5)
+        content["Content-Encoding"] = "gzip"
     try:
-        requests.post(f"{api_base}/job-runs", headers=headers, data=json.dumps(payload), timeout=10)
+        headers = {**content, **_auth_headers(api_base, api_key)}
+        resp = requests.post(f"{api_base}/job-runs", headers=headers, data=body, timeout=10)
+        if resp.status_code == 401 and "Authorization" in headers:
+            # Token expired or revoked: exchange the key again once
+            headers = {**content, **_auth_headers(api_base, api_key, renew=True)}
+            requests.post(f"{api_base}/job-runs", headers=headers, data=body, timeout=10)
     except Exception:
         if cache_on_fail:
             cached = _load_cache()